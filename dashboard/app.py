@@ -5,6 +5,8 @@ Interactive dashboard for exploring player data, predictions, and regression sig
 Built with Streamlit for rapid prototyping.
 """
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Add project root to path
@@ -12,12 +14,14 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from sqlalchemy import text
 
-from src.utils.db_connection import get_session
+from src.utils.db_connection import get_engine
+from src.utils.query_cache import cached_query
 from src.analytics.predictive_model import AdvancedPerformancePredictor
 from src.analytics.regression_detector import RegressionDetector
 
@@ -51,118 +55,220 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
+@st.cache_resource
+def get_db_engine():
+    """Pooled database engine, created once per Streamlit server process"""
+    return get_engine()
+
+
+@st.cache_resource
+def get_executor():
+    """Shared worker pool for loading independent dashboard widgets concurrently"""
+    return ThreadPoolExecutor(max_workers=4)
+
+
+@st.cache_resource
+def get_detector():
+    """Regression detector (league averages loaded once per process)"""
+    return RegressionDetector()
+
+
+@st.cache_resource
+def get_predictor():
+    """Performance predictor (tracker, detector and aging curve built once per process)"""
+    return AdvancedPerformancePredictor()
+
+
+def submit_load(fn, *args):
+    """Start fn(*args) in the background, attached to the current script run"""
+    ctx = get_script_run_ctx()
+    
+    def task():
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return fn(*args)
+    
+    return get_executor().submit(task)
+
+
+def read_rows(query, params):
+    """Run a query and build a DataFrame directly from the fetched rows"""
+    with get_db_engine().connect() as conn:
+        result = conn.execute(query, params)
+        return pd.DataFrame.from_records(result.fetchall(), columns=list(result.keys()))
+
+
+def read_sql(query, params):
+    """Run a query through pandas on the shared engine"""
+    return pd.read_sql(query, get_db_engine(), params=params)
+
+
+def fetch_frame(query, params=None, dtypes=None):
+    """Fetch a query result (via the shared cache) with explicit dtypes"""
+    df = cached_query(query, params, loader=read_rows)
+    
+    if dtypes:
+        df = df.astype(dtypes)
+    return df
+
+
+@st.cache_data(ttl=3600)
+def load_player_name_index():
+    """Load player ids and names only (cheap, used for browsing and batch pages)"""
+    query = text("""
+        SELECT player_id, name
+        FROM players
+        ORDER BY name
+    """)
+    
+    return fetch_frame(query)
+
+
 @st.cache_data(ttl=300)
-def load_players():
-    """Load all players from database"""
-    session = get_session()
-    
-    try:
-        query = text("""
-            SELECT p.player_id, p.name, p.fg_id, 
-                   COUNT(DISTINCT ss.season) as seasons,
-                   MAX(ss.season) as last_season
-            FROM players p
-            LEFT JOIN season_stats ss ON p.player_id = ss.player_id
-            GROUP BY p.player_id, p.name, p.fg_id
-            ORDER BY p.name
-        """)
-        
-        df = pd.read_sql(query, session.bind)
-        return df
-        
-    finally:
-        session.close()
+def search_players(search, limit=50):
+    """Find players whose name contains the search text"""
+    query = text("""
+        SELECT player_id, name
+        FROM players
+        WHERE name ILIKE :q ESCAPE '\\'
+        ORDER BY name
+        LIMIT :limit
+    """)
+    
+    # Match % and _ in the search text literally, not as wildcards
+    escaped = search.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return fetch_frame(query, {'q': f'%{escaped}%', 'limit': limit})
+
+
+@st.cache_data(ttl=3600)
+def load_player_summary():
+    """
+    Load home page player totals from the player_summary rollup
+    
+    Returns:
+        Dict with players, player_seasons, active_players, avg_seasons
+    """
+    query = text("""
+        SELECT COUNT(*) AS players,
+               COALESCE(SUM(seasons), 0) AS player_seasons,
+               SUM(CASE WHEN last_season >= 2024 THEN 1 ELSE 0 END) AS active_players,
+               AVG(seasons) AS avg_seasons
+        FROM player_summary
+    """)
+    
+    return fetch_frame(query).to_dict('records')[0]
 
 
 @st.cache_data(ttl=300)
 def load_player_stats(player_id):
     """Load all stats for a player"""
-    session = get_session()
-    
-    try:
-        query = text("""
-            SELECT ss.season, ss.team, ss.games, ss.pa, ss.ab, ss.hits,
-                   ss.hr, ss.rbi, ss.bb, ss.so,
-                   ss.avg, ss.obp, ss.slg, ss.woba, ss.wrc_plus,
-                   ss.babip, ss.k_pct, ss.bb_pct, ss.iso, ss.hr_fb_pct
-            FROM season_stats ss
-            WHERE ss.player_id = :player_id
-            ORDER BY ss.season
-        """)
-        
-        df = pd.read_sql(query, session.bind, params={'player_id': player_id})
-        return df
-        
-    finally:
-        session.close()
+    query = text("""
+        SELECT ss.season, ss.team, ss.games, ss.pa, ss.ab, ss.hits,
+               ss.hr, ss.rbi, ss.bb, ss.so,
+               ss.avg, ss.obp, ss.slg, ss.woba, ss.wrc_plus,
+               ss.babip, ss.k_pct, ss.bb_pct, ss.iso, ss.hr_fb_pct
+        FROM season_stats ss
+        WHERE ss.player_id = :player_id
+        ORDER BY ss.season
+    """)
+    
+    rate_cols = ['avg', 'obp', 'slg', 'woba', 'babip', 'k_pct', 'bb_pct', 'iso', 'hr_fb_pct']
+    return fetch_frame(query, {'player_id': int(player_id)},
+                       dtypes={col: 'float64' for col in rate_cols})
 
 
 @st.cache_data(ttl=300)
 def load_statcast_data(player_id):
-    """Load Statcast data for a player"""
-    session = get_session()
-    
-    try:
-        query = text("""
-            SELECT season, exit_velo, launch_angle, hard_hit_pct, barrel_pct,
-                   sweet_spot_pct, xba, xslg, xwoba
-            FROM statcast_data
-            WHERE player_id = :player_id
-            ORDER BY season
-        """)
-        
-        df = pd.read_sql(query, session.bind, params={'player_id': player_id})
-        return df
-        
-    finally:
-        session.close()
+    """Load Statcast data for a player, with actual wOBA alongside xwOBA"""
+    # wOBA comes from the highest-PA stint so multi-team seasons stay one row
+    query = text("""
+        SELECT sc.season, sc.exit_velo, sc.launch_angle, sc.hard_hit_pct, sc.barrel_pct,
+               sc.sweet_spot_pct, sc.xba, sc.xslg, sc.xwoba,
+               (SELECT ss.woba
+                FROM season_stats ss
+                WHERE ss.player_id = sc.player_id AND ss.season = sc.season
+                ORDER BY ss.pa DESC
+                LIMIT 1) as woba
+        FROM statcast_data sc
+        WHERE sc.player_id = :player_id
+        ORDER BY sc.season
+    """)
+    
+    return cached_query(query, {'player_id': int(player_id)}, loader=read_sql)
 
 
 @st.cache_data(ttl=300)
 def load_regression_signals(season=2025):
-    """Load regression signals for all players"""
-    detector = RegressionDetector()
-    session = get_session()
-    
-    try:
-        query = text("""
-            SELECT p.player_id, p.name, ss.team
-            FROM players p
-            JOIN season_stats ss ON p.player_id = ss.player_id
-            WHERE ss.season = :season
-              AND ss.pa >= 100
-            ORDER BY ss.pa DESC
-        """)
-        
-        players = session.execute(query, {'season': season}).fetchall()
-        
-        # Deduplicate: only process each player once (take team with most PA)
-        seen_ids = set()
-        unique_players = []
-        for player_id, name, team in players:
-            if player_id not in seen_ids:
-                seen_ids.add(player_id)
-                unique_players.append((player_id, name, team))
-
-        results = []
-        for player_id, name, team in unique_players:
-            analysis = detector.analyze_player_season(player_id, season)
-
-            if analysis and analysis['alerts']:
-                results.append({
-                    'player_id': player_id,
-                    'name': name,
-                    'team': team,
-                    'net_score': analysis['net_signal'],
-                    'tier1_buys': analysis['buy_signals'],
-                    'tier1_sells': analysis['sell_signals'],
-                    'alerts': analysis['alerts']
-                })
-        
-        return pd.DataFrame(results)
-        
-    finally:
-        session.close()
+    """
+    Load regression signals for all players
+    
+    Returns:
+        (signals_df, alerts_df): one row per player, and one row per alert
+        keyed by player_id
+    """
+    detector = get_detector()
+    
+    # One batched, columnar pass over the season instead of per-player queries
+    players_df, season_alerts = detector.analyze_season_frames(season, min_pa=100)
+    
+    if players_df.empty:
+        return pd.DataFrame(), pd.DataFrame()
+    
+    # Sorted and abs-scored once here so the page's filters are plain masks
+    signals_df = (
+        players_df[['player_id', 'name', 'team', 'net_signal', 'buy_signals', 'sell_signals']]
+        .rename(columns={
+            'net_signal': 'net_score',
+            'buy_signals': 'tier1_buys',
+            'sell_signals': 'tier1_sells'
+        })
+        .astype({'name': 'string[pyarrow]', 'team': 'string[pyarrow]'})
+        .assign(abs_score=lambda d: d['net_score'].abs())
+        .sort_values('net_score')
+    )
+    
+    # Raw alert fields only; messages are formatted for the selected player
+    alerts_df = (
+        season_alerts[['player_id', 'tier', 'metric', 'signal', 'current', 'expected', 'delta']]
+        .astype({
+            'tier': 'int8',
+            'metric': 'string[pyarrow]',
+            'signal': 'string[pyarrow]'
+        })
+    )
+    
+    return signals_df, alerts_df
+
+
+@st.cache_data(ttl=300)
+def load_league_summary(season=2025):
+    """Load league-wide averages over qualified players (league_player_stats rollup)"""
+    query = text("""
+        SELECT COUNT(*) AS players,
+               AVG(wrc_plus) AS wrc_plus,
+               AVG(avg) AS avg,
+               AVG(obp) AS obp,
+               AVG(slg) AS slg
+        FROM league_player_stats
+        WHERE season = :season
+    """)
+    
+    df = cached_query(query, {'season': season}, loader=read_sql)
+    return df.to_dict('records')[0]
+
+
+@st.cache_data(ttl=300)
+def load_league_leaderboard(season=2025, limit=20):
+    """Load the top qualified players by wRC+"""
+    query = text("""
+        SELECT name, team, pa, wrc_plus, avg, obp, slg, hr, rbi,
+               babip, iso, k_pct, bb_pct
+        FROM league_player_stats
+        WHERE season = :season
+        ORDER BY wrc_plus DESC
+        LIMIT :limit
+    """)
+    
+    return cached_query(query, {'season': season, 'limit': limit}, loader=read_sql)
 
 
 def main():
@@ -199,24 +305,21 @@ def show_home():
     st.markdown("### Advanced MLB Player Analysis & Predictions")
     
     # Load stats
-    players_df = load_players()
+    summary = load_player_summary()
     
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("Total Players", len(players_df))
+        st.metric("Total Players", summary['players'])
     
     with col2:
-        total_seasons = players_df['seasons'].sum()
-        st.metric("Player-Seasons", total_seasons)
+        st.metric("Player-Seasons", summary['player_seasons'])
     
     with col3:
-        active_players = len(players_df[players_df['last_season'] >= 2024])
-        st.metric("Active Players (2024+)", active_players)
+        st.metric("Active Players (2024+)", summary['active_players'] or 0)
     
     with col4:
-        avg_seasons = players_df['seasons'].mean()
-        st.metric("Avg Seasons/Player", f"{avg_seasons:.1f}")
+        st.metric("Avg Seasons/Player", f"{summary['avg_seasons'] or 0:.1f}")
     
     st.markdown("---")
     
@@ -273,27 +376,25 @@ def show_player_search():
     """Player search and detail view"""
     st.title("👤 Player Search")
     
-    # Load players
-    players_df = load_players()
-    
     # Search
-    search = st.text_input("🔍 Search player name", "")
+    search = st.text_input("🔍 Search player name", "").strip()
     
+    # Matching happens in the database; the full list is only ids and names
     if search:
-        filtered = players_df[players_df['name'].str.contains(search, case=False)]
+        filtered = search_players(search)
     else:
-        filtered = players_df
+        filtered = load_player_name_index()
     
     # Select player
     if not filtered.empty:
         selected_name = st.selectbox("Select Player", filtered['name'].tolist())
         
         if selected_name:
-            player_id = filtered[filtered['name'] == selected_name]['player_id'].iloc[0]
+            player_id = int(filtered[filtered['name'] == selected_name]['player_id'].iloc[0])
             
-            # Load data
+            # Statcast loads in the background while the header and stats render
+            statcast_future = submit_load(load_statcast_data, player_id)
             stats_df = load_player_stats(player_id)
-            statcast_df = load_statcast_data(player_id)
             
             # Display player info
             st.markdown(f"## {selected_name}")
@@ -319,10 +420,18 @@ def show_player_search():
                 show_player_trends(stats_df)
             
             with tab3:
-                show_player_statcast(statcast_df, stats_df)
+                with st.spinner("Loading Statcast data..."):
+                    statcast_df = statcast_future.result()
+                show_player_statcast(statcast_df)
             
             with tab4:
-                show_player_prediction(player_id, selected_name)
+                # Projections are expensive - only compute once requested for this player
+                requested = st.session_state.setdefault('prediction_requested', set())
+                
+                if player_id in requested or st.button("🔮 Generate 2026 projection"):
+                    requested.add(player_id)
+                    with st.spinner("Generating projection..."):
+                        show_player_prediction(player_id, selected_name)
 
 
 def show_player_stats(stats_df):
@@ -333,13 +442,15 @@ def show_player_stats(stats_df):
     
     # Format display
     display_df = stats_df[['season', 'team', 'games', 'pa', 'avg', 'obp', 'slg', 
-                           'hr', 'rbi', 'bb', 'so', 'wrc_plus', 'babip', 'iso']].copy()
+                           'hr', 'rbi', 'bb', 'so', 'wrc_plus', 'babip', 'iso']]
     
-    # Format decimals
-    for col in ['avg', 'obp', 'slg', 'babip', 'iso']:
-        display_df[col] = display_df[col].apply(lambda x: f"{x:.3f}" if pd.notna(x) else "-")
+    # Format decimals at render time rather than building string columns
+    styled = display_df.style.format(
+        {col: '{:.3f}' for col in ['avg', 'obp', 'slg', 'babip', 'iso']},
+        na_rep='-'
+    )
     
-    st.dataframe(display_df, use_container_width=True, hide_index=True)
+    st.dataframe(styled, use_container_width=True, hide_index=True)
 
 
 def show_player_trends(stats_df):
@@ -375,7 +486,7 @@ def show_player_trends(stats_df):
         st.plotly_chart(fig, use_container_width=True)
 
 
-def show_player_statcast(statcast_df, stats_df):
+def show_player_statcast(statcast_df):
     """Display Statcast metrics"""
     if statcast_df.empty:
         st.warning("No Statcast data available")
@@ -412,15 +523,13 @@ def show_player_statcast(statcast_df, stats_df):
         st.plotly_chart(fig, use_container_width=True)
     
     # Expected vs Actual
-    if not stats_df.empty and 'xwoba' in statcast_df.columns:
-        merged = pd.merge(stats_df[['season', 'woba']], 
-                         statcast_df[['season', 'xwoba']], 
-                         on='season')
-        
+    expected = statcast_df.dropna(subset=['woba'])
+    
+    if not expected.empty:
         fig = go.Figure()
-        fig.add_trace(go.Scatter(x=merged['season'], y=merged['woba'],
+        fig.add_trace(go.Scatter(x=expected['season'], y=expected['woba'],
                                 name='Actual wOBA', mode='lines+markers'))
-        fig.add_trace(go.Scatter(x=merged['season'], y=merged['xwoba'],
+        fig.add_trace(go.Scatter(x=expected['season'], y=expected['xwoba'],
                                 name='Expected wOBA', mode='lines+markers',
                                 line=dict(dash='dash')))
         fig.update_layout(title='wOBA vs xwOBA', height=300)
@@ -429,7 +538,7 @@ def show_player_statcast(statcast_df, stats_df):
 
 def show_player_prediction(player_id, player_name):
     """Display prediction for player"""
-    predictor = AdvancedPerformancePredictor()
+    predictor = get_predictor()
     
     pred = predictor.predict_next_season_advanced(player_id, 2025)
     
@@ -482,35 +591,32 @@ def show_predictions():
     st.title("🔮 2026 Predictions")
     st.markdown("### Projected wRC+ for Next Season")
 
-    players_df = load_players()
+    players_df = load_player_name_index()
 
     if players_df.empty:
         st.warning("No players available")
         return
 
-    predictor = AdvancedPerformancePredictor()
+    predictor = get_predictor()
 
     with st.spinner("Generating predictions..."):
-        results = []
-        for _, player in players_df.iterrows():
-            pred = predictor.predict_next_season_advanced(player['player_id'], 2025)
-            if pred:
-                results.append({
-                    'Player': player['name'],
-                    'Projected wRC+': pred['predicted_wrc'],
-                    'Range': f"{pred['prediction_range'][0]}-{pred['prediction_range'][1]}",
-                    'Age (2026)': pred['next_age'],
-                    'Confidence': pred['confidence'],
-                    'Age Adj': pred['age_adjustment'],
-                    'Discipline Adj': pred['discipline_adjustment'],
-                    'Power Adj': pred['power_adjustment'],
-                })
-
-    if not results:
+        preds = predictor.predict_batch_advanced(players_df['player_id'].tolist(), 2025)
+
+    if preds.empty:
         st.warning("No predictions available - insufficient player data")
         return
 
-    pred_df = pd.DataFrame(results).sort_values('Projected wRC+', ascending=False)
+    preds = preds.join(players_df.set_index('player_id')['name'])
+    pred_df = pd.DataFrame({
+        'Player': preds['name'],
+        'Projected wRC+': preds['predicted_wrc'],
+        'Range': preds['range_low'].astype(str) + '-' + preds['range_high'].astype(str),
+        'Age (2026)': preds['next_age'],
+        'Confidence': preds['confidence'],
+        'Age Adj': preds['age_adjustment'],
+        'Discipline Adj': preds['discipline_adjustment'],
+        'Power Adj': preds['power_adjustment'],
+    }).sort_values('Projected wRC+', ascending=False)
 
     col1, col2, col3 = st.columns(3)
     with col1:
@@ -532,7 +638,7 @@ def show_regression_signals():
     
     # Load signals
     with st.spinner("Analyzing regression signals..."):
-        signals_df = load_regression_signals(2025)
+        signals_df, alerts_df = load_regression_signals(2025)
     
     if signals_df.empty:
         st.warning("No regression signals found")
@@ -546,109 +652,79 @@ def show_regression_signals():
     with col2:
         min_score = st.slider("Minimum |Net Score|", 0, 5, 2)
     
-    # Filter
-    filtered = signals_df.copy()
-    
-    if signal_type != "All":
-        if signal_type == "SELL":
-            filtered = filtered[filtered['net_score'] <= -min_score]
-        else:
-            filtered = filtered[filtered['net_score'] >= min_score]
+    # Filter (signals_df is already sorted by net_score)
+    if signal_type == "SELL":
+        filtered = signals_df[signals_df['net_score'] <= -min_score]
+    elif signal_type == "BUY":
+        filtered = signals_df[signals_df['net_score'] >= min_score]
     else:
-        filtered = filtered[abs(filtered['net_score']) >= min_score]
-    
-    # Sort
-    filtered = filtered.sort_values('net_score')
+        filtered = signals_df[signals_df['abs_score'] >= min_score]
     
     st.markdown(f"### {len(filtered)} Players with Signals")
     
-    # Display
-    for _, row in filtered.iterrows():
-        signal_color = "🔴" if row['net_score'] < 0 else "🟢"
+    # One virtualized table; alert detail is rendered only for the selected row
+    event = st.dataframe(
+        filtered[['name', 'team', 'net_score', 'tier1_buys', 'tier1_sells']],
+        column_config={
+            'name': 'Player',
+            'team': 'Team',
+            'net_score': st.column_config.NumberColumn('Net Score', format='%d'),
+            'tier1_buys': 'BUY Signals',
+            'tier1_sells': 'SELL Signals',
+        },
+        on_select='rerun',
+        selection_mode='single-row',
+        use_container_width=True,
+        hide_index=True
+    )
+    
+    if not event.selection.rows:
+        st.caption("Select a player to see their alerts")
+        return
+    
+    row = filtered.iloc[event.selection.rows[0]]
+    signal_color = "🔴" if row['net_score'] < 0 else "🟢"
+    
+    st.markdown(f"#### {signal_color} {row['name']} ({row['team']}) - Net: {row['net_score']:.1f}")
+    
+    player_alerts = alerts_df[alerts_df['player_id'] == row['player_id']]
+    detector = get_detector()
+    
+    for alert in player_alerts.itertuples(index=False):
+        tier_emoji = "🔴" if alert.tier == 1 and alert.signal == 'SELL' else \
+                    "🟢" if alert.tier == 1 and alert.signal == 'BUY' else "🟡"
         
-        with st.expander(f"{signal_color} {row['name']} ({row['team']}) - Net: {row['net_score']:.1f}"):
-            for alert in row['alerts']:
-                tier_emoji = "🔴" if alert['tier'] == 1 and alert['signal'] == 'SELL' else \
-                            "🟢" if alert['tier'] == 1 and alert['signal'] == 'BUY' else "🟡"
-                
-                st.markdown(f"{tier_emoji} **Tier {alert['tier']} {alert['metric']}**: {alert['explanation']}")
+        st.markdown(f"{tier_emoji} **Tier {alert.tier} {alert.metric}**: {detector.format_alert(alert._asdict())}")
 
 
 def show_league_stats():
     """Display league-wide statistics"""
     st.title("📈 League Statistics")
     
-    session = get_session()
+    summary = load_league_summary(2025)
     
-    # Standard 30 MLB team abbreviations as used by FanGraphs
-    MLB_TEAMS = (
-        'ARI', 'ATL', 'BAL', 'BOS', 'CHC', 'CWS', 'CIN', 'CLE', 'COL', 'DET',
-        'HOU', 'KC', 'LAA', 'LAD', 'MIA', 'MIL', 'MIN', 'NYM', 'NYY', 'OAK',
-        'PHI', 'PIT', 'SD', 'SEA', 'SF', 'STL', 'TB', 'TEX', 'TOR', 'WSH',
-        'ATH',  # Oakland/Sacramento Athletics (post-2024 rebrand)
-    )
-    mlb_team_list = ", ".join(f"'{t}'" for t in MLB_TEAMS)
-
-    try:
-        # Load 2025 stats - group by player to eliminate multi-team duplicates,
-        # filter to MLB teams only to exclude non-MLB leagues (e.g. KBO, NPB).
-        # Rate stats (AVG, OBP, SLG, wRC+, BABIP, ISO, K%, BB%) are PA-weighted.
-        query = text(f"""
-            WITH mlb_stats AS (
-                SELECT ss.player_id, ss.team, ss.pa, ss.wrc_plus,
-                       ss.avg, ss.obp, ss.slg, ss.hr, ss.rbi,
-                       ss.babip, ss.iso, ss.k_pct, ss.bb_pct
-                FROM season_stats ss
-                WHERE ss.season = 2025
-                  AND ss.team IN ({mlb_team_list})
-            )
-            SELECT p.name,
-                   CASE WHEN COUNT(DISTINCT m.team) > 1 THEN 'TOT'
-                        ELSE MAX(m.team) END AS team,
-                   SUM(m.pa) AS pa,
-                   CAST(SUM(m.pa * m.wrc_plus) / SUM(m.pa) AS INTEGER) AS wrc_plus,
-                   ROUND(CAST(SUM(m.pa * m.avg)    / SUM(m.pa) AS NUMERIC), 3) AS avg,
-                   ROUND(CAST(SUM(m.pa * m.obp)    / SUM(m.pa) AS NUMERIC), 3) AS obp,
-                   ROUND(CAST(SUM(m.pa * m.slg)    / SUM(m.pa) AS NUMERIC), 3) AS slg,
-                   SUM(m.hr)  AS hr,
-                   SUM(m.rbi) AS rbi,
-                   ROUND(CAST(SUM(m.pa * m.babip)  / SUM(m.pa) AS NUMERIC), 3) AS babip,
-                   ROUND(CAST(SUM(m.pa * m.iso)    / SUM(m.pa) AS NUMERIC), 3) AS iso,
-                   ROUND(CAST(SUM(m.pa * m.k_pct)  / SUM(m.pa) AS NUMERIC), 1) AS k_pct,
-                   ROUND(CAST(SUM(m.pa * m.bb_pct) / SUM(m.pa) AS NUMERIC), 1) AS bb_pct
-            FROM mlb_stats m
-            JOIN players p ON m.player_id = p.player_id
-            GROUP BY p.player_id, p.name
-            HAVING SUM(m.pa) >= 100
-            ORDER BY wrc_plus DESC
-        """)
-        
-        df = pd.read_sql(query, session.bind)
-        
-        if df.empty:
-            st.warning("No data available")
-            return
-        
-        st.markdown(f"### 2025 Season ({len(df)} qualified players)")
-        
-        # Metrics
-        col1, col2, col3, col4 = st.columns(4)
-        
-        with col1:
-            st.metric("Avg wRC+", f"{df['wrc_plus'].mean():.0f}")
-        with col2:
-            st.metric("Avg BA", f"{df['avg'].mean():.3f}")
-        with col3:
-            st.metric("Avg OBP", f"{df['obp'].mean():.3f}")
-        with col4:
-            st.metric("Avg SLG", f"{df['slg'].mean():.3f}")
-        
-        # Leaderboard
-        st.markdown("### wRC+ Leaderboard")
-        st.dataframe(df.head(20), use_container_width=True, hide_index=True)
-        
-    finally:
-        session.close()
+    if not summary['players']:
+        st.warning("No data available")
+        return
+    
+    st.markdown(f"### 2025 Season ({summary['players']} qualified players)")
+    
+    # Metrics
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric("Avg wRC+", f"{summary['wrc_plus']:.0f}")
+    with col2:
+        st.metric("Avg BA", f"{summary['avg']:.3f}")
+    with col3:
+        st.metric("Avg OBP", f"{summary['obp']:.3f}")
+    with col4:
+        st.metric("Avg SLG", f"{summary['slg']:.3f}")
+    
+    # Leaderboard
+    st.markdown("### wRC+ Leaderboard")
+    leaderboard_df = load_league_leaderboard(2025, limit=20)
+    st.dataframe(leaderboard_df, use_container_width=True, hide_index=True)
 
 
 if __name__ == "__main__":
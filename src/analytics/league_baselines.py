@@ -6,16 +6,80 @@ Calculate:
 - Role-based cohort comparisons
 - Historical context
 """
+from functools import lru_cache
+
 import pandas as pd
 import numpy as np
 from sqlalchemy import text
 from src.utils.db_connection import get_session
 
+# Metrics with league distributions available for percentile lookups
+PERCENTILE_METRICS = ('avg', 'obp', 'slg', 'woba', 'wrc_plus', 'babip',
+                      'bb_pct', 'k_pct', 'iso', 'hr_fb_pct')
+
+
+@lru_cache(maxsize=32)
+def _load_metric_arrays(season, min_pa):
+    """
+    Load sorted league distributions for every percentile metric
+    
+    One query per (season, min_pa); results are cached for the process
+    until invalidate_metric_arrays() is called.
+    
+    Returns:
+        dict of metric -> sorted np.ndarray (NULLs dropped)
+    """
+    session = get_session()
+    
+    try:
+        query = text(f"""
+            SELECT {', '.join(PERCENTILE_METRICS)}
+            FROM season_stats
+            WHERE season = :season
+              AND pa >= :min_pa
+        """)
+        
+        df = pd.read_sql(query, session.bind, params={'season': season, 'min_pa': min_pa})
+    
+    finally:
+        session.close()
+    
+    return {
+        metric: np.sort(df[metric].dropna().to_numpy(dtype=float))
+        for metric in PERCENTILE_METRICS
+    }
+
+
+def invalidate_metric_arrays():
+    """Forget the cached league distributions so the next lookup re-queries them"""
+    _load_metric_arrays.cache_clear()
+
+
+def _load_metric_array(metric, season, min_pa):
+    """Sorted league distribution for a single metric"""
+    return _load_metric_arrays(season, min_pa)[metric]
+
+
 class LeagueBaselines:
     """
     Calculate league baselines and percentiles
     """
     
+    # PA threshold baked into the league_percentiles rollup (schema_rollups.sql)
+    ROLLUP_MIN_PA = 100
+    
+    # Metrics shown in player-vs-league comparisons (column -> display name)
+    COMPARE_METRICS = {
+        'wrc_plus': 'wRC+',
+        'babip': 'BABIP',
+        'bb_pct': 'BB%',
+        'k_pct': 'K%',
+        'iso': 'ISO',
+        'avg': 'AVG',
+        'obp': 'OBP',
+        'slg': 'SLG'
+    }
+    
     def __init__(self):
         self.percentiles = [10, 25, 50, 75, 90]
     
@@ -23,9 +87,15 @@ class LeagueBaselines:
         """
         Calculate league percentiles for all key metrics
         
+        Reads the pre-aggregated league_percentiles rollup when min_pa matches
+        it; other thresholds are computed from season_stats.
+        
         Returns:
             DataFrame with percentile breakdowns
         """
+        if min_pa == self.ROLLUP_MIN_PA:
+            return self._load_league_percentiles_rollup(season)
+        
         session = get_session()
         
         try:
@@ -44,58 +114,83 @@ class LeagueBaselines:
             if df.empty:
                 return None
             
-            # Calculate percentiles for each metric
-            metrics = ['avg', 'obp', 'slg', 'woba', 'wrc_plus', 'babip', 
-                      'bb_pct', 'k_pct', 'iso', 'hr_fb_pct']
+            # Calculate percentiles for all metrics in one pass over an (N, M) array
+            metrics = list(PERCENTILE_METRICS)
+            values = df[metrics].astype(float).to_numpy()
             
-            percentile_data = {}
+            quantiles = np.nanquantile(values, [p / 100 for p in self.percentiles], axis=0)
+            means = np.nanmean(values, axis=0)
+            stds = np.nanstd(values, axis=0, ddof=1)  # sample std, as pandas
             
-            for metric in metrics:
-                if metric in df.columns:
-                    percentile_data[metric] = {
-                        f'p{p}': df[metric].quantile(p/100) 
-                        for p in self.percentiles
-                    }
-                    percentile_data[metric]['mean'] = df[metric].mean()
-                    percentile_data[metric]['std'] = df[metric].std()
+            percentile_data = {
+                metric: {
+                    **{f'p{p}': quantiles[i, j] for i, p in enumerate(self.percentiles)},
+                    'mean': means[j],
+                    'std': stds[j],
+                }
+                for j, metric in enumerate(metrics)
+            }
             
             return percentile_data
         
         finally:
             session.close()
     
-    def get_player_percentile(self, value, metric, season=2025, min_pa=100):
-        """
-        Get a player's percentile rank for a specific metric
-        
-        Returns:
-            int (0-100 percentile)
-        """
+    def _load_league_percentiles_rollup(self, season):
+        """Reshape the league_percentiles rollup rows into the percentile dict"""
         session = get_session()
         
         try:
-            query = text(f"""
-                SELECT {metric}
-                FROM season_stats
+            query = text("""
+                SELECT metric, p10, p25, p50, p75, p90, mean, std
+                FROM league_percentiles
                 WHERE season = :season
-                  AND pa >= :min_pa
-                  AND {metric} IS NOT NULL
-                ORDER BY {metric}
             """)
             
-            df = pd.read_sql(query, session.bind, params={'season': season, 'min_pa': min_pa})
+            rows = session.execute(query, {'season': season}).fetchall()
             
-            if df.empty or value is None:
+            if not rows:
                 return None
             
-            # Calculate percentile
-            percentile = (df[metric] < value).sum() / len(df) * 100
+            percentile_data = {}
+            
+            for row in rows:
+                percentile_data[row[0]] = {
+                    f'p{p}': value for p, value in zip(self.percentiles, row[1:6])
+                }
+                percentile_data[row[0]]['mean'] = row[6]
+                percentile_data[row[0]]['std'] = row[7]
             
-            return round(percentile)
+            return percentile_data
         
         finally:
             session.close()
     
+    def get_player_percentile(self, value, metric, season=2025, min_pa=100):
+        """
+        Get a player's percentile rank for a specific metric
+        
+        Returns:
+            int (0-100 percentile)
+        """
+        # Metric names are only ever looked up against this fixed column set;
+        # they are never interpolated into SQL
+        if metric not in PERCENTILE_METRICS:
+            raise ValueError(
+                f"Unknown metric '{metric}'. Expected one of: {', '.join(PERCENTILE_METRICS)}"
+            )
+        
+        values = _load_metric_array(metric, season, min_pa)
+        
+        if len(values) == 0 or value is None:
+            return None
+        
+        # Share of the league strictly below this value
+        below = np.searchsorted(values, float(value), side='left')
+        percentile = below / len(values) * 100
+        
+        return round(percentile)
+    
     def calculate_role_cohort_stats(self, season=2025, min_pa=100):
         """
         Calculate statistics by role cohort
@@ -117,51 +212,51 @@ class LeagueBaselines:
         if season_data.empty:
             return None
         
-        # Get stats for these players
+        # Ship the role assignments as a VALUES list and aggregate in one query
+        role_map = season_data[['player_id', 'role']].drop_duplicates()
+        
+        params = {'season': season, 'min_pa': min_pa}
+        values = []
+        for i, (player_id, role) in enumerate(role_map.itertuples(index=False)):
+            params[f'player_id_{i}'] = int(player_id)
+            params[f'role_{i}'] = role
+            values.append(f"(:player_id_{i}, :role_{i})")
+        
         session = get_session()
         
         try:
-            # Join classifications with stats
-            player_seasons = season_data[['player_id', 'role']].to_dict('records')
+            query = f"""
+                WITH role_map(player_id, role) AS (
+                    VALUES {', '.join(values)}
+                )
+                SELECT 
+                    rm.role,
+                    AVG(ss.wrc_plus) as avg_wrc_plus,
+                    AVG(ss.babip) as avg_babip,
+                    AVG(ss.bb_pct) as avg_bb_pct,
+                    AVG(ss.k_pct) as avg_k_pct,
+                    AVG(ss.iso) as avg_iso,
+                    COUNT(*) as player_count
+                FROM season_stats ss
+                JOIN role_map rm ON ss.player_id = rm.player_id
+                WHERE ss.season = :season
+                  AND ss.pa >= :min_pa
+                GROUP BY rm.role
+            """
+            
+            results = session.execute(text(query), params).fetchall()
             
             cohort_stats = {}
             
-            for role in season_data['role'].unique():
-                role_players = season_data[season_data['role'] == role]['player_id'].tolist()
-                
-                if not role_players:
-                    continue
-                
-                # Get stats for this role
-                placeholders = ','.join([str(p) for p in role_players])
-                query = f"""
-                    SELECT 
-                        AVG(wrc_plus) as avg_wrc_plus,
-                        AVG(babip) as avg_babip,
-                        AVG(bb_pct) as avg_bb_pct,
-                        AVG(k_pct) as avg_k_pct,
-                        AVG(iso) as avg_iso,
-                        COUNT(*) as player_count
-                    FROM season_stats
-                    WHERE player_id IN ({placeholders})
-                      AND season = :season
-                      AND pa >= :min_pa
-                """
-                
-                result = session.execute(
-                    text(query),
-                    {'season': season, 'min_pa': min_pa}
-                ).fetchone()
-                
-                if result:
-                    cohort_stats[role] = {
-                        'avg_wrc_plus': result[0],
-                        'avg_babip': result[1],
-                        'avg_bb_pct': result[2],
-                        'avg_k_pct': result[3],
-                        'avg_iso': result[4],
-                        'player_count': result[5]
-                    }
+            for result in results:
+                cohort_stats[result[0]] = {
+                    'avg_wrc_plus': result[1],
+                    'avg_babip': result[2],
+                    'avg_bb_pct': result[3],
+                    'avg_k_pct': result[4],
+                    'avg_iso': result[5],
+                    'player_count': result[6]
+                }
             
             return cohort_stats
         
@@ -177,18 +272,7 @@ class LeagueBaselines:
         """
         percentile_ranks = {}
         
-        metrics_to_compare = {
-            'wrc_plus': 'wRC+',
-            'babip': 'BABIP',
-            'bb_pct': 'BB%',
-            'k_pct': 'K%',
-            'iso': 'ISO',
-            'avg': 'AVG',
-            'obp': 'OBP',
-            'slg': 'SLG'
-        }
-        
-        for metric, display_name in metrics_to_compare.items():
+        for metric, display_name in self.COMPARE_METRICS.items():
             if metric in player_stats and player_stats[metric] is not None:
                 percentile = self.get_player_percentile(
                     player_stats[metric], 
@@ -206,6 +290,73 @@ class LeagueBaselines:
         
         return percentile_ranks
     
+    def compare_player_id_to_league(self, player_id, season=2025, min_pa=100):
+        """
+        Compare a qualified player-season to the league in a single query
+        
+        The player's line is joined against the qualified league and every
+        metric's rank is a filtered COUNT, so all metrics come out of one
+        pass over the season's rows with no sorting and only one row comes
+        back. Percentile = share of qualified players strictly below,
+        matching get_player_percentile. Multi-team seasons use the stint
+        with the most PA.
+        
+        Returns:
+            dict with percentile rankings (same shape as compare_player_to_league)
+        """
+        metrics = list(self.COMPARE_METRICS)
+        
+        rank_columns = ",\n".join(
+            f"me.{metric}, COUNT(*) FILTER (WHERE league.{metric} < me.{metric}) * 100.0 "
+            f"/ NULLIF(COUNT(league.{metric}), 0) AS {metric}_pct"
+            for metric in metrics
+        )
+        
+        session = get_session()
+        
+        try:
+            query = text(f"""
+                WITH me AS (
+                    SELECT {', '.join(metrics)}
+                    FROM season_stats
+                    WHERE player_id = :player_id
+                      AND season = :season
+                      AND pa >= :min_pa
+                    ORDER BY pa DESC
+                    LIMIT 1
+                )
+                SELECT {rank_columns}
+                FROM me
+                JOIN season_stats league
+                  ON league.season = :season
+                 AND league.pa >= :min_pa
+                GROUP BY {', '.join(f'me.{metric}' for metric in metrics)}
+            """)
+            
+            row = session.execute(
+                query,
+                {'player_id': player_id, 'season': season, 'min_pa': min_pa}
+            ).mappings().first()
+        
+        finally:
+            session.close()
+        
+        percentile_ranks = {}
+        
+        if row is None:
+            return percentile_ranks
+        
+        for metric, display_name in self.COMPARE_METRICS.items():
+            if row[metric] is not None and row[f'{metric}_pct'] is not None:
+                percentile = round(row[f'{metric}_pct'])
+                percentile_ranks[display_name] = {
+                    'value': row[metric],
+                    'percentile': percentile,
+                    'tier': self._percentile_to_tier(percentile)
+                }
+        
+        return percentile_ranks
+    
     def _percentile_to_tier(self, percentile):
         """Convert percentile to tier description"""
         if percentile >= 90:
@@ -253,31 +404,12 @@ if __name__ == "__main__":
     
     session = get_session()
     result = session.execute(
-        text("""
-            SELECT 
-                p.name,
-                ss.wrc_plus, ss.babip, ss.bb_pct, ss.k_pct, 
-                ss.iso, ss.avg, ss.obp, ss.slg
-            FROM season_stats ss
-            JOIN players p ON ss.player_id = p.player_id
-            WHERE p.name = 'Harrison Bader' AND ss.season = 2024
-        """)
+        text("SELECT name, player_id FROM players WHERE name = 'Harrison Bader'")
     ).fetchone()
     session.close()
     
     if result:
-        player_stats = {
-            'wrc_plus': result[1],
-            'babip': result[2],
-            'bb_pct': result[3],
-            'k_pct': result[4],
-            'iso': result[5],
-            'avg': result[6],
-            'obp': result[7],
-            'slg': result[8]
-        }
-        
-        comparison = baselines.compare_player_to_league(player_stats, season=2024, min_pa=100)
+        comparison = baselines.compare_player_id_to_league(result[1], season=2024, min_pa=100)
         
         print(f"\n📊 {result[0]} vs 2024 League:")
         for metric, data in sorted(comparison.items(), key=lambda x: x[1]['percentile'], reverse=True):
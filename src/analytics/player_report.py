@@ -7,7 +7,11 @@ Combines:
 - League percentile rankings
 - Career trends
 """
+import io
+from functools import reduce
+
 import pandas as pd
+import numpy as np
 from sqlalchemy import text
 from src.utils.db_connection import get_session
 from src.analytics.role_classifier import RoleClassifier
@@ -19,85 +23,122 @@ class PlayerReport:
     Generate comprehensive analytics reports for players
     """
     
+    # Resolve the player, fetch the season line and the career totals through
+    # that season. Career aggregates are window functions over the player's
+    # rows, so they survive the outer filter to the requested season. season
+    # is NULL when the player exists but has no stats that year.
+    _Q_PLAYER_SEASON = text("""
+        WITH player AS (
+            SELECT player_id FROM players WHERE name = :name
+        ),
+        career AS (
+            SELECT 
+                ss.season,
+                ss.team, ss.games, ss.pa, ss.ab, ss.hits, ss.hr,
+                ss.avg, ss.obp, ss.slg, ss.woba, ss.wrc_plus, ss.babip,
+                ss.bb_pct, ss.k_pct, ss.iso, ss.hr_fb_pct,
+                COUNT(*) OVER w as seasons,
+                SUM(ss.pa) OVER w as career_pa,
+                AVG(ss.wrc_plus) OVER w as avg_wrc_plus,
+                MIN(ss.season) OVER w as debut,
+                MAX(ss.season) OVER w as last_season
+            FROM season_stats ss
+            JOIN player ON ss.player_id = player.player_id
+            WHERE ss.season <= :season
+            WINDOW w AS (PARTITION BY ss.player_id)
+        )
+        SELECT player.player_id, career.*
+        FROM player
+        LEFT JOIN career ON career.season = :season
+    """)
+    
+    _Q_TOP_PERFORMERS = text("""
+        SELECT 
+            p.name, ss.team, ss.wrc_plus, ss.pa,
+            ss.avg, ss.obp, ss.slg, ss.hr
+        FROM season_stats ss
+        JOIN players p ON ss.player_id = p.player_id
+        WHERE ss.season = :season
+          AND ss.pa >= :min_pa
+        ORDER BY ss.wrc_plus DESC
+        LIMIT :limit
+    """)
+    
+    # Report sections, in output order
+    SECTIONS = ('stats', 'role', 'percentiles', 'regression', 'career')
+    
     def __init__(self):
         self.classifier = RoleClassifier()
         self.detector = RegressionDetector()
         self.baselines = LeagueBaselines()
     
-    def generate_player_report(self, player_name, season=2024):
+    def generate_player_report(self, player_name, season=2024, sections=SECTIONS):
         """
         Generate a comprehensive report for a player's season
         
+        Args:
+            player_name: Player name
+            season: Season to report on
+            sections: Subset of SECTIONS to include. 'role', 'percentiles'
+                and 'regression' each cost extra queries, so stat-only
+                callers can skip them
+        
         Returns:
             Formatted report string
         """
+        data = self._fetch_player_data(player_name, season, sections)
+        
+        if isinstance(data, str):
+            return data
+        
+        return self._render_report(data)
+    
+    def _fetch_player_data(self, player_name, season, sections=SECTIONS):
+        """
+        Fetch everything the report needs, before any formatting
+        
+        The report session is closed as soon as the player row is read; the
+        classifier, baselines and detector manage their own sessions.
+        
+        Returns:
+            Dict of report inputs, or a message string if the player or
+            season is missing
+        """
         session = get_session()
         
         try:
-            # Get player ID
-            result = session.execute(
-                text("SELECT player_id FROM players WHERE name = :name"),
-                {'name': player_name}
-            ).fetchone()
-            
-            if not result:
-                return f"Player '{player_name}' not found in database"
-            
-            player_id = result[0]
-            
-            # Get season stats
-            stats_result = session.execute(
-                text("""
-                    SELECT 
-                        team, games, pa, ab, hits, hr,
-                        avg, obp, slg, woba, wrc_plus, babip,
-                        bb_pct, k_pct, iso, hr_fb_pct
-                    FROM season_stats
-                    WHERE player_id = :player_id AND season = :season
-                """),
-                {'player_id': player_id, 'season': season}
+            # Player, season line and career context in one round trip
+            row = session.execute(
+                self._Q_PLAYER_SEASON,
+                {'name': player_name, 'season': season}
             ).fetchone()
-            
-            if not stats_result:
-                return f"No {season} season data found for {player_name}"
-            
-            # Build report
-            report = []
-            report.append("=" * 70)
-            report.append(f"PLAYER ANALYTICS REPORT: {player_name} ({season})")
-            report.append("=" * 70)
-            
-            # Basic stats
-            report.append("\n📊 SEASON STATISTICS")
-            report.append(f"   Team: {stats_result[0]}")
-            report.append(f"   Games: {stats_result[1]} | PA: {stats_result[2]} | AB: {stats_result[3]}")
-            report.append(f"   Hits: {stats_result[4]} | HR: {stats_result[5]}")
-            
-            avg = stats_result[6] * 1000 if stats_result[6] else 0
-            obp = stats_result[7] * 1000 if stats_result[7] else 0
-            slg = stats_result[8] * 1000 if stats_result[8] else 0
-            report.append(f"   Slash: .{int(avg)}/{int(obp)}/{int(slg)}")
-            report.append(f"   wOBA: {stats_result[9]:.3f} | wRC+: {stats_result[10]}")
-            
-            # Advanced metrics
-            report.append("\n📈 ADVANCED METRICS")
-            report.append(f"   BABIP: {stats_result[11]:.3f}")
-            report.append(f"   BB%: {stats_result[12]*100:.1f}% | K%: {stats_result[13]*100:.1f}%")
-            report.append(f"   ISO: {stats_result[14]:.3f}")
-            if stats_result[15]:
-                report.append(f"   HR/FB: {stats_result[15]:.1f}%")
-            
-            # Role classification
-            role_result = self.classifier.classify_season(
+        finally:
+            session.close()
+        
+        if not row:
+            return f"Player '{player_name}' not found in database"
+        
+        player_id = row[0]
+        
+        if row[1] is None:
+            return f"No {season} season data found for {player_name}"
+        
+        stats_result = row[2:18]
+        
+        data = {
+            'player_name': player_name,
+            'season': season,
+            'sections': sections,
+            'stats': stats_result,
+            'career': row[18:],
+        }
+        
+        if 'role' in sections:
+            data['role'] = self.classifier.classify_season(
                 player_id, season, stats_result[1], stats_result[2]
             )
-            report.append("\n🎯 ROLE CLASSIFICATION")
-            report.append(f"   Role: {role_result['role']}")
-            report.append(f"   Confidence: {role_result['confidence']*100:.0f}%")
-            report.append(f"   PA per Team Game: {role_result['pa_per_team_game']:.2f}")
-            report.append(f"   Games Played: {role_result['games_played_pct']*100:.1f}%")
-            
-            # League percentiles
+        
+        if 'percentiles' in sections:
             player_stats = {
                 'wrc_plus': stats_result[10],
                 'babip': stats_result[11],
@@ -109,18 +150,77 @@ class PlayerReport:
                 'slg': stats_result[8]
             }
             
-            percentiles = self.baselines.compare_player_to_league(
+            data['percentiles'] = self.baselines.compare_player_to_league(
                 player_stats, season=season, min_pa=100
             )
+        
+        if 'regression' in sections:
+            data['regression'] = self.detector.analyze_player_season(player_id, season)
+        
+        return data
+    
+    def _render_report(self, data):
+        """
+        Format fetched report data (see _fetch_player_data)
+        
+        Returns:
+            Formatted report string
+        """
+        player_name = data['player_name']
+        season = data['season']
+        sections = data['sections']
+        stats_result = data['stats']
+        career_result = data['career']
+        
+        # Build report
+        buf = io.StringIO()
+        w = buf.write
+        w("=" * 70 + "\n")
+        w(f"PLAYER ANALYTICS REPORT: {player_name} ({season})\n")
+        w("=" * 70 + "\n")
+        
+        # Basic stats
+        if 'stats' in sections:
+            w("\n📊 SEASON STATISTICS\n")
+            w(f"   Team: {stats_result[0]}\n")
+            w(f"   Games: {stats_result[1]} | PA: {stats_result[2]} | AB: {stats_result[3]}\n")
+            w(f"   Hits: {stats_result[4]} | HR: {stats_result[5]}\n")
+            
+            avg = stats_result[6] * 1000 if stats_result[6] else 0
+            obp = stats_result[7] * 1000 if stats_result[7] else 0
+            slg = stats_result[8] * 1000 if stats_result[8] else 0
+            w(f"   Slash: .{int(avg)}/{int(obp)}/{int(slg)}\n")
+            w(f"   wOBA: {stats_result[9]:.3f} | wRC+: {stats_result[10]}\n")
+            
+            # Advanced metrics
+            w("\n📈 ADVANCED METRICS\n")
+            w(f"   BABIP: {stats_result[11]:.3f}\n")
+            w(f"   BB%: {stats_result[12]*100:.1f}% | K%: {stats_result[13]*100:.1f}%\n")
+            w(f"   ISO: {stats_result[14]:.3f}\n")
+            if stats_result[15]:
+                w(f"   HR/FB: {stats_result[15]:.1f}%\n")
+        
+        # Role classification
+        if 'role' in sections:
+            role_result = data['role']
+            w("\n🎯 ROLE CLASSIFICATION\n")
+            w(f"   Role: {role_result['role']}\n")
+            w(f"   Confidence: {role_result['confidence']*100:.0f}%\n")
+            w(f"   PA per Team Game: {role_result['pa_per_team_game']:.2f}\n")
+            w(f"   Games Played: {role_result['games_played_pct']*100:.1f}%\n")
+        
+        # League percentiles
+        if 'percentiles' in sections:
+            percentiles = data['percentiles']
             
-            report.append("\n📊 LEAGUE PERCENTILE RANKINGS")
-            for metric, data in sorted(percentiles.items(), 
-                                      key=lambda x: x[1]['percentile'], 
+            w("\n📊 LEAGUE PERCENTILE RANKINGS\n")
+            for metric, ranking in sorted(percentiles.items(),
+                                      key=lambda x: x[1]['percentile'],
                                       reverse=True):
-                val = data['value']
-                pct = data['percentile']
-                tier = data['tier']
-                
+                val = ranking['value']
+                pct = ranking['percentile']
+                tier = ranking['tier']
+            
                 # Format value
                 if metric in ['AVG', 'OBP', 'SLG', 'BABIP', 'ISO']:
                     val_str = f"{val:.3f}"
@@ -128,53 +228,37 @@ class PlayerReport:
                     val_str = f"{val*100:.1f}%"
                 else:
                     val_str = f"{val:.0f}"
-                
-                report.append(f"   {metric:8s}: {val_str:>7s} - {pct:3d}th %ile ({tier})")
             
-            # Regression analysis
-            regression = self.detector.analyze_player_season(player_id, season)
+                w(f"   {metric:8s}: {val_str:>7s} - {pct:3d}th %ile ({tier})\n")
+        
+        # Regression analysis
+        if 'regression' in sections:
+            regression = data['regression']
             
             if regression and regression['alerts']:
-                report.append("\n🚨 REGRESSION ALERTS")
-                report.append(f"   Net Signal: {regression['net_signal']} " +
-                            f"({regression['buy_signals']} BUY, {regression['sell_signals']} SELL)")
-                
+                w("\n🚨 REGRESSION ALERTS\n")
+                w(f"   Net Signal: {regression['net_signal']} " +
+                  f"({regression['buy_signals']} BUY, {regression['sell_signals']} SELL)\n")
+            
                 for alert in sorted(regression['alerts'], key=lambda x: x['tier']):
                     tier_emoji = "🔴" if alert['tier'] == 1 else "🟡" if alert['tier'] == 2 else "🟢"
-                    report.append(f"   {tier_emoji} TIER {alert['tier']} {alert['metric']:8s} - " +
-                                f"{alert['signal']:4s}: {alert['message']}")
+                    w(f"   {tier_emoji} TIER {alert['tier']} {alert['metric']:8s} - " +
+                      f"{alert['signal']:4s}: {alert['message']}\n")
             else:
-                report.append("\n✅ NO REGRESSION ALERTS")
-                report.append("   Performance aligns with career baseline")
-            
-            # Career context
-            career_result = session.execute(
-                text("""
-                    SELECT 
-                        COUNT(*) as seasons,
-                        SUM(pa) as career_pa,
-                        AVG(wrc_plus) as avg_wrc_plus,
-                        MIN(season) as debut,
-                        MAX(season) as last_season
-                    FROM season_stats
-                    WHERE player_id = :player_id
-                      AND season <= :season
-                """),
-                {'player_id': player_id, 'season': season}
-            ).fetchone()
-            
-            report.append("\n📜 CAREER CONTEXT")
-            report.append(f"   MLB Seasons: {career_result[0]}")
-            report.append(f"   Career PA: {career_result[1]}")
-            report.append(f"   Career Avg wRC+: {career_result[2]:.0f}")
-            report.append(f"   Debut: {career_result[3]} | Through: {career_result[4]}")
-            
-            report.append("\n" + "=" * 70)
-            
-            return "\n".join(report)
+                w("\n✅ NO REGRESSION ALERTS\n")
+                w("   Performance aligns with career baseline\n")
         
-        finally:
-            session.close()
+        # Career context
+        if 'career' in sections:
+            w("\n📜 CAREER CONTEXT\n")
+            w(f"   MLB Seasons: {career_result[0]}\n")
+            w(f"   Career PA: {career_result[1]}\n")
+            w(f"   Career Avg wRC+: {career_result[2]:.0f}\n")
+            w(f"   Debut: {career_result[3]} | Through: {career_result[4]}\n")
+        
+        w("\n" + "=" * 70)
+        
+        return buf.getvalue()
     
     def generate_top_performers_report(self, season=2025, min_pa=200, top_n=10):
         """
@@ -183,20 +267,8 @@ class PlayerReport:
         session = get_session()
         
         try:
-            query = text("""
-                SELECT 
-                    p.name, ss.team, ss.wrc_plus, ss.pa,
-                    ss.avg, ss.obp, ss.slg, ss.hr
-                FROM season_stats ss
-                JOIN players p ON ss.player_id = p.player_id
-                WHERE ss.season = :season
-                  AND ss.pa >= :min_pa
-                ORDER BY ss.wrc_plus DESC
-                LIMIT :limit
-            """)
-            
             results = session.execute(
-                query,
+                self._Q_TOP_PERFORMERS,
                 {'season': season, 'min_pa': min_pa, 'limit': top_n}
             ).fetchall()
             
@@ -207,15 +279,33 @@ class PlayerReport:
             report.append(f"\n{'Rank':<6}{'Player':<20}{'Team':<6}{'wRC+':<8}{'PA':<8}{'AVG/OBP/SLG':<20}{'HR':<6}")
             report.append("-" * 70)
             
-            for i, row in enumerate(results, 1):
-                name = row[0][:18]
-                team = row[1]
-                wrc_plus = row[2]
-                pa = row[3]
-                slash = f".{int(row[4]*1000)}/{int(row[5]*1000)}/{int(row[6]*1000)}"
-                hr = row[7]
+            if results:
+                # Format column-wise, then join the rows once
+                names, teams, wrc_plus, pas, avgs, obps, slgs, hrs = (
+                    np.array(col) for col in zip(*results)
+                )
+                
+                # Rate stats are DECIMAL(5,3), so x1000 is integral; rint
+                # guards against float representation error
+                avg_i, obp_i, slg_i = (
+                    np.rint(np.asarray(col, dtype=float) * 1000).astype(int)
+                    for col in (avgs, obps, slgs)
+                )
+                slash = reduce(np.char.add, [
+                    '.', avg_i.astype(str), '/', obp_i.astype(str), '/', slg_i.astype(str)
+                ])
+                
+                columns = [
+                    np.char.ljust(np.arange(1, len(results) + 1).astype(str), 6),
+                    np.char.ljust(names.astype('<U18'), 20),
+                    np.char.ljust(teams.astype(str), 6),
+                    np.char.ljust(np.char.mod('%.0f', wrc_plus.astype(float)), 8),
+                    np.char.ljust(pas.astype(str), 8),
+                    np.char.ljust(slash, 20),
+                    np.char.ljust(hrs.astype(str), 6),
+                ]
                 
-                report.append(f"{i:<6}{name:<20}{team:<6}{wrc_plus:<8.0f}{pa:<8}{slash:<20}{hr:<6}")
+                report.append("\n".join(reduce(np.char.add, columns)))
             
             report.append("=" * 70)
             
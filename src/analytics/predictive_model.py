@@ -10,7 +10,7 @@ Enhanced with:
 """
 import pandas as pd
 import numpy as np
-from sqlalchemy import text
+from sqlalchemy import text, bindparam
 from src.utils.db_connection import get_session
 from src.analytics.trend_tracker import TrendTracker
 from src.analytics.regression_detector import RegressionDetector
@@ -20,40 +20,141 @@ class AdvancedPerformancePredictor:
     Enhanced prediction model with aging curves and peripheral stats
     """
     
-    def _to_float(self, value):
-        """Convert Decimal or None to float"""
-        if value is None:
-            return None
-        return float(value)
+    # Recency weights for the wRC+ baseline (0.5/0.3/0.2), renormalized for
+    # players with fewer than three qualifying seasons. WEIGHT_TABLE holds the
+    # same vectors zero-padded to three, one row per season count.
+    WEIGHTS = {
+        1: np.array([1.0]),
+        2: np.array([0.5, 0.3]) / 0.8,
+        3: np.array([0.5, 0.3, 0.2]),
+    }
+    WEIGHT_TABLE = np.vstack([
+        np.pad(WEIGHTS[1], (0, 2)),
+        np.pad(WEIGHTS[2], (0, 1)),
+        WEIGHTS[3],
+    ])
+    
+    _Q_PLAYER_ID = text("SELECT player_id FROM players WHERE name = :name")
+    
+    _Q_PLAYER_IDS = text(
+        "SELECT player_id, name FROM players WHERE name IN :names"
+    ).bindparams(bindparam('names', expanding=True))
+    
+    # Last three 100+ PA seasons, most recent (then largest stint) first
+    _Q_RECENT = text("""
+        SELECT 
+            ss.season, ss.wrc_plus,
+            CAST(ss.babip AS DOUBLE PRECISION),
+            CAST(ss.k_pct AS DOUBLE PRECISION),
+            CAST(ss.bb_pct AS DOUBLE PRECISION),
+            CAST(ss.iso AS DOUBLE PRECISION),
+            CAST(ss.hr_fb_pct AS DOUBLE PRECISION),
+            ss.pa,
+            CASE 
+                WHEN p.birth_date IS NOT NULL 
+                THEN ss.season - EXTRACT(YEAR FROM p.birth_date)
+                ELSE NULL 
+            END as age
+        FROM season_stats ss
+        JOIN players p ON ss.player_id = p.player_id
+        WHERE ss.player_id = :player_id
+          AND ss.season <= :season
+          AND ss.pa >= 100
+        ORDER BY ss.season DESC, ss.pa DESC
+        LIMIT 3
+    """)
+    
+    # Same rows as _Q_RECENT for several players at once
+    _Q_RECENT_BATCH = text("""
+        SELECT player_id, season, wrc_plus, babip, k_pct, bb_pct,
+               iso, hr_fb_pct, pa, age
+        FROM (
+            SELECT 
+                ss.player_id, ss.season, ss.wrc_plus,
+                CAST(ss.babip AS DOUBLE PRECISION) as babip,
+                CAST(ss.k_pct AS DOUBLE PRECISION) as k_pct,
+                CAST(ss.bb_pct AS DOUBLE PRECISION) as bb_pct,
+                CAST(ss.iso AS DOUBLE PRECISION) as iso,
+                CAST(ss.hr_fb_pct AS DOUBLE PRECISION) as hr_fb_pct,
+                ss.pa,
+                CASE 
+                    WHEN p.birth_date IS NOT NULL 
+                    THEN ss.season - EXTRACT(YEAR FROM p.birth_date)
+                    ELSE NULL 
+                END as age,
+                ROW_NUMBER() OVER (
+                    PARTITION BY ss.player_id ORDER BY ss.season DESC, ss.pa DESC
+                ) as recency
+            FROM season_stats ss
+            JOIN players p ON ss.player_id = p.player_id
+            WHERE ss.player_id IN :player_ids
+              AND ss.season <= :season
+              AND ss.pa >= 100
+        ) recent
+        WHERE recency <= 3
+        ORDER BY player_id, recency
+    """).bindparams(bindparam('player_ids', expanding=True))
     
     def __init__(self):
         self.tracker = TrendTracker()
         self.detector = RegressionDetector()
         
-        # MLB average aging curve (empirically derived)
+        # player name -> player_id, filled as names are resolved
+        self._player_ids = {}
+        
+        # MLB average aging curve (empirically derived), indexed by
+        # age - AGE_CURVE_START. Ages outside 21-40 clamp to the ends.
         # Performance typically peaks at 27-28, then declines
-        self.AGE_CURVE = {
-            21: -8,   # Young, still developing
-            22: -5,
-            23: -3,
-            24: -1,
-            25: 0,
-            26: 1,
-            27: 2,    # Peak years
-            28: 2,
-            29: 1,
-            30: 0,    # Start of decline
-            31: -1,
-            32: -2,
-            33: -3,
-            34: -5,
-            35: -7,
-            36: -10,
-            37: -13,
-            38: -16,
-            39: -20,
-            40: -25
-        }
+        self.AGE_CURVE_START = 21
+        self.AGE_CURVE = np.array([
+            -8,   # 21: Young, still developing
+            -5,   # 22
+            -3,   # 23
+            -1,   # 24
+            0,    # 25
+            1,    # 26
+            2,    # 27: Peak years
+            2,    # 28
+            1,    # 29
+            0,    # 30: Start of decline
+            -1,   # 31
+            -2,   # 32
+            -3,   # 33
+            -5,   # 34
+            -7,   # 35
+            -10,  # 36
+            -13,  # 37
+            -16,  # 38
+            -20,  # 39
+            -25,  # 40
+        ], dtype=np.int8)
+    
+    def _resolve_player_id(self, player_name):
+        """
+        Look up a player's id by name, remembering hits
+        
+        Returns:
+            player_id or None if not found
+        """
+        if player_name in self._player_ids:
+            return self._player_ids[player_name]
+        
+        session = get_session()
+        
+        try:
+            result = session.execute(
+                self._Q_PLAYER_ID,
+                {'name': player_name}
+            ).fetchone()
+        finally:
+            session.close()
+        
+        # Misses aren't cached so newly loaded players are found next time
+        if not result:
+            return None
+        
+        self._player_ids[player_name] = result[0]
+        return result[0]
     
     def get_age_adjustment(self, current_age, next_age):
         """
@@ -65,10 +166,11 @@ class AdvancedPerformancePredictor:
         if not current_age or not next_age:
             return 0
         
-        current_adj = self.AGE_CURVE.get(int(current_age), -25 if current_age > 40 else -8)
-        next_adj = self.AGE_CURVE.get(int(next_age), -25 if next_age > 40 else -8)
+        last = len(self.AGE_CURVE) - 1
+        current_idx = min(max(int(current_age) - self.AGE_CURVE_START, 0), last)
+        next_idx = min(max(int(next_age) - self.AGE_CURVE_START, 0), last)
         
-        return next_adj - current_adj
+        return int(self.AGE_CURVE[next_idx]) - int(self.AGE_CURVE[current_idx])
     
     def calculate_plate_discipline_score(self, k_pct, bb_pct, career_k_pct, career_bb_pct):
         """
@@ -80,7 +182,7 @@ class AdvancedPerformancePredictor:
         Returns:
             Adjustment points and confidence
         """
-        if not all([k_pct, bb_pct, career_k_pct, career_bb_pct]):
+        if k_pct is None or bb_pct is None or career_k_pct is None or career_bb_pct is None:
             return 0, 'NONE'
         
         # K% change (lower is better)
@@ -115,7 +217,7 @@ class AdvancedPerformancePredictor:
         Returns:
             Adjustment points and flags
         """
-        if not all([iso, career_iso]):
+        if iso is None or career_iso is None:
             return 0, []
         
         iso_delta = iso - career_iso
@@ -132,7 +234,7 @@ class AdvancedPerformancePredictor:
             adjustment = -3
         
         # HR/FB% check (if available)
-        if hr_fb_pct and career_hr_fb_pct:
+        if hr_fb_pct is not None and career_hr_fb_pct is not None:
             hr_fb_delta = hr_fb_pct - career_hr_fb_pct
             
             if hr_fb_delta > 8:
@@ -155,7 +257,7 @@ class AdvancedPerformancePredictor:
         Returns:
             Adjustment and interpretation
         """
-        if not all([babip, career_babip, iso, career_iso]):
+        if babip is None or career_babip is None or iso is None or career_iso is None:
             return 0, 'UNKNOWN'
         
         babip_delta = babip - career_babip
@@ -184,25 +286,27 @@ class AdvancedPerformancePredictor:
         
         return 0, 'NEUTRAL'
     
-    def detect_skill_change(self, recent_seasons_df):
+    def detect_skill_change(self, recent_trends):
         """
         Detect genuine skill changes vs random variance
         
         Uses 3+ seasons to identify trends
         
+        Args:
+            recent_trends: (n, 3) float array of K%, BB%, ISO per season,
+                most recent first
+        
         Returns:
             Dict with skill change indicators
         """
-        if len(recent_seasons_df) < 3:
+        if len(recent_trends) < 3:
             return {'genuine_change': False}
         
-        # Check for consistent trends across multiple metrics
-        k_trend = np.polyfit(range(len(recent_seasons_df)), 
-                            recent_seasons_df['k_pct'], 1)[0]
-        bb_trend = np.polyfit(range(len(recent_seasons_df)), 
-                             recent_seasons_df['bb_pct'], 1)[0]
-        iso_trend = np.polyfit(range(len(recent_seasons_df)), 
-                              recent_seasons_df['iso'], 1)[0]
+        # Check for consistent trends across multiple metrics.
+        # Least-squares slope against x = 0..n-1 for all three at once:
+        # with x centered, slope = x·y / x·x (no polyfit/lstsq needed)
+        x = np.arange(len(recent_trends)) - (len(recent_trends) - 1) / 2
+        k_trend, bb_trend, iso_trend = (x @ recent_trends) / (x @ x)
         
         # Significant trends
         significant_k = abs(k_trend) > 1.5  # 1.5% K% change per year
@@ -232,229 +336,543 @@ class AdvancedPerformancePredictor:
         
         try:
             # Get recent performance (3 years)
-            query = text("""
-                SELECT 
-                    ss.season, ss.wrc_plus, ss.babip, ss.k_pct, ss.bb_pct, 
-                    ss.iso, ss.hr_fb_pct, ss.pa,
-                    CASE 
-                        WHEN p.birth_date IS NOT NULL 
-                        THEN ss.season - EXTRACT(YEAR FROM p.birth_date)
-                        ELSE NULL 
-                    END as age
-                FROM season_stats ss
-                JOIN players p ON ss.player_id = p.player_id
-                WHERE ss.player_id = :player_id
-                  AND ss.season <= :season
-                  AND ss.pa >= 100
-                ORDER BY ss.season DESC
-                LIMIT 3
-            """)
-            
-            recent = pd.read_sql(query, session.bind, 
-                               params={'player_id': player_id, 'season': current_season})
-            
-            if recent.empty:
-                return None
-            
-            # Get career baseline
-            career_baseline = self.detector._get_player_career_baseline(player_id, current_season)
-            
-            if not career_baseline:
-                return None
-            
-            # Calculate weighted baseline (more weight to recent)
-            weights = np.array([0.5, 0.3, 0.2])[:len(recent)]
-            weights = weights / weights.sum()
-            
-            baseline_wrc = (recent['wrc_plus'] * weights).sum()
-            current_age = recent.iloc[0]['age']
-            next_age = current_age + 1 if current_age else None
-            
-            # Component 1: Age Adjustment
-            age_adj = self.get_age_adjustment(current_age, next_age)
-            
-            # Get latest season values
-            latest = recent.iloc[0]
-            
-            # Convert to floats to avoid Decimal issues
-            latest_k_pct = self._to_float(latest['k_pct'])
-            latest_bb_pct = self._to_float(latest['bb_pct'])
-            latest_iso = self._to_float(latest['iso'])
-            latest_hr_fb_pct = self._to_float(latest['hr_fb_pct'])
-            latest_babip = self._to_float(latest['babip'])
-            
-            career_k_pct = self._to_float(career_baseline['career_k_pct'])
-            career_bb_pct = self._to_float(career_baseline['career_bb_pct'])
-            career_iso = self._to_float(career_baseline['career_iso'])
-            career_hr_fb_pct = self._to_float(career_baseline['career_hr_fb_pct'])
-            career_babip = self._to_float(career_baseline['career_babip'])
-            
-            # Component 2: Plate Discipline
-            discipline_adj, discipline_conf = self.calculate_plate_discipline_score(
-                latest_k_pct, latest_bb_pct,
-                career_k_pct, career_bb_pct
-            )
-            
-            # Component 3: Power Sustainability
-            power_adj, power_flags = self.calculate_power_sustainability_score(
-                latest_iso, latest_hr_fb_pct,
-                career_iso, career_hr_fb_pct
-            )
-            
-            # Component 4: Contact Quality
-            contact_adj, contact_type = self.calculate_contact_quality_score(
-                latest_babip, career_babip,
-                latest_iso, career_iso
-            )
-            
-            # Component 5: Skill Change Detection
-            skill_change = self.detect_skill_change(recent)
-            
-            skill_adj = 0
-            if skill_change['genuine_change']:
-                if skill_change['improving']:
-                    skill_adj = +5
-                elif skill_change['declining']:
-                    skill_adj = -5
-            
-            # Component 6: Traditional Regression Signals
-            regression_adj = 0
-            latest_season = int(recent.iloc[0]['season'])
-            regression_analysis = self.detector.analyze_player_season(player_id, latest_season)
-            
-            if regression_analysis and regression_analysis['alerts']:
-                tier1_buys = len([a for a in regression_analysis['alerts'] 
-                                 if a['tier'] == 1 and a['signal'] == 'BUY'])
-                tier1_sells = len([a for a in regression_analysis['alerts'] 
-                                  if a['tier'] == 1 and a['signal'] == 'SELL'])
-                
-                regression_adj = (tier1_buys * 4) - (tier1_sells * 4)
-            
-            # Calculate final prediction
-            predicted_wrc = (
-                baseline_wrc + 
-                age_adj + 
-                discipline_adj + 
-                power_adj + 
-                contact_adj + 
-                skill_adj +
-                regression_adj
-            )
-            
-            # Calculate confidence
-            total_pa = recent['pa'].sum()
-            wrc_std = recent['wrc_plus'].std()
-            age_certainty = current_age is not None
-            
-            if total_pa >= 1200 and wrc_std < 15 and age_certainty:
-                confidence = 'HIGH'
-            elif total_pa >= 600 and age_certainty:
-                confidence = 'MEDIUM'
-            else:
-                confidence = 'LOW'
-            
-            # Calculate prediction range (±1 standard deviation)
-            prediction_std = max(wrc_std, 10)  # Minimum 10 point uncertainty
-            lower_bound = predicted_wrc - prediction_std
-            upper_bound = predicted_wrc + prediction_std
-            
-            return {
-                'predicted_wrc': round(predicted_wrc),
-                'prediction_range': (round(lower_bound), round(upper_bound)),
-                'baseline_wrc': round(baseline_wrc),
-                'current_age': int(current_age) if current_age else None,
-                'next_age': int(next_age) if next_age else None,
-                
-                # Component adjustments
-                'age_adjustment': round(age_adj),
-                'discipline_adjustment': discipline_adj,
-                'power_adjustment': power_adj,
-                'contact_adjustment': contact_adj,
-                'skill_change_adjustment': skill_adj,
-                'regression_adjustment': regression_adj,
-                
-                # Flags and metadata
-                'power_flags': power_flags,
-                'contact_type': contact_type,
-                'skill_change': skill_change,
-                'discipline_confidence': discipline_conf,
-                'confidence': confidence,
-                'sample_size_pa': int(total_pa),
-                'recent_seasons': len(recent)
-            }
-        
+            recent = session.execute(
+                self._Q_RECENT, {'player_id': player_id, 'season': current_season}
+            ).fetchall()
         finally:
+            # Release the connection before the detector calls and model math
             session.close()
+        
+        if not recent:
+            return None
+        
+        # Get career baseline
+        career_baseline = self.detector._get_player_career_baseline(player_id, current_season)
+        
+        if not career_baseline:
+            return None
+        
+        latest_season = int(recent[0][0])
+        regression_analysis = self.detector.analyze_player_season(player_id, latest_season)
+        
+        return self._build_prediction(recent, career_baseline, regression_analysis)
     
-    def generate_prediction_report(self, player_name, current_season=2025):
+    def predict_batch(self, player_names, current_season=2025):
         """
-        Generate detailed prediction report for a player
+        Predict next season for several players by name
+        
+        Resolves names in one query, then runs predict_batch_advanced.
+        
+        Returns:
+            Dict of player name -> prediction dict (same shape as
+            predict_next_season_advanced), or None if the player is unknown
+            or has insufficient data
+        """
+        predictions = {name: None for name in player_names}
+        unresolved = [name for name in player_names if name not in self._player_ids]
+        
+        if unresolved:
+            session = get_session()
+            
+            try:
+                id_rows = session.execute(
+                    self._Q_PLAYER_IDS,
+                    {'names': unresolved}
+                ).fetchall()
+            finally:
+                session.close()
+            
+            for player_id, name in id_rows:
+                self._player_ids.setdefault(name, player_id)
+        
+        player_ids = {
+            name: self._player_ids[name]
+            for name in player_names if name in self._player_ids
+        }
+        
+        if not player_ids:
+            return predictions
+        
+        batch = self.predict_batch_advanced(list(player_ids.values()), current_season)
+        rows = batch.to_dict('index')
+        
+        for name, player_id in player_ids.items():
+            if player_id in rows:
+                predictions[name] = self._prediction_from_row(rows[player_id])
+        
+        return predictions
+    
+    def predict_batch_advanced(self, player_ids, current_season=2025):
+        """
+        Vectorized next-season predictions for many players
+        
+        Same model as predict_next_season_advanced, evaluated as NumPy array
+        operations across all players: one query for recent seasons, one
+        rollup lookup for career baselines and no per-player detector calls.
+        Regression signals are checked on the same (largest) latest-season
+        stint the rest of the prediction uses.
+        
+        Returns:
+            DataFrame indexed by player_id; players with no qualifying
+            seasons or under 200 career PA are omitted
         """
+        player_ids = list(player_ids)
+        
+        if not player_ids:
+            return pd.DataFrame()
+        
         session = get_session()
         
         try:
-            result = session.execute(
-                text("SELECT player_id FROM players WHERE name = :name"),
-                {'name': player_name}
-            ).fetchone()
-            
-            if not result:
-                return f"Player '{player_name}' not found"
-            
-            player_id = result[0]
-            pred = self.predict_next_season_advanced(player_id, current_season)
-            
-            if not pred:
-                return f"Insufficient data for {player_name}"
-            
-            # Build report
-            report = []
-            report.append("=" * 70)
-            report.append(f"ADVANCED PREDICTION: {player_name} ({current_season + 1})")
-            report.append("=" * 70)
-            
-            report.append(f"\n📊 PREDICTION:")
-            report.append(f"   Projected wRC+: {pred['predicted_wrc']}")
-            report.append(f"   Range (±1σ): {pred['prediction_range'][0]}-{pred['prediction_range'][1]}")
-            report.append(f"   Baseline (3-yr): {pred['baseline_wrc']}")
-            report.append(f"   Confidence: {pred['confidence']}")
-            
-            report.append(f"\n👤 AGE PROFILE:")
-            report.append(f"   Current Age: {pred['current_age']}")
-            report.append(f"   Next Season Age: {pred['next_age']}")
-            report.append(f"   Age Adjustment: {pred['age_adjustment']:+d} wRC+")
-            
-            report.append(f"\n🎯 COMPONENT BREAKDOWN:")
-            report.append(f"   Plate Discipline: {pred['discipline_adjustment']:+d} wRC+ ({pred['discipline_confidence']} confidence)")
-            report.append(f"   Power Sustainability: {pred['power_adjustment']:+d} wRC+")
-            report.append(f"   Contact Quality: {pred['contact_adjustment']:+d} wRC+ ({pred['contact_type']})")
-            report.append(f"   Skill Change: {pred['skill_change_adjustment']:+d} wRC+")
-            report.append(f"   Regression Signals: {pred['regression_adjustment']:+d} wRC+")
-            
-            if pred['power_flags']:
-                report.append(f"\n⚠️  POWER FLAGS:")
-                for flag in pred['power_flags']:
-                    report.append(f"   - {flag}")
-            
-            if pred['skill_change']['genuine_change']:
-                report.append(f"\n📈 SKILL CHANGE DETECTED:")
-                sc = pred['skill_change']
-                report.append(f"   K% Trend: {sc['k_trend']:.2f}% per year")
-                report.append(f"   BB% Trend: {sc['bb_trend']:.2f}% per year")
-                report.append(f"   ISO Trend: {sc['iso_trend']:.3f} per year")
-                trend_dir = "Improving" if sc['improving'] else "Declining" if sc['declining'] else "Stable"
-                report.append(f"   Overall: {trend_dir}")
-            
-            report.append(f"\n📊 SAMPLE:")
-            report.append(f"   Total PA (3yr): {pred['sample_size_pa']}")
-            report.append(f"   Seasons: {pred['recent_seasons']}")
-            
-            report.append("\n" + "=" * 70)
-            
-            return "\n".join(report)
-        
+            rows = session.execute(
+                self._Q_RECENT_BATCH,
+                {'player_ids': player_ids, 'season': current_season}
+            ).fetchall()
         finally:
             session.close()
+        
+        if not rows:
+            return pd.DataFrame()
+        
+        # (player_id, season, wrc_plus, babip, k_pct, bb_pct, iso, hr_fb_pct, pa, age);
+        # NULLs become NaN. Rows are ordered by player, most recent first, so
+        # they scatter into a (players, 3 seasons, 9 columns) block.
+        data = np.array(rows, dtype=float)
+        ids, first, group = np.unique(data[:, 0], return_index=True, return_inverse=True)
+        position = np.arange(len(data)) - first[group]
+        
+        recent = np.full((len(ids), 3, data.shape[1] - 1), np.nan)
+        recent[group, position] = data[:, 1:]
+        n = np.bincount(group)
+        
+        # Career baselines as of current_season; players without one are dropped
+        ids = ids.astype(int).tolist()
+        career_cols = ['career_babip', 'career_k_pct', 'career_bb_pct',
+                       'career_iso', 'career_hr_fb_pct']
+        
+        def baseline_matrix(baselines, player_ids):
+            return np.array([
+                [baselines[p][col] for col in career_cols] if baselines[p] else [np.nan] * 5
+                for p in player_ids
+            ], dtype=float)
+        
+        baselines = self.detector._get_career_baselines(ids, current_season)
+        keep = np.array([baselines[p] is not None for p in ids])
+        
+        if not keep.any():
+            return pd.DataFrame()
+        
+        ids = [p for p, k in zip(ids, keep) if k]
+        recent, n = recent[keep], n[keep]
+        career = baseline_matrix(baselines, ids)
+        
+        season, wrc, babip, k_pct, bb_pct, iso, hr_fb, pa, age = np.moveaxis(recent, 2, 0)
+        latest = recent[:, 0]
+        valid = np.arange(3) < n[:, None]
+        career_babip, career_k, career_bb, career_iso, career_hr_fb = career.T
+        
+        # Weighted baseline (more weight to recent), one weight row per n.
+        # NULL wRC+ seasons add nothing, as in the per-player path
+        has_wrc = valid & ~np.isnan(wrc)
+        wrc_filled = np.where(has_wrc, wrc, 0.0)
+        baseline_wrc = (wrc_filled * self.WEIGHT_TABLE[n - 1]).sum(axis=1)
+        
+        # Component 1: Age Adjustment
+        current_age = age[:, 0]
+        has_age = ~np.isnan(current_age) & (current_age != 0)
+        last = len(self.AGE_CURVE) - 1
+        current_idx = np.clip(np.nan_to_num(current_age).astype(int) - self.AGE_CURVE_START, 0, last)
+        next_idx = np.clip(np.nan_to_num(current_age + 1).astype(int) - self.AGE_CURVE_START, 0, last)
+        age_adj = np.where(
+            has_age,
+            self.AGE_CURVE[next_idx].astype(int) - self.AGE_CURVE[current_idx].astype(int),
+            0
+        )
+        
+        # Component 2: Plate Discipline
+        k_delta = k_pct[:, 0] - career_k
+        bb_delta = bb_pct[:, 0] - career_bb
+        has_discipline = ~(np.isnan(k_delta) | np.isnan(bb_delta))
+        discipline_adj = np.where(has_discipline, np.rint(-k_delta * 2 + bb_delta * 2), 0).astype(int)
+        discipline_conf = np.select(
+            [~has_discipline,
+             (np.abs(k_delta) >= 3) | (np.abs(bb_delta) >= 2),
+             (np.abs(k_delta) >= 1.5) | (np.abs(bb_delta) >= 1)],
+            ['NONE', 'HIGH', 'MEDIUM'],
+            'LOW'
+        )
+        
+        # Component 3: Power Sustainability
+        iso_delta = iso[:, 0] - career_iso
+        hr_fb_delta = hr_fb[:, 0] - career_hr_fb
+        has_power = ~np.isnan(iso_delta)
+        power_spike = iso_delta > 0.060
+        power_decline = iso_delta < -0.060
+        hr_fb_inflated = has_power & (hr_fb_delta > 8)
+        hr_fb_depressed = has_power & (hr_fb_delta < -8)
+        power_adj = (np.select([power_spike, power_decline], [-5, -3], 0)
+                     - 3 * hr_fb_inflated + 3 * hr_fb_depressed)
+        
+        # Component 4: Contact Quality
+        babip_delta = babip[:, 0] - career_babip
+        has_contact = ~(np.isnan(babip_delta) | np.isnan(iso_delta))
+        high_babip = babip_delta > 0.040
+        low_babip = babip_delta < -0.040
+        contact_cases = [
+            ~has_contact,
+            high_babip & (iso_delta < -0.030),
+            high_babip & (iso_delta > 0.030),
+            high_babip,
+            low_babip & (iso_delta > 0.030),
+            low_babip,
+        ]
+        contact_adj = np.select(contact_cases, [0, -7, 3, -4, 7, 5], 0)
+        contact_type = np.select(
+            contact_cases,
+            ['UNKNOWN', 'LUCKY_SINGLES', 'IMPROVED_CONTACT', 'BABIP_DRIVEN', 'UNLUCKY_POWER', 'UNLUCKY'],
+            'NEUTRAL'
+        )
+        
+        # Component 5: Skill Change Detection. With three seasons and x
+        # centered at (-1, 0, 1) the least-squares slope is (y[2] - y[0]) / 2;
+        # a missing middle season still voids the trend, as in the fit
+        trend_stats = np.stack([k_pct, bb_pct, iso], axis=2)
+        trends = (trend_stats[:, 2] - trend_stats[:, 0]) / 2
+        trends[np.isnan(trend_stats[:, 1])] = np.nan
+        k_trend, bb_trend, iso_trend = trends.T
+        
+        significant = np.abs(trends) > np.array([1.5, 0.8, 0.025])
+        genuine_change = (n >= 3) & (significant.sum(axis=1) >= 2)
+        improving = (k_trend < -1) | (bb_trend > 0.5) | (iso_trend > 0.02)
+        declining = (k_trend > 1) | (bb_trend < -0.5) | (iso_trend < -0.02)
+        skill_adj = np.select([genuine_change & improving, genuine_change & declining], [5, -5], 0)
+        
+        # Component 6: Traditional Regression Signals (tier 1 only), against
+        # the career baseline as of each player's latest season
+        latest_season = season[:, 0].astype(int)
+        regression_career = career.copy()
+        for other_season in np.unique(latest_season[latest_season != current_season]):
+            idx = np.flatnonzero(latest_season == other_season)
+            other_ids = [ids[i] for i in idx]
+            other = self.detector._get_career_baselines(other_ids, int(other_season))
+            regression_career[idx] = baseline_matrix(other, other_ids)
+        
+        # Columns: BABIP, K%, BB%, ISO, HR/FB%. A tier 1 delta counts +1 for
+        # BUY, -1 for SELL; above-career BABIP, K% and HR/FB% are SELLs
+        d = latest[:, [2, 3, 4, 5, 6]] - regression_career
+        tier1 = np.abs(d) >= np.array([
+            self.detector.TIER_1_BABIP_DELTA, self.detector.TIER_1_K_DELTA,
+            self.detector.TIER_1_BB_DELTA, self.detector.TIER_1_ISO_DELTA,
+            self.detector.TIER_1_HRFB_DELTA
+        ])
+        regression_adj = 4 * np.where(tier1, np.sign(d) * self.detector.POLARITY, 0).sum(axis=1).astype(int)
+        
+        # Calculate final prediction
+        predicted_wrc = (
+            baseline_wrc + 
+            age_adj + 
+            discipline_adj + 
+            power_adj + 
+            contact_adj + 
+            skill_adj +
+            regression_adj
+        )
+        
+        # Calculate confidence
+        total_pa = np.where(valid, pa, 0).sum(axis=1)
+        n_wrc = has_wrc.sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            deviation = np.where(has_wrc, wrc_filled - wrc_filled.sum(axis=1, keepdims=True) / n_wrc[:, None], 0.0)
+            wrc_std = np.sqrt((deviation * deviation).sum(axis=1) / (n_wrc - 1))
+        wrc_std[n_wrc < 2] = np.nan
+        
+        confidence = np.select(
+            [(total_pa >= 1200) & (wrc_std < 15) & has_age, (total_pa >= 600) & has_age],
+            ['HIGH', 'MEDIUM'],
+            'LOW'
+        )
+        
+        # Prediction range (±1 standard deviation, minimum 10 points)
+        prediction_std = np.where(np.isnan(wrc_std), 10, np.maximum(wrc_std, 10))
+        
+        return pd.DataFrame({
+            'predicted_wrc': np.rint(predicted_wrc).astype(int),
+            'range_low': np.rint(predicted_wrc - prediction_std).astype(int),
+            'range_high': np.rint(predicted_wrc + prediction_std).astype(int),
+            'baseline_wrc': np.rint(baseline_wrc).astype(int),
+            'current_age': pd.array(np.where(has_age, current_age, np.nan), dtype='Int64'),
+            'next_age': pd.array(np.where(has_age, current_age + 1, np.nan), dtype='Int64'),
+            'age_adjustment': age_adj,
+            'discipline_adjustment': discipline_adj,
+            'power_adjustment': power_adj,
+            'contact_adjustment': contact_adj,
+            'skill_change_adjustment': skill_adj,
+            'regression_adjustment': regression_adj,
+            'power_spike': power_spike,
+            'power_decline': power_decline,
+            'hr_fb_inflated': hr_fb_inflated,
+            'hr_fb_depressed': hr_fb_depressed,
+            'contact_type': contact_type,
+            'genuine_change': genuine_change,
+            'k_trend': k_trend,
+            'bb_trend': bb_trend,
+            'iso_trend': iso_trend,
+            'improving': improving,
+            'declining': declining,
+            'discipline_confidence': discipline_conf,
+            'confidence': confidence,
+            'sample_size_pa': total_pa.astype(int),
+            'recent_seasons': n,
+        }, index=pd.Index(ids, name='player_id'))
+    
+    def _prediction_from_row(self, row):
+        """Convert a predict_batch_advanced row to a prediction dict"""
+        power_flags = [
+            flag for flag, raised in (
+                ('UNSUSTAINABLE_POWER_SPIKE', row['power_spike']),
+                ('POWER_DECLINE', row['power_decline']),
+                ('INFLATED_HR_FB_PCT', row['hr_fb_inflated']),
+                ('DEPRESSED_HR_FB_PCT', row['hr_fb_depressed']),
+            ) if raised
+        ]
+        
+        if row['recent_seasons'] < 3:
+            skill_change = {'genuine_change': False}
+        else:
+            skill_change = {
+                'genuine_change': bool(row['genuine_change']),
+                'k_trend': row['k_trend'],
+                'bb_trend': row['bb_trend'],
+                'iso_trend': row['iso_trend'],
+                'improving': bool(row['improving']),
+                'declining': bool(row['declining'])
+            }
+        
+        return {
+            'predicted_wrc': int(row['predicted_wrc']),
+            'prediction_range': (int(row['range_low']), int(row['range_high'])),
+            'baseline_wrc': int(row['baseline_wrc']),
+            'current_age': None if pd.isna(row['current_age']) else int(row['current_age']),
+            'next_age': None if pd.isna(row['next_age']) else int(row['next_age']),
+            
+            # Component adjustments
+            'age_adjustment': int(row['age_adjustment']),
+            'discipline_adjustment': int(row['discipline_adjustment']),
+            'power_adjustment': int(row['power_adjustment']),
+            'contact_adjustment': int(row['contact_adjustment']),
+            'skill_change_adjustment': int(row['skill_change_adjustment']),
+            'regression_adjustment': int(row['regression_adjustment']),
+            
+            # Flags and metadata
+            'power_flags': power_flags,
+            'contact_type': row['contact_type'],
+            'skill_change': skill_change,
+            'discipline_confidence': row['discipline_confidence'],
+            'confidence': row['confidence'],
+            'sample_size_pa': int(row['sample_size_pa']),
+            'recent_seasons': int(row['recent_seasons'])
+        }
+    
+    def _build_prediction(self, recent, career_baseline, regression_analysis):
+        """
+        Combine a player's recent seasons, career baseline and regression
+        analysis into a prediction
+        
+        Args:
+            recent: Up to three season rows, most recent first, as
+                (season, wrc_plus, babip, k_pct, bb_pct, iso, hr_fb_pct, pa, age)
+        
+        Returns:
+            Detailed prediction dict
+        """
+        # NULL wRC+ becomes NaN and is skipped below, as pandas sum/std did
+        wrc = np.array([r[1] for r in recent], dtype=float)
+        
+        # Calculate weighted baseline (more weight to recent)
+        baseline_wrc = float(np.nansum(wrc * self.WEIGHTS[len(recent)]))
+        current_age = recent[0][8]
+        next_age = current_age + 1 if current_age else None
+        
+        # Component 1: Age Adjustment
+        age_adj = self.get_age_adjustment(current_age, next_age)
+        
+        # Get latest season values
+        latest = recent[0]
+        
+        # Rate stats arrive as floats (cast in SQL)
+        latest_k_pct = latest[3]
+        latest_bb_pct = latest[4]
+        latest_iso = latest[5]
+        latest_hr_fb_pct = latest[6]
+        latest_babip = latest[2]
+        
+        career_k_pct = career_baseline['career_k_pct']
+        career_bb_pct = career_baseline['career_bb_pct']
+        career_iso = career_baseline['career_iso']
+        career_hr_fb_pct = career_baseline['career_hr_fb_pct']
+        career_babip = career_baseline['career_babip']
+        
+        # Component 2: Plate Discipline
+        discipline_adj, discipline_conf = self.calculate_plate_discipline_score(
+            latest_k_pct, latest_bb_pct,
+            career_k_pct, career_bb_pct
+        )
+        
+        # Component 3: Power Sustainability
+        power_adj, power_flags = self.calculate_power_sustainability_score(
+            latest_iso, latest_hr_fb_pct,
+            career_iso, career_hr_fb_pct
+        )
+        
+        # Component 4: Contact Quality
+        contact_adj, contact_type = self.calculate_contact_quality_score(
+            latest_babip, career_babip,
+            latest_iso, career_iso
+        )
+        
+        # Component 5: Skill Change Detection
+        skill_change = self.detect_skill_change(
+            np.array([[r[3], r[4], r[5]] for r in recent], dtype=float)
+        )
+        
+        skill_adj = 0
+        if skill_change['genuine_change']:
+            if skill_change['improving']:
+                skill_adj = +5
+            elif skill_change['declining']:
+                skill_adj = -5
+        
+        # Component 6: Traditional Regression Signals
+        regression_adj = 0
+        
+        if regression_analysis and regression_analysis['alerts']:
+            tier1_buys = len([a for a in regression_analysis['alerts'] 
+                             if a['tier'] == 1 and a['signal'] == 'BUY'])
+            tier1_sells = len([a for a in regression_analysis['alerts'] 
+                              if a['tier'] == 1 and a['signal'] == 'SELL'])
+            
+            regression_adj = (tier1_buys * 4) - (tier1_sells * 4)
+        
+        # Calculate final prediction
+        predicted_wrc = (
+            baseline_wrc + 
+            age_adj + 
+            discipline_adj + 
+            power_adj + 
+            contact_adj + 
+            skill_adj +
+            regression_adj
+        )
+        
+        # Calculate confidence
+        total_pa = sum(r[7] for r in recent)
+        known_wrc = wrc[~np.isnan(wrc)]
+        wrc_std = known_wrc.std(ddof=1) if len(known_wrc) > 1 else np.nan
+        age_certainty = current_age is not None
+        
+        if total_pa >= 1200 and wrc_std < 15 and age_certainty:
+            confidence = 'HIGH'
+        elif total_pa >= 600 and age_certainty:
+            confidence = 'MEDIUM'
+        else:
+            confidence = 'LOW'
+        
+        # Calculate prediction range (±1 standard deviation)
+        # Minimum 10 point uncertainty (std is NaN with a single season)
+        prediction_std = max(wrc_std, 10) if not np.isnan(wrc_std) else 10
+        lower_bound = predicted_wrc - prediction_std
+        upper_bound = predicted_wrc + prediction_std
+        
+        return {
+            'predicted_wrc': round(predicted_wrc),
+            'prediction_range': (round(lower_bound), round(upper_bound)),
+            'baseline_wrc': round(baseline_wrc),
+            'current_age': int(current_age) if current_age else None,
+            'next_age': int(next_age) if next_age else None,
+            
+            # Component adjustments
+            'age_adjustment': round(age_adj),
+            'discipline_adjustment': discipline_adj,
+            'power_adjustment': power_adj,
+            'contact_adjustment': contact_adj,
+            'skill_change_adjustment': skill_adj,
+            'regression_adjustment': regression_adj,
+            
+            # Flags and metadata
+            'power_flags': power_flags,
+            'contact_type': contact_type,
+            'skill_change': skill_change,
+            'discipline_confidence': discipline_conf,
+            'confidence': confidence,
+            'sample_size_pa': int(total_pa),
+            'recent_seasons': len(recent)
+        }
+    
+    def generate_prediction_report(self, player_name, current_season=2025):
+        """
+        Generate detailed prediction report for a player
+        """
+        player_id = self._resolve_player_id(player_name)
+        
+        if player_id is None:
+            return f"Player '{player_name}' not found"
+        
+        pred = self.predict_next_season_advanced(player_id, current_season)
+        
+        return self.format_prediction_report(player_name, pred, current_season)
+    
+    def format_prediction_report(self, player_name, pred, current_season=2025):
+        """
+        Format a prediction dict as a detailed report
+        """
+        if not pred:
+            return f"Insufficient data for {player_name}"
+        
+        # Build report
+        report = []
+        report.append("=" * 70)
+        report.append(f"ADVANCED PREDICTION: {player_name} ({current_season + 1})")
+        report.append("=" * 70)
+        
+        report.append(f"\n📊 PREDICTION:")
+        report.append(f"   Projected wRC+: {pred['predicted_wrc']}")
+        report.append(f"   Range (±1σ): {pred['prediction_range'][0]}-{pred['prediction_range'][1]}")
+        report.append(f"   Baseline (3-yr): {pred['baseline_wrc']}")
+        report.append(f"   Confidence: {pred['confidence']}")
+        
+        report.append(f"\n👤 AGE PROFILE:")
+        report.append(f"   Current Age: {pred['current_age']}")
+        report.append(f"   Next Season Age: {pred['next_age']}")
+        report.append(f"   Age Adjustment: {pred['age_adjustment']:+d} wRC+")
+        
+        report.append(f"\n🎯 COMPONENT BREAKDOWN:")
+        report.append(f"   Plate Discipline: {pred['discipline_adjustment']:+d} wRC+ ({pred['discipline_confidence']} confidence)")
+        report.append(f"   Power Sustainability: {pred['power_adjustment']:+d} wRC+")
+        report.append(f"   Contact Quality: {pred['contact_adjustment']:+d} wRC+ ({pred['contact_type']})")
+        report.append(f"   Skill Change: {pred['skill_change_adjustment']:+d} wRC+")
+        report.append(f"   Regression Signals: {pred['regression_adjustment']:+d} wRC+")
+        
+        if pred['power_flags']:
+            report.append(f"\n⚠️  POWER FLAGS:")
+            for flag in pred['power_flags']:
+                report.append(f"   - {flag}")
+        
+        if pred['skill_change']['genuine_change']:
+            report.append(f"\n📈 SKILL CHANGE DETECTED:")
+            sc = pred['skill_change']
+            report.append(f"   K% Trend: {sc['k_trend']:.2f}% per year")
+            report.append(f"   BB% Trend: {sc['bb_trend']:.2f}% per year")
+            report.append(f"   ISO Trend: {sc['iso_trend']:.3f} per year")
+            trend_dir = "Improving" if sc['improving'] else "Declining" if sc['declining'] else "Stable"
+            report.append(f"   Overall: {trend_dir}")
+        
+        report.append(f"\n📊 SAMPLE:")
+        report.append(f"   Total PA (3yr): {pred['sample_size_pa']}")
+        report.append(f"   Seasons: {pred['recent_seasons']}")
+        
+        report.append("\n" + "=" * 70)
+        
+        return "\n".join(report)
 
 
 if __name__ == "__main__":
@@ -473,5 +891,8 @@ if __name__ == "__main__":
         "Bobby Witt Jr.",     # Young player
     ]
     
+    # One batch of set-based queries instead of a round trip set per player
+    predictions = predictor.predict_batch(test_players, 2025)
+    
     for player in test_players:
-        print(f"\n{predictor.generate_prediction_report(player, 2025)}\n")
\ No newline at end of file
+        print(f"\n{predictor.format_prediction_report(player, predictions[player], 2025)}\n")
\ No newline at end of file
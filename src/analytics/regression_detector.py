@@ -7,10 +7,105 @@ Detects regression candidates using multiple metrics:
 - ISO and HR/FB% (power sustainability)
 - Multi-metric analysis
 """
+import heapq
+from functools import lru_cache
+
 import pandas as pd
 import numpy as np
-from sqlalchemy import text
-from src.utils.db_connection import get_session
+from sqlalchemy import text, bindparam
+from sqlalchemy.exc import DBAPIError
+from src.utils.db_connection import get_session, read_frame
+
+
+@lru_cache(maxsize=1)
+def load_league_averages():
+    """
+    League average metrics by season, queried once per process
+    
+    Shared by every RegressionDetector; call invalidate_league_averages()
+    after loading new season_stats rows.
+    
+    Returns:
+        DataFrame with one row per season
+    """
+    query = """
+        SELECT 
+            season,
+            CAST(AVG(babip) AS DOUBLE PRECISION) as avg_babip,
+            CAST(AVG(bb_pct) AS DOUBLE PRECISION) as avg_bb_pct,
+            CAST(AVG(k_pct) AS DOUBLE PRECISION) as avg_k_pct,
+            CAST(AVG(iso) AS DOUBLE PRECISION) as avg_iso,
+            CAST(AVG(hr_fb_pct) AS DOUBLE PRECISION) as avg_hr_fb_pct,
+            CAST(COUNT(*) AS INTEGER) as player_count
+        FROM season_stats
+        WHERE babip IS NOT NULL 
+          AND pa >= 100
+        GROUP BY season
+        ORDER BY season
+    """
+    
+    return read_frame(query)
+
+
+def invalidate_league_averages():
+    """Forget the cached league averages so the next detector re-queries them"""
+    load_league_averages.cache_clear()
+
+
+@lru_cache(maxsize=1)
+def load_player_names():
+    """
+    The player_id -> name map (one query, no per-scan JOIN), loaded once per process
+    
+    Callers must not mutate the returned dict; it is shared.
+    """
+    session = get_session()
+    
+    try:
+        return dict(session.execute(text("SELECT player_id, name FROM players")).fetchall())
+    
+    finally:
+        session.close()
+
+
+def invalidate_player_names():
+    """Forget the cached name map so the next lookup re-queries it"""
+    load_player_names.cache_clear()
+
+
+# Number of tier thresholds a delta clears -> alert tier (0 = no alert)
+TIER_BY_CLEARED = np.array([0, 3, 2, 1], dtype=np.int8)
+
+
+def classify_deltas(current, career, thresholds, polarity):
+    """
+    Tier and signal for every (player, metric) cell in one pass
+    
+    Args:
+        current: (N, M) float array of current-season values
+        career: (N, M) float array of career baselines
+        thresholds: (M, 3) tier 1/2/3 delta thresholds per metric
+        polarity: (M,) +1 where a rise is a BUY, -1 where it is a SELL
+    
+    Returns:
+        (deltas, tiers, buys): deltas (N, M); tiers (N, M) int8 with 0 for
+        no alert (including missing values); buys (N, M) bool
+    """
+    deltas = current - career
+    abs_deltas = np.abs(deltas)
+    
+    # Thresholds shrink from tier 1 to tier 3, so the number of thresholds
+    # cleared (0-3) picks the tier without branching: 3 -> tier 1, 0 -> none
+    cleared = (
+        (abs_deltas >= thresholds[:, 0]).astype(np.int8)
+        + (abs_deltas >= thresholds[:, 1])
+        + (abs_deltas >= thresholds[:, 2])
+    )
+    tiers = np.take(TIER_BY_CLEARED, cleared)
+    buys = deltas * polarity > 0
+    
+    return deltas, tiers, buys
+
 
 class RegressionDetector:
     """
@@ -42,60 +137,101 @@ class RegressionDetector:
     TIER_2_HRFB_DELTA = 5.0
     TIER_3_HRFB_DELTA = 3.0
     
-    def __init__(self):
-        self.league_averages = self._calculate_league_averages()
+    # Batch detection tables, one row/entry per metric in alert order:
+    # stat column, alert metric name, tier 1/2/3 thresholds, and polarity
+    # (+1 means a rise is a BUY)
+    METRICS = ('babip', 'k_pct', 'bb_pct', 'iso', 'hr_fb_pct')
+    METRIC_NAMES = ('BABIP', 'K%', 'BB%', 'ISO', 'HR/FB%')
+    THRESHOLDS = np.array([
+        [TIER_1_BABIP_DELTA, TIER_2_BABIP_DELTA, TIER_3_BABIP_DELTA],
+        [TIER_1_K_DELTA, TIER_2_K_DELTA, TIER_3_K_DELTA],
+        [TIER_1_BB_DELTA, TIER_2_BB_DELTA, TIER_3_BB_DELTA],
+        [TIER_1_ISO_DELTA, TIER_2_ISO_DELTA, TIER_3_ISO_DELTA],
+        [TIER_1_HRFB_DELTA, TIER_2_HRFB_DELTA, TIER_3_HRFB_DELTA],
+    ], dtype=np.float64)
+    POLARITY = np.array([-1, -1, 1, 1, -1], dtype=np.int8)
     
-    def _calculate_league_averages(self):
-        """Calculate league average metrics by season"""
-        session = get_session()
-        
-        try:
-            query = """
-                SELECT 
-                    season,
-                    AVG(babip) as avg_babip,
-                    AVG(bb_pct) as avg_bb_pct,
-                    AVG(k_pct) as avg_k_pct,
-                    AVG(iso) as avg_iso,
-                    AVG(hr_fb_pct) as avg_hr_fb_pct,
-                    COUNT(*) as player_count
-                FROM season_stats
-                WHERE babip IS NOT NULL 
-                  AND pa >= 100
-                GROUP BY season
-                ORDER BY season
-            """
-            
-            df = pd.read_sql(query, session.bind)
-            return df
+    # Alert message templates by metric (see format_alert)
+    ALERT_MESSAGES = {
+        'BABIP': "BABIP {current:.3f} is {delta:+.3f} from career {expected:.3f}",
+        'K%': "K% {current:.1f}% is {delta:+.1f}pp from career {expected:.1f}%",
+        'BB%': "BB% {current:.1f}% is {delta:+.1f}pp from career {expected:.1f}%",
+        'ISO': "ISO {current:.3f} is {delta:+.3f} from career {expected:.3f}",
+        'HR/FB%': "HR/FB {current:.1f}% is {delta:+.1f}pp from career {expected:.1f}%",
+    }
+    
+    def __init__(self):
+        self.league_averages = load_league_averages()
+        self.player_names = load_player_names()
         
-        finally:
-            session.close()
+        # season -> league average row, for O(1) per-player lookups
+        self.league_averages_by_season = {
+            int(row.season): row for row in self.league_averages.itertuples(index=False)
+        }
     
-    def _get_player_career_baseline(self, player_id, current_season):
-        """Get player's career baseline stats (excluding current season)"""
-        session = get_session()
+    def _reload_player_names(self):
+        """Drop the cached name map and load it again (players added since)"""
+        invalidate_player_names()
+        self.player_names = load_player_names()
+    
+    def _player_name(self, player_id):
+        """Look up a player's name, reloading the map for players added since"""
+        if player_id not in self.player_names:
+            self._reload_player_names()
+        return self.player_names.get(player_id)
+    
+    def _get_player_career_baseline(self, player_id, current_season, session=None):
+        """
+        Get player's career baseline stats (excluding current season)
+        
+        Args:
+            session: Open session to reuse; a new one is opened (and closed)
+                if not given
+        """
+        owns_session = session is None
+        if owns_session:
+            session = get_session()
         
         try:
-            query = """
-                SELECT 
-                    AVG(babip) as career_babip,
-                    AVG(bb_pct) as career_bb_pct,
-                    AVG(k_pct) as career_k_pct,
-                    AVG(iso) as career_iso,
-                    AVG(hr_fb_pct) as career_hr_fb_pct,
-                    SUM(pa) as total_pa,
-                    COUNT(*) as seasons
-                FROM season_stats
-                WHERE player_id = :player_id
-                  AND season < :season
-                  AND pa >= 50
-            """
+            # Primary-key lookup in the nightly rollup (schema_rollups.sql)
+            try:
+                result = session.execute(
+                    text("""
+                        SELECT 
+                            career_babip, career_bb_pct, career_k_pct,
+                            career_iso, career_hr_fb_pct, total_pa, seasons
+                        FROM player_career_baselines
+                        WHERE player_id = :player_id
+                          AND season = :season
+                    """),
+                    {'player_id': player_id, 'season': current_season}
+                ).fetchone()
+            except DBAPIError:
+                # Rollup not created on this database yet
+                session.rollback()
+                result = None
             
-            result = session.execute(
-                text(query),
-                {'player_id': player_id, 'season': current_season}
-            ).fetchone()
+            # Seasons the rollup doesn't cover yet: aggregate directly
+            if not result:
+                query = """
+                    SELECT 
+                        CAST(AVG(babip) AS DOUBLE PRECISION) as career_babip,
+                        CAST(AVG(bb_pct) AS DOUBLE PRECISION) as career_bb_pct,
+                        CAST(AVG(k_pct) AS DOUBLE PRECISION) as career_k_pct,
+                        CAST(AVG(iso) AS DOUBLE PRECISION) as career_iso,
+                        CAST(AVG(hr_fb_pct) AS DOUBLE PRECISION) as career_hr_fb_pct,
+                        CAST(SUM(pa) AS INTEGER) as total_pa,
+                        CAST(COUNT(*) AS INTEGER) as seasons
+                    FROM season_stats
+                    WHERE player_id = :player_id
+                      AND season < :season
+                      AND pa >= 50
+                """
+                
+                result = session.execute(
+                    text(query),
+                    {'player_id': player_id, 'season': current_season}
+                ).fetchone()
             
             if result and result[5] and result[5] >= 200:  # Need 200+ career PA
                 return {
@@ -110,19 +246,189 @@ class RegressionDetector:
             
             return None
         
+        finally:
+            if owns_session:
+                session.close()
+    
+    def _get_career_baselines(self, player_ids, current_season):
+        """
+        Get career baselines for several players in one rollup lookup
+        
+        Returns:
+            Dict of player_id -> baseline dict (same shape as
+            _get_player_career_baseline), or None below 200 career PA
+        """
+        session = get_session()
+        
+        try:
+            query = text("""
+                SELECT 
+                    player_id, career_babip, career_bb_pct, career_k_pct,
+                    career_iso, career_hr_fb_pct, total_pa, seasons
+                FROM player_career_baselines
+                WHERE player_id IN :player_ids
+                  AND season = :season
+            """).bindparams(bindparam('player_ids', expanding=True))
+            
+            try:
+                rows = session.execute(
+                    query,
+                    {'player_ids': list(player_ids), 'season': current_season}
+                ).fetchall()
+            except DBAPIError:
+                # Rollup not created on this database yet: all fall back below
+                rows = []
+        
         finally:
             session.close()
+        
+        baselines = {}
+        for row in rows:
+            if row[6] and row[6] >= 200:  # Need 200+ career PA
+                baselines[row[0]] = {
+                    'career_babip': row[1],
+                    'career_bb_pct': row[2],
+                    'career_k_pct': row[3],
+                    'career_iso': row[4],
+                    'career_hr_fb_pct': row[5],
+                    'total_pa': row[6],
+                    'seasons': row[7]
+                }
+            else:
+                baselines[row[0]] = None
+        
+        # Seasons the rollup doesn't cover yet
+        missing = [player_id for player_id in player_ids if player_id not in baselines]
+        if missing:
+            session = get_session()
+            
+            try:
+                for player_id in missing:
+                    baselines[player_id] = self._get_player_career_baseline(player_id, current_season, session)
+            
+            finally:
+                session.close()
+        
+        return baselines
+    
+    def _get_all_current(self, season, min_pa=100):
+        """Get current season stats for every qualified player (one row per player)"""
+        query = text("""
+            SELECT 
+                ss.player_id,
+                ss.team,
+                ss.pa,
+                ss.games,
+                ss.avg,
+                ss.obp,
+                ss.slg,
+                ss.woba,
+                ss.wrc_plus,
+                ss.babip,
+                ss.bb_pct,
+                ss.k_pct,
+                ss.iso,
+                ss.hr_fb_pct
+            FROM season_stats ss
+            WHERE ss.season = :season
+              AND ss.pa >= :min_pa
+            ORDER BY ss.pa DESC
+        """)
+        
+        df = read_frame(query, {'season': season, 'min_pa': min_pa})
+        
+        # Multi-team seasons: keep the stint with the most PA
+        df = df.drop_duplicates('player_id')
+        
+        names = df['player_id'].map(self.player_names)
+        if names.isna().any():
+            self._reload_player_names()
+            names = df['player_id'].map(self.player_names)
+        df.insert(1, 'name', names)
+        
+        # Rates stay float64 so tiers match analyze_player_season exactly at
+        # the thresholds; counts fit in int16, nullable where the schema allows NULL
+        rate_cols = ['avg', 'obp', 'slg', 'woba', 'babip', 'bb_pct', 'k_pct', 'iso', 'hr_fb_pct']
+        df[rate_cols] = df[rate_cols].astype(float)
+        df = df.astype({'pa': np.int16, 'games': 'Int16', 'wrc_plus': 'Int16'})
+        return df
+    
+    def _get_all_career_baselines(self, season):
+        """
+        Get career baselines (excluding season) for every player with 200+ career PA
+        
+        Read from the nightly rollup; players of `season` the rollup doesn't
+        cover yet (loaded since the last refresh) are aggregated directly.
+        """
+        live = """
+            SELECT 
+                b.player_id,
+                CAST(AVG(b.babip) AS DOUBLE PRECISION) as career_babip,
+                CAST(AVG(b.bb_pct) AS DOUBLE PRECISION) as career_bb_pct,
+                CAST(AVG(b.k_pct) AS DOUBLE PRECISION) as career_k_pct,
+                CAST(AVG(b.iso) AS DOUBLE PRECISION) as career_iso,
+                CAST(AVG(b.hr_fb_pct) AS DOUBLE PRECISION) as career_hr_fb_pct,
+                CAST(SUM(b.pa) AS INTEGER) as total_pa,
+                CAST(COUNT(*) AS INTEGER) as seasons
+            FROM season_stats b
+            WHERE b.season < :season
+              AND b.pa >= 50
+              AND b.player_id IN (SELECT player_id FROM season_stats WHERE season = :season)
+              {not_in_rollup}
+            GROUP BY b.player_id
+            HAVING SUM(b.pa) >= 200
+        """
+        
+        query = text("""
+            SELECT 
+                player_id,
+                career_babip,
+                career_bb_pct,
+                career_k_pct,
+                career_iso,
+                career_hr_fb_pct,
+                total_pa,
+                seasons
+            FROM player_career_baselines
+            WHERE season = :season
+              AND total_pa >= 200
+            
+            UNION ALL
+        """ + live.format(not_in_rollup="""AND NOT EXISTS (
+                  SELECT 1 FROM player_career_baselines cb
+                  WHERE cb.player_id = b.player_id AND cb.season = :season
+              )"""))
+        
+        try:
+            df = read_frame(query, {'season': season})
+        except (DBAPIError, pd.errors.DatabaseError):
+            # Rollup not created on this database yet: aggregate everyone
+            df = read_frame(text(live.format(not_in_rollup='')), {'season': season})
+        
+        career_cols = ['career_babip', 'career_bb_pct', 'career_k_pct',
+                       'career_iso', 'career_hr_fb_pct']
+        df[career_cols] = df[career_cols].astype(float)
+        return df
+    
+    def format_alert(self, alert):
+        """
+        Build an alert's display message on demand
+        
+        Season-scan alerts carry only raw fields (metric, current, expected,
+        delta); format just the ones that get shown.
+        
+        Returns:
+            Message string
+        """
+        return self.ALERT_MESSAGES[alert['metric']].format(
+            current=alert['current'], expected=alert['expected'], delta=alert['delta']
+        )
     
     def _determine_tier(self, delta, tier1_threshold, tier2_threshold, tier3_threshold):
         """Helper to determine alert tier based on delta"""
         abs_delta = abs(delta)
-        if abs_delta >= tier1_threshold:
-            return 1
-        elif abs_delta >= tier2_threshold:
-            return 2
-        elif abs_delta >= tier3_threshold:
-            return 3
-        return None
+        cleared = (abs_delta >= tier1_threshold) + (abs_delta >= tier2_threshold) + (abs_delta >= tier3_threshold)
+        return (None, 3, 2, 1)[cleared]
     
     def detect_babip_regression(self, current_babip, career_babip):
         """Detect BABIP-based regression"""
@@ -147,7 +453,9 @@ class RegressionDetector:
             'current': current_babip,
             'expected': career_babip,
             'delta': delta,
-            'message': f"BABIP {current_babip:.3f} is {delta:+.3f} from career {career_babip:.3f}"
+            'message': self.ALERT_MESSAGES['BABIP'].format(
+                current=current_babip, expected=career_babip, delta=delta
+            )
         }
     
     def detect_k_rate_regression(self, current_k_pct, career_k_pct):
@@ -174,7 +482,9 @@ class RegressionDetector:
             'current': current_k_pct,
             'expected': career_k_pct,
             'delta': delta,
-            'message': f"K% {current_k_pct:.1f}% is {delta:+.1f}pp from career {career_k_pct:.1f}%"
+            'message': self.ALERT_MESSAGES['K%'].format(
+                current=current_k_pct, expected=career_k_pct, delta=delta
+            )
         }
     
     def detect_bb_rate_regression(self, current_bb_pct, career_bb_pct):
@@ -201,7 +511,9 @@ class RegressionDetector:
             'current': current_bb_pct,
             'expected': career_bb_pct,
             'delta': delta,
-            'message': f"BB% {current_bb_pct:.1f}% is {delta:+.1f}pp from career {career_bb_pct:.1f}%"
+            'message': self.ALERT_MESSAGES['BB%'].format(
+                current=current_bb_pct, expected=career_bb_pct, delta=delta
+            )
         }
     
     def detect_iso_regression(self, current_iso, career_iso):
@@ -227,7 +539,9 @@ class RegressionDetector:
             'current': current_iso,
             'expected': career_iso,
             'delta': delta,
-            'message': f"ISO {current_iso:.3f} is {delta:+.3f} from career {career_iso:.3f}"
+            'message': self.ALERT_MESSAGES['ISO'].format(
+                current=current_iso, expected=career_iso, delta=delta
+            )
         }
     
     def detect_hr_fb_regression(self, current_hr_fb, career_hr_fb):
@@ -253,38 +567,44 @@ class RegressionDetector:
             'current': current_hr_fb,
             'expected': career_hr_fb,
             'delta': delta,
-            'message': f"HR/FB {current_hr_fb:.1f}% is {delta:+.1f}pp from career {career_hr_fb:.1f}%"
+            'message': self.ALERT_MESSAGES['HR/FB%'].format(
+                current=current_hr_fb, expected=career_hr_fb, delta=delta
+            )
         }
     
-    def analyze_player_season(self, player_id, season):
+    def analyze_player_season(self, player_id, season, *, session=None):
         """
         Comprehensive regression analysis for a player-season
         
+        Args:
+            session: Open session to reuse across calls (e.g. a loop over
+                players); a new one is opened (and closed) if not given
+        
         Returns:
             dict with all alerts and metrics
         """
-        session = get_session()
+        owns_session = session is None
+        if owns_session:
+            session = get_session()
         
         try:
             # Get current season stats
             query = """
                 SELECT 
-                    p.name,
                     ss.team,
                     ss.pa,
                     ss.games,
-                    ss.avg,
-                    ss.obp,
-                    ss.slg,
-                    ss.woba,
+                    CAST(ss.avg AS DOUBLE PRECISION),
+                    CAST(ss.obp AS DOUBLE PRECISION),
+                    CAST(ss.slg AS DOUBLE PRECISION),
+                    CAST(ss.woba AS DOUBLE PRECISION),
                     ss.wrc_plus,
-                    ss.babip,
-                    ss.bb_pct,
-                    ss.k_pct,
-                    ss.iso,
-                    ss.hr_fb_pct
+                    CAST(ss.babip AS DOUBLE PRECISION),
+                    CAST(ss.bb_pct AS DOUBLE PRECISION),
+                    CAST(ss.k_pct AS DOUBLE PRECISION),
+                    CAST(ss.iso AS DOUBLE PRECISION),
+                    CAST(ss.hr_fb_pct AS DOUBLE PRECISION)
                 FROM season_stats ss
-                JOIN players p ON ss.player_id = p.player_id
                 WHERE ss.player_id = :player_id 
                   AND ss.season = :season
             """
@@ -298,112 +618,229 @@ class RegressionDetector:
                 return None
             
             # Get career baseline
-            career_baseline = self._get_player_career_baseline(player_id, season)
+            career_baseline = self._get_player_career_baseline(player_id, season, session)
             
             if not career_baseline:
                 return None  # Need career history for regression analysis
             
-            # Get league average for this season
-            league_avg = self.league_averages[
-                self.league_averages['season'] == season
-            ].iloc[0] if len(self.league_averages[self.league_averages['season'] == season]) > 0 else None
-            
-            # Run all regression checks
-            all_alerts = []
-            
-            # BABIP regression
-            babip_alert = self.detect_babip_regression(result[9], career_baseline['career_babip'])
-            if babip_alert:
-                all_alerts.append(babip_alert)
-            
-            # K% regression
-            k_alert = self.detect_k_rate_regression(result[11], career_baseline['career_k_pct'])
-            if k_alert:
-                all_alerts.append(k_alert)
-            
-            # BB% regression
-            bb_alert = self.detect_bb_rate_regression(result[10], career_baseline['career_bb_pct'])
-            if bb_alert:
-                all_alerts.append(bb_alert)
-            
-            # ISO regression
-            iso_alert = self.detect_iso_regression(result[12], career_baseline['career_iso'])
-            if iso_alert:
-                all_alerts.append(iso_alert)
-            
-            # HR/FB% regression
-            hrfb_alert = self.detect_hr_fb_regression(result[13], career_baseline['career_hr_fb_pct'])
-            if hrfb_alert:
-                all_alerts.append(hrfb_alert)
-            
-            # Calculate composite score
-            buy_signals = len([a for a in all_alerts if a['signal'] == 'BUY'])
-            sell_signals = len([a for a in all_alerts if a['signal'] == 'SELL'])
-            
-            return {
-                'player_id': player_id,
-                'name': result[0],
+            return self._analysis_from_row(player_id, season, result, career_baseline)
+        
+        finally:
+            if owns_session:
+                session.close()
+    
+    def _analysis_from_row(self, player_id, season, result, career_baseline):
+        """
+        Run every regression check on an already-loaded player-season
+        
+        Args:
+            result: season_stats row in analyze_player_season's column order
+                (team, pa, games, avg, obp, slg, woba, wrc_plus, babip,
+                bb_pct, k_pct, iso, hr_fb_pct)
+            career_baseline: _get_player_career_baseline dict
+        
+        Returns:
+            dict with all alerts and metrics (see analyze_player_season)
+        """
+        # Get league average for this season
+        league_avg = self.league_averages_by_season.get(season)
+        
+        # Run all regression checks
+        all_alerts = []
+        
+        # BABIP regression
+        babip_alert = self.detect_babip_regression(result[8], career_baseline['career_babip'])
+        if babip_alert:
+            all_alerts.append(babip_alert)
+        
+        # K% regression
+        k_alert = self.detect_k_rate_regression(result[10], career_baseline['career_k_pct'])
+        if k_alert:
+            all_alerts.append(k_alert)
+        
+        # BB% regression
+        bb_alert = self.detect_bb_rate_regression(result[9], career_baseline['career_bb_pct'])
+        if bb_alert:
+            all_alerts.append(bb_alert)
+        
+        # ISO regression
+        iso_alert = self.detect_iso_regression(result[11], career_baseline['career_iso'])
+        if iso_alert:
+            all_alerts.append(iso_alert)
+        
+        # HR/FB% regression
+        hrfb_alert = self.detect_hr_fb_regression(result[12], career_baseline['career_hr_fb_pct'])
+        if hrfb_alert:
+            all_alerts.append(hrfb_alert)
+        
+        # Calculate composite score
+        buy_signals = sell_signals = 0
+        for alert in all_alerts:
+            buy_signals += alert['signal'] == 'BUY'
+            sell_signals += alert['signal'] == 'SELL'
+        
+        return {
+            'player_id': player_id,
+            'name': self._player_name(player_id),
+            'season': season,
+            'team': result[0],
+            'pa': result[1],
+            'games': result[2],
+            'current_stats': {
+                'avg': result[3],
+                'obp': result[4],
+                'slg': result[5],
+                'woba': result[6],
+                'wrc_plus': result[7],
+                'babip': result[8],
+                'bb_pct': result[9],
+                'k_pct': result[10],
+                'iso': result[11],
+                'hr_fb_pct': result[12],
+            },
+            'career_baseline': career_baseline,
+            'alerts': all_alerts,
+            'alert_count': len(all_alerts),
+            'max_tier': min([a['tier'] for a in all_alerts]) if all_alerts else None,
+            'buy_signals': buy_signals,
+            'sell_signals': sell_signals,
+            'net_signal': buy_signals - sell_signals,  # Positive = more BUY, Negative = more SELL
+        }
+    
+    def analyze_season_frames(self, season, min_pa=100):
+        """
+        Columnar regression analysis for every qualified player in a season
+        
+        Uses two set-based queries (current stats + career baselines) and
+        classifies every (player, metric) delta in one array pass. Alerts
+        come back as one typed row each instead of one dict per alert.
+        
+        Returns:
+            (players_df, alerts_df): players_df has one row per player with
+            at least one alert (current stats, career baseline and signal
+            counts); alerts_df has one row per alert keyed by player_id, in
+            player then metric order, with categorical metric, direction
+            and signal columns. Messages are not built; use format_alert
+        """
+        current = self._get_all_current(season, min_pa)
+        career = self._get_all_career_baselines(season)
+        
+        df = current.merge(career, on='player_id', how='inner')
+        
+        # All five detectors in one pass over (players, metrics) arrays.
+        # NaN deltas compare False, so missing stats never flag
+        current_values = df[list(self.METRICS)].to_numpy(dtype=np.float64)
+        career_values = df[[f'career_{col}' for col in self.METRICS]].to_numpy(dtype=np.float64)
+        deltas, tiers, buys = classify_deltas(current_values, career_values, self.THRESHOLDS, self.POLARITY)
+        
+        alerted = tiers > 0
+        flagged = alerted.any(axis=1)
+        
+        players_df = df[flagged].reset_index(drop=True)
+        players_df['buy_signals'] = (alerted & buys).sum(axis=1)[flagged]
+        players_df['sell_signals'] = (alerted & ~buys).sum(axis=1)[flagged]
+        players_df['net_signal'] = players_df['buy_signals'] - players_df['sell_signals']
+        players_df['alert_count'] = alerted.sum(axis=1)[flagged]
+        players_df['max_tier'] = np.where(alerted, tiers, 4).min(axis=1)[flagged].astype(np.int8)
+        
+        # Row-major nonzero keeps player order, then metric order within a player
+        rows, cols = np.nonzero(alerted)
+        signal_codes = buys[rows, cols].astype(np.int8)
+        alerts_df = pd.DataFrame({
+            'player_id': df['player_id'].to_numpy()[rows],
+            'metric': pd.Categorical.from_codes(cols, categories=self.METRIC_NAMES),
+            'tier': tiers[rows, cols],
+            'direction': pd.Categorical.from_codes(signal_codes, categories=['negative', 'positive']),
+            'signal': pd.Categorical.from_codes(signal_codes, categories=['SELL', 'BUY']),
+            'current': current_values[rows, cols],
+            'expected': career_values[rows, cols],
+            'delta': deltas[rows, cols],
+        })
+        return players_df, alerts_df
+    
+    def iter_candidates(self, season=2025, min_pa=100):
+        """
+        Yield regression analyses for a season's flagged players one at a time
+        
+        Dict-shaped view of analyze_season_frames for callers that expect
+        analyze_player_season results. Each dict is built only when the
+        consumer asks for it, so filtering or top-K picks never hold the
+        whole season's dicts at once.
+        
+        Yields:
+            analysis dicts (same shape as analyze_player_season, but alerts
+            have no 'message'; use format_alert) for players with at least
+            one alert
+        """
+        players_df, alerts_df = self.analyze_season_frames(season, min_pa)
+        
+        alert_cols = ['metric', 'tier', 'direction', 'signal', 'current', 'expected', 'delta']
+        alert_records = alerts_df[alert_cols].astype({'metric': str, 'direction': str, 'signal': str})
+        alert_records['tier'] = alert_records['tier'].astype(int)
+        alert_records = alert_records.to_dict('records')
+        
+        # Alerts are grouped by player in players_df order
+        ends = np.cumsum(players_df['alert_count'].to_numpy())
+        
+        for row, end in zip(players_df.itertuples(index=False), ends):
+            all_alerts = alert_records[end - row.alert_count:end]
+            yield {
+                'player_id': row.player_id,
+                'name': row.name,
                 'season': season,
-                'team': result[1],
-                'pa': result[2],
-                'games': result[3],
+                'team': row.team,
+                'pa': row.pa,
+                'games': row.games,
                 'current_stats': {
-                    'avg': result[4],
-                    'obp': result[5],
-                    'slg': result[6],
-                    'woba': result[7],
-                    'wrc_plus': result[8],
-                    'babip': result[9],
-                    'bb_pct': result[10],
-                    'k_pct': result[11],
-                    'iso': result[12],
-                    'hr_fb_pct': result[13],
+                    'avg': row.avg,
+                    'obp': row.obp,
+                    'slg': row.slg,
+                    'woba': row.woba,
+                    'wrc_plus': row.wrc_plus,
+                    'babip': row.babip,
+                    'bb_pct': row.bb_pct,
+                    'k_pct': row.k_pct,
+                    'iso': row.iso,
+                    'hr_fb_pct': row.hr_fb_pct,
+                },
+                'career_baseline': {
+                    'career_babip': row.career_babip,
+                    'career_bb_pct': row.career_bb_pct,
+                    'career_k_pct': row.career_k_pct,
+                    'career_iso': row.career_iso,
+                    'career_hr_fb_pct': row.career_hr_fb_pct,
+                    'total_pa': row.total_pa,
+                    'seasons': row.seasons
                 },
-                'career_baseline': career_baseline,
                 'alerts': all_alerts,
-                'alert_count': len(all_alerts),
-                'max_tier': min([a['tier'] for a in all_alerts]) if all_alerts else None,
-                'buy_signals': buy_signals,
-                'sell_signals': sell_signals,
-                'net_signal': buy_signals - sell_signals,  # Positive = more BUY, Negative = more SELL
+                'alert_count': int(row.alert_count),
+                'max_tier': int(row.max_tier),
+                'buy_signals': int(row.buy_signals),
+                'sell_signals': int(row.sell_signals),
+                'net_signal': int(row.net_signal),
             }
+    
+    def analyze_season_batch(self, season, min_pa=100):
+        """
+        Regression analysis for every qualified player in a season
         
-        finally:
-            session.close()
+        Returns:
+            list of iter_candidates analysis dicts
+        """
+        return list(self.iter_candidates(season, min_pa))
     
     def scan_all_current_season(self, season=2025, min_pa=100):
         """
         Scan all players in a given season for regression candidates
+        
+        Runs the set-based analyze_season_batch: two queries for the whole
+        season instead of two round trips per player.
         """
-        session = get_session()
+        results = self.analyze_season_batch(season, min_pa)
         
-        try:
-            query = """
-                SELECT DISTINCT player_id
-                FROM season_stats
-                WHERE season = :season
-                  AND pa >= :min_pa
-            """
-            
-            result = session.execute(
-                text(query),
-                {'season': season, 'min_pa': min_pa}
-            ).fetchall()
-            
-            player_ids = [row[0] for row in result]
-            
-            print(f"🔍 Scanning {len(player_ids)} players from {season} season...")
-            
-            results = []
-            for player_id in player_ids:
-                analysis = self.analyze_player_season(player_id, season)
-                if analysis and analysis['alert_count'] > 0:
-                    results.append(analysis)
-            
-            return results
+        print(f"🔍 Scanned {season} season: {len(results)} players flagged")
         
-        finally:
-            session.close()
+        return results
 
 
 if __name__ == "__main__":
@@ -446,36 +883,41 @@ if __name__ == "__main__":
             
             for alert in sorted(analysis['alerts'], key=lambda x: x['tier']):
                 tier_emoji = "🔴" if alert['tier'] == 1 else "🟡" if alert['tier'] == 2 else "🟢"
-                print(f"   {tier_emoji} TIER {alert['tier']} {alert['metric']:8s} - {alert['signal']:4s}: {alert['message']}")
+                print(f"   {tier_emoji} TIER {alert['tier']} {alert['metric']:8s} - {alert['signal']:4s}: {detector.format_alert(alert)}")
         else:
             print("\n✅ No regression alerts")
     
-    # Scan 2025 season
+    # Scan 2025 season, keeping only the strong tier 1 candidates
     print("\n\n🔄 Scanning 2025 season for regression candidates...")
-    candidates = detector.scan_all_current_season(season=2025, min_pa=100)
+    candidate_count = 0
+    strong_buy = []
+    strong_sell = []
+    for candidate in detector.iter_candidates(season=2025, min_pa=100):
+        candidate_count += 1
+        if candidate['max_tier'] != 1:
+            continue
+        if candidate['net_signal'] >= 2:  # Multiple BUY signals
+            strong_buy.append(candidate)
+        elif candidate['net_signal'] <= -2:  # Multiple SELL signals
+            strong_sell.append(candidate)
     
-    candidate_count = len(candidates)
+    print(f"🔍 Scanned 2025 season: {candidate_count} players flagged")
     print(f"\n✅ Found {candidate_count} players with regression signals")
     
-    # Sort by alert strength
-    tier1 = [c for c in candidates if c['max_tier'] == 1]
-    strong_buy = [c for c in tier1 if c['net_signal'] >= 2]  # Multiple BUY signals
-    strong_sell = [c for c in tier1 if c['net_signal'] <= -2]  # Multiple SELL signals
-    
     if strong_buy:
         print(f"\n🟢 STRONG BUY CANDIDATES ({len(strong_buy)}):")
-        for candidate in sorted(strong_buy, key=lambda x: x['net_signal'], reverse=True)[:5]:
+        for candidate in heapq.nlargest(5, strong_buy, key=lambda x: x['net_signal']):
             print(f"\n   {candidate['name']} ({candidate['team']}) - Net: +{candidate['net_signal']}")
-            for alert in sorted(candidate['alerts'], key=lambda x: x['tier'])[:3]:
+            for alert in heapq.nsmallest(3, candidate['alerts'], key=lambda x: x['tier']):
                 if alert['signal'] == 'BUY':
                     tier_emoji = "🔴" if alert['tier'] == 1 else "🟡" if alert['tier'] == 2 else "🟢"
-                    print(f"      {tier_emoji} {alert['metric']}: {alert['message']}")
+                    print(f"      {tier_emoji} {alert['metric']}: {detector.format_alert(alert)}")
     
     if strong_sell:
         print(f"\n🔴 STRONG SELL CANDIDATES ({len(strong_sell)}):")
-        for candidate in sorted(strong_sell, key=lambda x: x['net_signal'])[:5]:
+        for candidate in heapq.nsmallest(5, strong_sell, key=lambda x: x['net_signal']):
             print(f"\n   {candidate['name']} ({candidate['team']}) - Net: {candidate['net_signal']}")
-            for alert in sorted(candidate['alerts'], key=lambda x: x['tier'])[:3]:
+            for alert in heapq.nsmallest(3, candidate['alerts'], key=lambda x: x['tier']):
                 if alert['signal'] == 'SELL':
                     tier_emoji = "🔴" if alert['tier'] == 1 else "🟡" if alert['tier'] == 2 else "🟢"
-                    print(f"      {tier_emoji} {alert['metric']}: {alert['message']}")
\ No newline at end of file
+                    print(f"      {tier_emoji} {alert['metric']}: {detector.format_alert(alert)}")
\ No newline at end of file
@@ -8,6 +8,7 @@ Classifies players into roles based on:
 - Defensive usage patterns
 """
 import pandas as pd
+import numpy as np
 from sqlalchemy import text
 from src.utils.db_connection import get_session
 
@@ -28,6 +29,20 @@ class RoleClassifier:
         'FRINGE_ROSTER': 'Minimal playing time',
     }
     
+    def __init__(self):
+        # player_id -> name, loaded on first classify_all_seasons call
+        self.player_names = None
+    
+    def _load_player_names(self):
+        """Load the player_id -> name map (one query, no per-scan JOIN)"""
+        session = get_session()
+        
+        try:
+            return dict(session.execute(text("SELECT player_id, name FROM players")).fetchall())
+        
+        finally:
+            session.close()
+    
     def classify_season(self, player_id, season, games_played, pa, team_games=162):
         """
         Classify a player's role for a specific season
@@ -103,59 +118,73 @@ class RoleClassifier:
             query = """
                 SELECT 
                     ss.player_id,
-                    p.name,
                     ss.season,
                     ss.team,
                     ss.games,
                     ss.pa
                 FROM season_stats ss
-                JOIN players p ON ss.player_id = p.player_id
                 WHERE ss.games IS NOT NULL AND ss.pa IS NOT NULL
             """
             
+            params = {}
             if player_id:
-                query += f" AND ss.player_id = {player_id}"
-            
-            query += " ORDER BY ss.season, p.name"
+                query += " AND ss.player_id = :player_id"
+                params['player_id'] = player_id
             
-            df = pd.read_sql(query, session.bind)
+            # Server-side cursor, read in chunks so a full-database pass
+            # streams instead of materializing every driver row at once
+            connection = session.connection(execution_options={'stream_results': True})
+            chunks = list(pd.read_sql(text(query), connection, params=params, chunksize=50_000))
+            df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
             
             if df.empty:
                 print("No data found")
                 return pd.DataFrame()
             
-            # Classify each season
-            classifications = []
+            # Names from the cached map (reloaded if new players appeared)
+            if self.player_names is None:
+                self.player_names = self._load_player_names()
+            names = df['player_id'].map(self.player_names)
+            if names.isna().any():
+                self.player_names = self._load_player_names()
+                names = df['player_id'].map(self.player_names)
+            df.insert(1, 'name', names)
+            df = df.sort_values(['season', 'name'], kind='stable', ignore_index=True)
+            
+            # Classify every season at once (same decision tree as
+            # classify_season); shortened 2020 COVID season had 60 games
+            team_games = np.where(df['season'] == 2020, 60, 162)
+            pa_per_team_game = df['pa'].to_numpy() / team_games
+            games_played_pct = df['games'].to_numpy() / team_games
+            
+            conditions = [
+                (pa_per_team_game >= 3.5) & (games_played_pct >= 0.75),
+                (pa_per_team_game >= 3.0) & (games_played_pct >= 0.65),
+                pa_per_team_game >= 2.0,
+                (pa_per_team_game >= 1.0) & (games_played_pct < 0.25),
+                pa_per_team_game >= 1.0,
+            ]
+            roles = ['EVERYDAY_REGULAR', 'EVERYDAY_REGULAR', 'ROTATIONAL_REGULAR',
+                     'DEFENSIVE_REPLACEMENT', 'UTILITY_DEPTH']
+            confidences = [0.95, 0.90, 0.85, 0.75, 0.75]
+            
+            # Role and team as categoricals: int8 codes per row instead of
+            # one string object each
+            role_names = list(self.ROLE_DEFINITIONS)
+            role_codes = np.select(
+                conditions,
+                [role_names.index(role) for role in roles],
+                default=role_names.index('FRINGE_ROSTER')
+            ).astype(np.int8)
             
-            for _, row in df.iterrows():
-                # Estimate team games (handle shortened seasons)
-                if row['season'] == 2020:
-                    team_games = 60  # COVID season
-                else:
-                    team_games = 162
-                
-                result = self.classify_season(
-                    row['player_id'],
-                    row['season'],
-                    row['games'],
-                    row['pa'],
-                    team_games
-                )
-                
-                classifications.append({
-                    'player_id': row['player_id'],
-                    'name': row['name'],
-                    'season': row['season'],
-                    'team': row['team'],
-                    'games': row['games'],
-                    'pa': row['pa'],
-                    'role': result['role'],
-                    'confidence': result['confidence'],
-                    'pa_per_team_game': result['pa_per_team_game'],
-                    'games_played_pct': result['games_played_pct'],
-                })
+            classifications = df[['player_id', 'name', 'season', 'team', 'games', 'pa']].copy()
+            classifications['team'] = classifications['team'].astype('category')
+            classifications['role'] = pd.Categorical.from_codes(role_codes, categories=role_names)
+            classifications['confidence'] = np.select(conditions, confidences, default=0.90)
+            classifications['pa_per_team_game'] = pa_per_team_game
+            classifications['games_played_pct'] = games_played_pct
             
-            return pd.DataFrame(classifications)
+            return classifications
         
         finally:
             session.close()
@@ -189,7 +218,7 @@ if __name__ == "__main__":
         
         print(f"\n📈 Role Distribution:")
         role_counts = classifications['role'].value_counts()
-        for role, count in role_counts.items():
+        for role, count in role_counts[role_counts > 0].items():
             print(f"   {role}: {count} seasons")
     
     # Now classify ALL players
@@ -199,7 +228,7 @@ if __name__ == "__main__":
     print(f"\n✅ Classified {len(all_classifications)} player-seasons")
     print(f"\n📊 Overall Role Distribution:")
     role_counts = all_classifications['role'].value_counts()
-    for role, count in role_counts.items():
+    for role, count in role_counts[role_counts > 0].items():
         pct = count / len(all_classifications) * 100
         print(f"   {role}: {count} ({pct:.1f}%)")
     
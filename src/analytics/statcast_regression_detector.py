@@ -8,25 +8,239 @@ Improves buy/sell signal accuracy by incorporating:
 - Launch angle optimization
 """
 import sys
+from functools import lru_cache
 from pathlib import Path
 
 project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
 import pandas as pd
-from sqlalchemy import text
+import numpy as np
+from sqlalchemy import text, bindparam
 from src.utils.db_connection import get_session
 from src.analytics.regression_detector import RegressionDetector
 
 
+# Statcast alert metrics by code; statcast_signal_codes returns index + 1
+STATCAST_METRICS = (
+    'STATCAST_UNLUCKY', 'STATCAST_LUCKY',
+    'UNSUSTAINABLE_POWER', 'UNLUCKY_POWER',
+    'EV_DECLINE',
+    'XWOBA_UNLUCKY', 'XWOBA_LUCKY',
+)
+
+
+def statcast_signal_codes(babip_delta, hard_hit_delta, iso_delta, ev_delta, barrel_delta, woba_diff):
+    """
+    Statcast detector decisions for many players in one pass
+    
+    Same thresholds as the per-player detect_* methods. NaN compares False,
+    so missing stats never flag.
+    
+    Args:
+        Aligned (N,) float arrays of current-minus-career deltas (woba_diff
+        is wOBA - xwOBA)
+    
+    Returns:
+        (N, 4) int8 array, one column per detector (luck, power, exit velo,
+        expected stats): 1-based index into STATCAST_METRICS, 0 for no alert
+    """
+    codes = np.zeros((len(babip_delta), 4), dtype=np.int8)
+    
+    codes[:, 0] = np.select(
+        [(babip_delta < -0.040) & (hard_hit_delta > 2), (babip_delta > 0.040) & (hard_hit_delta < -2)],
+        [1, 2], 0
+    )
+    codes[:, 1] = np.select(
+        [(iso_delta > 0.060) & (ev_delta < 0) & (barrel_delta < 0),
+         (iso_delta < -0.050) & (ev_delta > 0) & (barrel_delta > 1)],
+        [3, 4], 0
+    )
+    codes[:, 2] = np.where(ev_delta < -2.0, 5, 0)
+    codes[:, 3] = np.select([woba_diff < -0.020, woba_diff > 0.020], [6, 7], 0)
+    
+    return codes
+
+
+# Career Statcast averages over seasons with 50+ batted balls
+_Q_CAREER_STATCAST = text("""
+    SELECT 
+        AVG(exit_velo) as avg_exit_velo,
+        AVG(hard_hit_pct) as avg_hard_hit_pct,
+        AVG(barrel_pct) as avg_barrel_pct,
+        AVG(sweet_spot_pct) as avg_sweet_spot_pct,
+        COUNT(*) as seasons
+    FROM statcast_data
+    WHERE player_id = :player_id
+      AND season < :season
+      AND batted_balls >= 50
+""")
+
+
+@lru_cache(maxsize=8192)
+def load_career_statcast_baseline(player_id, current_season):
+    """
+    Career average Statcast metrics (excluding current season), cached per process
+    
+    Callers must not mutate the returned dict; it is shared.
+    
+    Returns:
+        Dict with career Statcast baselines, or None below 2 seasons
+    """
+    session = get_session()
+    
+    try:
+        result = session.execute(_Q_CAREER_STATCAST, {'player_id': player_id, 'season': current_season})
+        row = result.fetchone()
+        
+        if row and row[4] >= 2:  # At least 2 seasons of data
+            exit_velo, hard_hit_pct, barrel_pct, sweet_spot_pct, seasons = row
+            return {
+                'career_exit_velo': float(exit_velo) if exit_velo else None,
+                'career_hard_hit_pct': float(hard_hit_pct) if hard_hit_pct else None,
+                'career_barrel_pct': float(barrel_pct) if barrel_pct else None,
+                'career_sweet_spot_pct': float(sweet_spot_pct) if sweet_spot_pct else None,
+                'seasons': int(seasons)
+            }
+        return None
+        
+    finally:
+        session.close()
+
+
 class StatcastRegressionDetector(RegressionDetector):
     """
     Enhanced regression detector using Statcast metrics
     """
     
+    # Statcast alert metric -> (signal, tier, confidence, explanation template)
+    STATCAST_ALERTS = {
+        'STATCAST_UNLUCKY': ('BUY', 1, 'HIGH', "BABIP {current_babip:.3f} is low but hard-hit% {hard_hit_pct:.1f}% is up {hard_hit_delta:+.1f}% - Unlucky!"),
+        'STATCAST_LUCKY': ('SELL', 1, 'HIGH', "BABIP {current_babip:.3f} is high but hard-hit% {hard_hit_pct:.1f}% is down {hard_hit_delta:.1f}% - Lucky!"),
+        'UNSUSTAINABLE_POWER': ('SELL', 1, 'HIGH', "ISO +{iso_delta:.3f} but EV down {ev_delta:.1f} mph, Barrel% down {barrel_delta:.1f}% - Unsustainable!"),
+        'UNLUCKY_POWER': ('BUY', 1, 'HIGH', "ISO down {iso_delta:.3f} but EV up {ev_delta:+.1f} mph, Barrel% up {barrel_delta:+.1f}% - Unlucky power!"),
+        'EV_DECLINE': ('SELL', 2, 'MEDIUM', "Exit velo down {ev_delta:.1f} mph - Possible skill decline"),
+        'XWOBA_UNLUCKY': ('BUY', 2, 'MEDIUM', "wOBA {current_woba:.3f} vs xwOBA {xwoba:.3f} ({woba_diff:-.3f}) - Unlucky!"),
+        'XWOBA_LUCKY': ('SELL', 2, 'MEDIUM', "wOBA {current_woba:.3f} vs xwOBA {xwoba:.3f} ({woba_diff:+.3f}) - Lucky!"),
+    }
+    
+    _Q_STATCAST = text("""
+        SELECT 
+            exit_velo, hard_hit_pct, barrel_pct, sweet_spot_pct,
+            xba, xslg, xwoba, batted_balls
+        FROM statcast_data
+        WHERE player_id = :player_id
+          AND season = :season
+    """)
+    
+    _Q_STATCAST_BULK = text("""
+        SELECT 
+            player_id, exit_velo, hard_hit_pct, barrel_pct, sweet_spot_pct,
+            xba, xslg, xwoba, batted_balls
+        FROM statcast_data
+        WHERE player_id IN :player_ids
+          AND season = :season
+    """).bindparams(bindparam('player_ids', expanding=True))
+    
+    # Career Statcast averages (2+ seasons of 50+ batted balls) per player
+    _Q_CAREER_STATCAST_BULK = text("""
+        SELECT 
+            player_id,
+            AVG(exit_velo) as avg_exit_velo,
+            AVG(hard_hit_pct) as avg_hard_hit_pct,
+            AVG(barrel_pct) as avg_barrel_pct,
+            AVG(sweet_spot_pct) as avg_sweet_spot_pct,
+            COUNT(*) as seasons
+        FROM statcast_data
+        WHERE player_id IN :player_ids
+          AND season < :season
+          AND batted_balls >= 50
+        GROUP BY player_id
+        HAVING COUNT(*) >= 2
+    """).bindparams(bindparam('player_ids', expanding=True))
+    
+    # season_stats rows in analyze_player_season's column order, largest stint first
+    _Q_CURRENT_BULK = text("""
+        SELECT 
+            ss.player_id,
+            ss.team,
+            ss.pa,
+            ss.games,
+            CAST(ss.avg AS DOUBLE PRECISION),
+            CAST(ss.obp AS DOUBLE PRECISION),
+            CAST(ss.slg AS DOUBLE PRECISION),
+            CAST(ss.woba AS DOUBLE PRECISION),
+            ss.wrc_plus,
+            CAST(ss.babip AS DOUBLE PRECISION),
+            CAST(ss.bb_pct AS DOUBLE PRECISION),
+            CAST(ss.k_pct AS DOUBLE PRECISION),
+            CAST(ss.iso AS DOUBLE PRECISION),
+            CAST(ss.hr_fb_pct AS DOUBLE PRECISION)
+        FROM season_stats ss
+        WHERE ss.player_id IN :player_ids
+          AND ss.season = :season
+        ORDER BY ss.pa DESC
+    """).bindparams(bindparam('player_ids', expanding=True))
+    
+    # Report stints with their stats, career and Statcast baselines
+    # (schema_rollups.sql), largest stint first within each player
+    _Q_REGRESSION_INPUT = text("""
+        SELECT *
+        FROM player_regression_input
+        WHERE season = :season
+          AND pa >= :min_pa
+        ORDER BY name, player_id, pa DESC
+    """)
+    
+    _Q_REGRESSION_INPUT_PLAYER = text("""
+        SELECT *
+        FROM player_regression_input
+        WHERE player_id = :player_id
+          AND season = :season
+        ORDER BY pa DESC
+    """)
+    
     def __init__(self):
         super().__init__()
     
+    def _statcast_alert(self, metric, values, explain=True):
+        """
+        Build a Statcast alert dict from STATCAST_ALERTS and its template values
+        
+        Args:
+            explain: Format the explanation now; otherwise keep the template
+                values and leave it to format_alert
+        """
+        signal, tier, confidence, template = self.STATCAST_ALERTS[metric]
+        alert = {
+            'signal': signal,
+            'tier': tier,
+            'metric': metric,
+            'confidence': confidence
+        }
+        if explain:
+            alert['explanation'] = template.format(**values)
+        else:
+            alert['values'] = values
+        return alert
+    
+    def format_alert(self, alert):
+        """
+        Build an alert's display text on demand
+        
+        Handles Statcast alerts (explanation, or its template values) as
+        well as traditional ones (message, or raw season-scan fields).
+        
+        Returns:
+            Message string
+        """
+        if alert['metric'] in self.STATCAST_ALERTS:
+            if 'explanation' in alert:
+                return alert['explanation']
+            return self.STATCAST_ALERTS[alert['metric']][3].format(**alert['values'])
+        
+        return alert.get('message') or super().format_alert(alert)
+    
     def get_statcast_data(self, player_id, season):
         """
         Get Statcast data for a player-season
@@ -37,28 +251,20 @@ class StatcastRegressionDetector(RegressionDetector):
         session = get_session()
         
         try:
-            query = text("""
-                SELECT 
-                    exit_velo, hard_hit_pct, barrel_pct, sweet_spot_pct,
-                    xba, xslg, xwoba, batted_balls
-                FROM statcast_data
-                WHERE player_id = :player_id
-                  AND season = :season
-            """)
-            
-            result = session.execute(query, {'player_id': player_id, 'season': season})
+            result = session.execute(self._Q_STATCAST, {'player_id': player_id, 'season': season})
             row = result.fetchone()
             
             if row:
+                exit_velo, hard_hit_pct, barrel_pct, sweet_spot_pct, xba, xslg, xwoba, batted_balls = row
                 return {
-                    'exit_velo': float(row[0]) if row[0] else None,
-                    'hard_hit_pct': float(row[1]) if row[1] else None,
-                    'barrel_pct': float(row[2]) if row[2] else None,
-                    'sweet_spot_pct': float(row[3]) if row[3] else None,
-                    'xba': float(row[4]) if row[4] else None,
-                    'xslg': float(row[5]) if row[5] else None,
-                    'xwoba': float(row[6]) if row[6] else None,
-                    'batted_balls': int(row[7]) if row[7] else None
+                    'exit_velo': float(exit_velo) if exit_velo else None,
+                    'hard_hit_pct': float(hard_hit_pct) if hard_hit_pct else None,
+                    'barrel_pct': float(barrel_pct) if barrel_pct else None,
+                    'sweet_spot_pct': float(sweet_spot_pct) if sweet_spot_pct else None,
+                    'xba': float(xba) if xba else None,
+                    'xslg': float(xslg) if xslg else None,
+                    'xwoba': float(xwoba) if xwoba else None,
+                    'batted_balls': int(batted_balls) if batted_balls else None
                 }
             return None
             
@@ -69,40 +275,184 @@ class StatcastRegressionDetector(RegressionDetector):
         """
         Get career average Statcast metrics (excluding current season)
         
+        Cached per (player_id, season); see invalidate_baselines.
+        
         Returns:
             Dict with career Statcast baselines
         """
+        baseline = load_career_statcast_baseline(player_id, current_season)
+        return dict(baseline) if baseline else None
+    
+    def invalidate_baselines(self):
+        """Forget cached career Statcast baselines (after statcast_data changes)"""
+        load_career_statcast_baseline.cache_clear()
+    
+    def get_statcast_data_bulk(self, player_ids, season):
+        """
+        Get Statcast data for several players in one query
+        
+        Returns:
+            Dict of player_id -> get_statcast_data dict (players without a
+            Statcast row are absent)
+        """
         session = get_session()
         
         try:
-            query = text("""
-                SELECT 
-                    AVG(exit_velo) as avg_exit_velo,
-                    AVG(hard_hit_pct) as avg_hard_hit_pct,
-                    AVG(barrel_pct) as avg_barrel_pct,
-                    AVG(sweet_spot_pct) as avg_sweet_spot_pct,
-                    COUNT(*) as seasons
-                FROM statcast_data
-                WHERE player_id = :player_id
-                  AND season < :season
-                  AND batted_balls >= 50
-            """)
+            rows = session.execute(self._Q_STATCAST_BULK, {'player_ids': list(player_ids), 'season': season}).fetchall()
+        
+        finally:
+            session.close()
+        
+        return {
+            player_id: {
+                'exit_velo': float(exit_velo) if exit_velo else None,
+                'hard_hit_pct': float(hard_hit_pct) if hard_hit_pct else None,
+                'barrel_pct': float(barrel_pct) if barrel_pct else None,
+                'sweet_spot_pct': float(sweet_spot_pct) if sweet_spot_pct else None,
+                'xba': float(xba) if xba else None,
+                'xslg': float(xslg) if xslg else None,
+                'xwoba': float(xwoba) if xwoba else None,
+                'batted_balls': int(batted_balls) if batted_balls else None
+            }
+            for player_id, exit_velo, hard_hit_pct, barrel_pct, sweet_spot_pct, xba, xslg, xwoba, batted_balls in rows
+        }
+    
+    def get_career_statcast_baseline_bulk(self, player_ids, current_season):
+        """
+        Get career Statcast baselines for several players in one query
+        
+        Returns:
+            Dict of player_id -> get_career_statcast_baseline dict (players
+            with fewer than 2 qualifying seasons are absent)
+        """
+        session = get_session()
+        
+        try:
+            rows = session.execute(self._Q_CAREER_STATCAST_BULK, {'player_ids': list(player_ids), 'season': current_season}).fetchall()
+        
+        finally:
+            session.close()
+        
+        return {
+            player_id: {
+                'career_exit_velo': float(exit_velo) if exit_velo else None,
+                'career_hard_hit_pct': float(hard_hit_pct) if hard_hit_pct else None,
+                'career_barrel_pct': float(barrel_pct) if barrel_pct else None,
+                'career_sweet_spot_pct': float(sweet_spot_pct) if sweet_spot_pct else None,
+                'seasons': int(seasons)
+            }
+            for player_id, exit_velo, hard_hit_pct, barrel_pct, sweet_spot_pct, seasons in rows
+        }
+    
+    def get_current_stats_bulk(self, player_ids, season):
+        """
+        Get season_stats rows for several players in one query
+        
+        Multi-team seasons keep the stint with the most PA.
+        
+        Returns:
+            Dict of player_id -> row in analyze_player_season's column order
+            (see RegressionDetector._analysis_from_row)
+        """
+        session = get_session()
+        
+        try:
+            rows = session.execute(self._Q_CURRENT_BULK, {'player_ids': list(player_ids), 'season': season}).fetchall()
+        
+        finally:
+            session.close()
+        
+        current_rows = {}
+        for player_id, *row in rows:
+            current_rows.setdefault(player_id, tuple(row))
+        return current_rows
+    
+    def get_regression_inputs(self, season, min_pa=100, player_id=None):
+        """
+        Get every input the Statcast report needs in one query
+        
+        Reads the player_regression_input view; players missing from the
+        career rollups (not refreshed yet) fall back to direct aggregation.
+        
+        Args:
+            player_id: Load just this player's stints (min_pa is ignored)
+        
+        Returns:
+            Tuple of (stints, current_rows, career_baselines, statcast,
+            statcast_baselines): stints is a list of (player_id, name,
+            season, team) ordered by name, the rest are dicts keyed by
+            player_id shaped like the matching *_bulk getters
+        """
+        session = get_session()
+        
+        try:
+            if player_id is None:
+                rows = session.execute(self._Q_REGRESSION_INPUT, {'season': season, 'min_pa': min_pa}).fetchall()
+            else:
+                rows = session.execute(self._Q_REGRESSION_INPUT_PLAYER, {'player_id': player_id, 'season': season}).fetchall()
+        
+        finally:
+            session.close()
+        
+        stints = []
+        current_rows = {}
+        career_baselines = {}
+        statcast = {}
+        statcast_baselines = {}
+        
+        for row in rows:
+            r = row._mapping
+            pid = r['player_id']
+            stints.append((pid, r['name'], r['season'], r['team']))
             
-            result = session.execute(query, {'player_id': player_id, 'season': current_season})
-            row = result.fetchone()
+            if pid in current_rows:
+                continue  # Smaller stint of a multi-team season
             
-            if row and row[4] >= 2:  # At least 2 seasons of data
-                return {
-                    'career_exit_velo': float(row[0]) if row[0] else None,
-                    'career_hard_hit_pct': float(row[1]) if row[1] else None,
-                    'career_barrel_pct': float(row[2]) if row[2] else None,
-                    'career_sweet_spot_pct': float(row[3]) if row[3] else None,
-                    'seasons': int(row[4])
+            current_rows[pid] = tuple(row[3:16])
+            
+            if not r['has_baseline']:
+                career_baselines[pid] = self._get_player_career_baseline(pid, season)
+            elif r['total_pa'] and r['total_pa'] >= 200:  # Need 200+ career PA
+                career_baselines[pid] = {
+                    'career_babip': r['career_babip'],
+                    'career_bb_pct': r['career_bb_pct'],
+                    'career_k_pct': r['career_k_pct'],
+                    'career_iso': r['career_iso'],
+                    'career_hr_fb_pct': r['career_hr_fb_pct'],
+                    'total_pa': r['total_pa'],
+                    'seasons': r['seasons']
                 }
-            return None
+            else:
+                career_baselines[pid] = None
             
-        finally:
-            session.close()
+            if r['has_statcast']:
+                statcast[pid] = {
+                    'exit_velo': float(r['exit_velo']) if r['exit_velo'] else None,
+                    'hard_hit_pct': float(r['hard_hit_pct']) if r['hard_hit_pct'] else None,
+                    'barrel_pct': float(r['barrel_pct']) if r['barrel_pct'] else None,
+                    'sweet_spot_pct': float(r['sweet_spot_pct']) if r['sweet_spot_pct'] else None,
+                    'xba': float(r['xba']) if r['xba'] else None,
+                    'xslg': float(r['xslg']) if r['xslg'] else None,
+                    'xwoba': float(r['xwoba']) if r['xwoba'] else None,
+                    'batted_balls': int(r['batted_balls']) if r['batted_balls'] else None
+                }
+            
+            if not r['has_statcast_baseline']:
+                baseline = self.get_career_statcast_baseline(pid, season)
+            elif r['statcast_seasons'] >= 2:  # At least 2 seasons of data
+                baseline = {
+                    'career_exit_velo': float(r['career_exit_velo']) if r['career_exit_velo'] else None,
+                    'career_hard_hit_pct': float(r['career_hard_hit_pct']) if r['career_hard_hit_pct'] else None,
+                    'career_barrel_pct': float(r['career_barrel_pct']) if r['career_barrel_pct'] else None,
+                    'career_sweet_spot_pct': float(r['career_sweet_spot_pct']) if r['career_sweet_spot_pct'] else None,
+                    'seasons': int(r['statcast_seasons'])
+                }
+            else:
+                baseline = None
+            if baseline:
+                statcast_baselines[pid] = baseline
+        
+        return stints, current_rows, career_baselines, statcast, statcast_baselines
     
     def detect_lucky_vs_unlucky(self, current_stats, statcast_data, career_baseline):
         """
@@ -121,31 +471,21 @@ class StatcastRegressionDetector(RegressionDetector):
         hard_hit_pct = statcast_data.get('hard_hit_pct')
         career_hard_hit = career_baseline.get('career_hard_hit_pct')
         
-        if not all([current_babip, career_babip, hard_hit_pct, career_hard_hit]):
+        if current_babip is None or career_babip is None or hard_hit_pct is None or career_hard_hit is None:
             return None
         
         babip_delta = current_babip - career_babip
         hard_hit_delta = hard_hit_pct - career_hard_hit
         
+        values = {'current_babip': current_babip, 'hard_hit_pct': hard_hit_pct, 'hard_hit_delta': hard_hit_delta}
+        
         # UNLUCKY: Low BABIP but high hard-hit% = BUY
         if babip_delta < -0.040 and hard_hit_delta > 2:
-            return {
-                'signal': 'BUY',
-                'tier': 1,
-                'metric': 'STATCAST_UNLUCKY',
-                'explanation': f"BABIP {current_babip:.3f} is low but hard-hit% {hard_hit_pct:.1f}% is up {hard_hit_delta:+.1f}% - Unlucky!",
-                'confidence': 'HIGH'
-            }
+            return self._statcast_alert('STATCAST_UNLUCKY', values)
         
         # LUCKY: High BABIP but declining hard-hit% = SELL
         elif babip_delta > 0.040 and hard_hit_delta < -2:
-            return {
-                'signal': 'SELL',
-                'tier': 1,
-                'metric': 'STATCAST_LUCKY',
-                'explanation': f"BABIP {current_babip:.3f} is high but hard-hit% {hard_hit_pct:.1f}% is down {hard_hit_delta:.1f}% - Lucky!",
-                'confidence': 'HIGH'
-            }
+            return self._statcast_alert('STATCAST_LUCKY', values)
         
         return None
     
@@ -166,33 +506,23 @@ class StatcastRegressionDetector(RegressionDetector):
         barrel_pct = statcast_data.get('barrel_pct')
         career_barrel_pct = career_baseline.get('career_barrel_pct')
         
-        if not all([current_iso, career_iso, exit_velo, career_exit_velo, 
-                   barrel_pct, career_barrel_pct]):
+        if (current_iso is None or career_iso is None or exit_velo is None
+                or career_exit_velo is None or barrel_pct is None or career_barrel_pct is None):
             return None
         
         iso_delta = current_iso - career_iso
         ev_delta = exit_velo - career_exit_velo
         barrel_delta = barrel_pct - career_barrel_pct
         
+        values = {'iso_delta': iso_delta, 'ev_delta': ev_delta, 'barrel_delta': barrel_delta}
+        
         # Power spike NOT backed by Statcast = SELL
         if iso_delta > 0.060 and ev_delta < 0 and barrel_delta < 0:
-            return {
-                'signal': 'SELL',
-                'tier': 1,
-                'metric': 'UNSUSTAINABLE_POWER',
-                'explanation': f"ISO +{iso_delta:.3f} but EV down {ev_delta:.1f} mph, Barrel% down {barrel_delta:.1f}% - Unsustainable!",
-                'confidence': 'HIGH'
-            }
+            return self._statcast_alert('UNSUSTAINABLE_POWER', values)
         
         # Depressed power WITH good Statcast = BUY
         elif iso_delta < -0.050 and ev_delta > 0 and barrel_delta > 1:
-            return {
-                'signal': 'BUY',
-                'tier': 1,
-                'metric': 'UNLUCKY_POWER',
-                'explanation': f"ISO down {iso_delta:.3f} but EV up {ev_delta:+.1f} mph, Barrel% up {barrel_delta:+.1f}% - Unlucky power!",
-                'confidence': 'HIGH'
-            }
+            return self._statcast_alert('UNLUCKY_POWER', values)
         
         return None
     
@@ -209,20 +539,14 @@ class StatcastRegressionDetector(RegressionDetector):
         exit_velo = statcast_data.get('exit_velo')
         career_exit_velo = career_baseline.get('career_exit_velo')
         
-        if not exit_velo or not career_exit_velo:
+        if exit_velo is None or career_exit_velo is None:
             return None
         
         ev_delta = exit_velo - career_exit_velo
         
         # Significant EV decline = SELL (skill deterioration)
         if ev_delta < -2.0:
-            return {
-                'signal': 'SELL',
-                'tier': 2,
-                'metric': 'EV_DECLINE',
-                'explanation': f"Exit velo down {ev_delta:.1f} mph - Possible skill decline",
-                'confidence': 'MEDIUM'
-            }
+            return self._statcast_alert('EV_DECLINE', {'ev_delta': ev_delta})
         
         return None
     
@@ -244,33 +568,137 @@ class StatcastRegressionDetector(RegressionDetector):
         xslg = statcast_data.get('xslg')
         xwoba = statcast_data.get('xwoba')
         
-        if not all([current_woba, xwoba]):
+        if current_woba is None or xwoba is None:
             return None
         
         woba_diff = current_woba - xwoba
         
+        values = {'current_woba': current_woba, 'xwoba': xwoba, 'woba_diff': woba_diff}
+        
         # Actual wOBA significantly BELOW xwOBA = BUY
         if woba_diff < -0.020:
-            return {
-                'signal': 'BUY',
-                'tier': 2,
-                'metric': 'XWOBA_UNLUCKY',
-                'explanation': f"wOBA {current_woba:.3f} vs xwOBA {xwoba:.3f} ({woba_diff:-.3f}) - Unlucky!",
-                'confidence': 'MEDIUM'
-            }
+            return self._statcast_alert('XWOBA_UNLUCKY', values)
         
         # Actual wOBA significantly ABOVE xwOBA = SELL
         elif woba_diff > 0.020:
-            return {
-                'signal': 'SELL',
-                'tier': 2,
-                'metric': 'XWOBA_LUCKY',
-                'explanation': f"wOBA {current_woba:.3f} vs xwOBA {xwoba:.3f} ({woba_diff:+.3f}) - Lucky!",
-                'confidence': 'MEDIUM'
-            }
+            return self._statcast_alert('XWOBA_LUCKY', values)
         
         return None
     
+    def detect_statcast_signals(self, frame):
+        """
+        Run all four Statcast detectors over many players at once
+        
+        Decisions come from statcast_signal_codes; alerts are built only for
+        the rows that flag, and carry their template values instead of an
+        explanation (see format_alert), so only displayed alerts get one.
+        
+        Args:
+            frame: DataFrame indexed by player_id with babip, iso, woba,
+                hard_hit_pct, exit_velo, barrel_pct, xwoba and career_babip,
+                career_iso, career_hard_hit_pct, career_exit_velo,
+                career_barrel_pct columns (NaN where missing)
+        
+        Returns:
+            Dict of player_id -> list of Statcast alerts in detector order
+            (players without alerts are absent)
+        """
+        values = pd.DataFrame({
+            'current_babip': frame['babip'],
+            'hard_hit_pct': frame['hard_hit_pct'],
+            'hard_hit_delta': frame['hard_hit_pct'] - frame['career_hard_hit_pct'],
+            'iso_delta': frame['iso'] - frame['career_iso'],
+            'ev_delta': frame['exit_velo'] - frame['career_exit_velo'],
+            'barrel_delta': frame['barrel_pct'] - frame['career_barrel_pct'],
+            'current_woba': frame['woba'],
+            'xwoba': frame['xwoba'],
+            'woba_diff': frame['woba'] - frame['xwoba'],
+        })
+        codes = statcast_signal_codes(
+            (frame['babip'] - frame['career_babip']).to_numpy(),
+            values['hard_hit_delta'].to_numpy(),
+            values['iso_delta'].to_numpy(),
+            values['ev_delta'].to_numpy(),
+            values['barrel_delta'].to_numpy(),
+            values['woba_diff'].to_numpy()
+        )
+        
+        # Explode only the flagged cells, detector by detector
+        alerts = {}
+        for detector_codes in codes.T:
+            flagged = detector_codes > 0
+            for player_id, code, row in zip(values.index[flagged], detector_codes[flagged],
+                                            values[flagged].to_dict('records')):
+                alerts.setdefault(player_id, []).append(
+                    self._statcast_alert(STATCAST_METRICS[code - 1], row, explain=False)
+                )
+        
+        return alerts
+    
+    def rank_statcast_deltas(self, frame, cutoff=10):
+        """
+        League-relative version of the Statcast luck signals
+        
+        Ranks every player's current-minus-career deltas against the rest
+        of the frame (average ranks, scaled to 0-100), so outliers follow
+        the population instead of fixed thresholds. Missing deltas stay
+        NaN and never flag.
+        
+        Args:
+            frame: Same input as detect_statcast_signals
+            cutoff: Percentile band at each end that counts as an outlier
+        
+        Returns:
+            DataFrame indexed by player_id with a <delta>_pct column per
+            delta and luck_signal: BUY for a bottom-band BABIP delta with a
+            top-band hard-hit delta (or a bottom-band wOBA - xwOBA), SELL
+            for the reverse, None otherwise
+        """
+        deltas = pd.DataFrame({
+            'babip_delta': frame['babip'] - frame['career_babip'],
+            'hard_hit_delta': frame['hard_hit_pct'] - frame['career_hard_hit_pct'],
+            'iso_delta': frame['iso'] - frame['career_iso'],
+            'ev_delta': frame['exit_velo'] - frame['career_exit_velo'],
+            'barrel_delta': frame['barrel_pct'] - frame['career_barrel_pct'],
+            'woba_diff': frame['woba'] - frame['xwoba'],
+        })
+        ranks = deltas.rank(method='average', pct=True) * 100
+        
+        # NaN ranks compare False on both ends
+        low = ranks <= cutoff
+        high = ranks > 100 - cutoff
+        unlucky = (low['babip_delta'] & high['hard_hit_delta']) | low['woba_diff']
+        lucky = (high['babip_delta'] & low['hard_hit_delta']) | high['woba_diff']
+        
+        ranks.columns = [f'{column}_pct' for column in deltas]
+        ranks['luck_signal'] = np.select([unlucky & ~lucky, lucky & ~unlucky], ['BUY', 'SELL'], None)
+        return ranks
+    
+    def _statcast_frame(self, current_rows, career_baselines, statcast, statcast_baselines):
+        """
+        Align prefetched report inputs into one frame for detect_statcast_signals
+        
+        Returns:
+            DataFrame indexed by player_id, one row per player with Statcast data
+        """
+        current = pd.DataFrame.from_dict(
+            {player_id: (row[8], row[11], row[6]) for player_id, row in current_rows.items()},
+            orient='index', columns=['babip', 'iso', 'woba']
+        )
+        career = pd.DataFrame.from_dict(
+            {player_id: baseline for player_id, baseline in career_baselines.items() if baseline},
+            orient='index', columns=['career_babip', 'career_iso']
+        )
+        statcast_df = pd.DataFrame.from_dict(
+            statcast, orient='index', columns=['hard_hit_pct', 'exit_velo', 'barrel_pct', 'xwoba']
+        )
+        statcast_career = pd.DataFrame.from_dict(
+            statcast_baselines, orient='index',
+            columns=['career_hard_hit_pct', 'career_exit_velo', 'career_barrel_pct']
+        )
+        
+        return statcast_df.join([current, career, statcast_career]).astype(float)
+    
     def analyze_player_season_with_statcast(self, player_id, season):
         """
         Enhanced regression analysis with Statcast data
@@ -278,49 +706,56 @@ class StatcastRegressionDetector(RegressionDetector):
         Returns:
             Dict with all signals (traditional + Statcast)
         """
-        # Get traditional regression signals
-        traditional_analysis = self.analyze_player_season(player_id, season)
+        # Stats, both baselines and Statcast in one row of player_regression_input
+        _, current_rows, career_baselines, statcast, statcast_baselines = self.get_regression_inputs(
+            season, player_id=player_id
+        )
         
-        if not traditional_analysis:
+        if player_id not in current_rows:
             return None
         
-        # Get Statcast data
-        statcast_data = self.get_statcast_data(player_id, season)
+        return self.analyze_player_season_with_statcast_prefetched(
+            player_id, season, current_rows[player_id],
+            career_baseline=career_baselines[player_id],
+            statcast_data=statcast.get(player_id),
+            statcast_baseline=statcast_baselines.get(player_id)
+        )
+    
+    def analyze_player_season_with_statcast_prefetched(self, player_id, season, current_row,
+                                                       career_baseline, statcast_data, statcast_baseline):
+        """
+        Enhanced regression analysis on already-loaded data (no queries)
+        
+        Args:
+            current_row: get_current_stats_bulk row
+            career_baseline: _get_player_career_baseline dict, or None
+            statcast_data: get_statcast_data dict, or None
+            statcast_baseline: get_career_statcast_baseline dict, or None
+        
+        Returns:
+            Dict with all signals (traditional + Statcast)
+        """
+        if not career_baseline:
+            return None  # Need career history for regression analysis
+        
+        # Get traditional regression signals
+        traditional_analysis = self._analysis_from_row(player_id, season, current_row, career_baseline)
         
         if not statcast_data:
             # No Statcast data available, return traditional analysis
             return traditional_analysis
         
-        # Get career Statcast baseline
-        statcast_baseline = self.get_career_statcast_baseline(player_id, season)
-        
-        # Get current season stats for comparison
-        session = get_session()
-        try:
-            query = text("""
-                SELECT babip, iso, avg, slg, woba
-                FROM season_stats
-                WHERE player_id = :player_id
-                  AND season = :season
-            """)
-            result = session.execute(query, {'player_id': player_id, 'season': season})
-            row = result.fetchone()
-            
-            current_stats = {
-                'babip': float(row[0]) if row[0] else None,
-                'iso': float(row[1]) if row[1] else None,
-                'avg': float(row[2]) if row[2] else None,
-                'slg': float(row[3]) if row[3] else None,
-                'woba': float(row[4]) if row[4] else None,
-            }
-        finally:
-            session.close()
-        
-        # Get career baseline
-        career_baseline = self._get_player_career_baseline(player_id, season)
+        # Current season stats for comparison
+        current_stats = {
+            'babip': float(current_row[8]) if current_row[8] else None,
+            'iso': float(current_row[11]) if current_row[11] else None,
+            'avg': float(current_row[3]) if current_row[3] else None,
+            'slg': float(current_row[5]) if current_row[5] else None,
+            'woba': float(current_row[6]) if current_row[6] else None,
+        }
         
         if statcast_baseline:
-            career_baseline.update(statcast_baseline)
+            career_baseline = {**career_baseline, **statcast_baseline}
         
         # Run Statcast-based detectors
         statcast_alerts = []
@@ -345,20 +780,35 @@ class StatcastRegressionDetector(RegressionDetector):
         if xstats_signal:
             statcast_alerts.append(xstats_signal)
         
+        return self._combine_statcast_analysis(traditional_analysis, statcast_data, statcast_alerts)
+    
+    def _combine_statcast_analysis(self, traditional_analysis, statcast_data, statcast_alerts):
+        """
+        Merge traditional and Statcast alerts into the enhanced analysis dict
+        
+        Returns:
+            Dict with all signals (traditional + Statcast)
+        """
         # Combine traditional + Statcast alerts
         all_alerts = traditional_analysis['alerts'] + statcast_alerts
         
         # Recalculate net score with Statcast signals
-        tier1_buys = len([a for a in all_alerts if a['tier'] == 1 and a['signal'] == 'BUY'])
-        tier1_sells = len([a for a in all_alerts if a['tier'] == 1 and a['signal'] == 'SELL'])
-        tier2_buys = len([a for a in all_alerts if a['tier'] == 2 and a['signal'] == 'BUY'])
-        tier2_sells = len([a for a in all_alerts if a['tier'] == 2 and a['signal'] == 'SELL'])
+        tier1_buys = tier1_sells = tier2_buys = tier2_sells = 0
+        for alert in all_alerts:
+            tier = alert['tier']
+            signal = alert['signal']
+            if tier == 1:
+                tier1_buys += signal == 'BUY'
+                tier1_sells += signal == 'SELL'
+            elif tier == 2:
+                tier2_buys += signal == 'BUY'
+                tier2_sells += signal == 'SELL'
         
         net_score = (tier1_buys - tier1_sells) + (tier2_buys - tier2_sells) * 0.5
         
         return {
-            'player_id': player_id,
-            'season': season,
+            'player_id': traditional_analysis['player_id'],
+            'season': traditional_analysis['season'],
             'alerts': all_alerts,
             'net_score': net_score,
             'tier1_buys': tier1_buys,
@@ -377,76 +827,77 @@ class StatcastRegressionDetector(RegressionDetector):
         print("STATCAST-ENHANCED REGRESSION DETECTION")
         print("=" * 70)
         
-        # Get all players with recent data
-        session = get_session()
+        # All players with recent data, and everything the analysis needs,
+        # in one query against the player_regression_input view
+        players, current_rows, career_baselines, statcast, statcast_baselines = self.get_regression_inputs(2025)
         
-        try:
-            query = text("""
-                SELECT DISTINCT p.player_id, p.name, ss.season, ss.team
-                FROM players p
-                JOIN season_stats ss ON p.player_id = ss.player_id
-                WHERE ss.season = 2025
-                  AND ss.pa >= 100
-                ORDER BY p.name
-            """)
-            
-            players = session.execute(query).fetchall()
-            
-            print(f"\n📊 Analyzing {len(players)} players with 2025 data\n")
-            
-            # Analyze each player
-            buy_candidates = []
-            sell_candidates = []
-            
-            for player_id, name, season, team in players:
-                analysis = self.analyze_player_season_with_statcast(player_id, season)
-                
-                if analysis and analysis['alerts']:
-                    analysis['name'] = name
-                    analysis['team'] = team
-                    
-                    if analysis['net_score'] >= 2:
-                        buy_candidates.append(analysis)
-                    elif analysis['net_score'] <= -2:
-                        sell_candidates.append(analysis)
-            
-            # Sort by net score
-            buy_candidates.sort(key=lambda x: x['net_score'], reverse=True)
-            sell_candidates.sort(key=lambda x: x['net_score'])
-            
-            # Display results
-            print("\n" + "=" * 70)
-            print("🔴 STRONG SELL CANDIDATES")
-            print("=" * 70)
-            
-            for analysis in sell_candidates[:10]:
-                print(f"\n{analysis['name']} ({analysis['team']}) - Net: {analysis['net_score']:.1f}")
-                
-                for alert in analysis['alerts']:
-                    if alert['signal'] == 'SELL':
-                        tier_emoji = '🔴' if alert['tier'] == 1 else '🟡'
-                        print(f"  {tier_emoji} TIER {alert['tier']} {alert['metric']}: {alert['explanation']}")
+        print(f"\n📊 Analyzing {len(players)} players with 2025 data\n")
+        
+        # Statcast detectors for every player in one array pass
+        frame = self._statcast_frame(current_rows, career_baselines, statcast, statcast_baselines)
+        statcast_alerts = self.detect_statcast_signals(frame)
+        luck_signals = self.rank_statcast_deltas(frame)['luck_signal']
+        
+        # Analyze each player
+        buy_candidates = []
+        sell_candidates = []
+        
+        for player_id, name, season, team in players:
+            career_baseline = career_baselines.get(player_id)
+            if not career_baseline:
+                continue  # Need career history for regression analysis
             
-            print("\n" + "=" * 70)
-            print("🟢 STRONG BUY CANDIDATES")
-            print("=" * 70)
+            analysis = self._analysis_from_row(player_id, season, current_rows[player_id], career_baseline)
+            if player_id in statcast:
+                analysis = self._combine_statcast_analysis(
+                    analysis, statcast[player_id], statcast_alerts.get(player_id, [])
+                )
             
-            for analysis in buy_candidates[:10]:
-                print(f"\n{analysis['name']} ({analysis['team']}) - Net: {analysis['net_score']:+.1f}")
+            if analysis and analysis['alerts']:
+                analysis['name'] = name
+                analysis['team'] = team
                 
-                for alert in analysis['alerts']:
-                    if alert['signal'] == 'BUY':
-                        tier_emoji = '🟢' if alert['tier'] == 1 else '🟡'
-                        print(f"  {tier_emoji} TIER {alert['tier']} {alert['metric']}: {alert['explanation']}")
+                if analysis['net_score'] >= 2:
+                    buy_candidates.append(analysis)
+                elif analysis['net_score'] <= -2:
+                    sell_candidates.append(analysis)
+        
+        # Sort by net score
+        buy_candidates.sort(key=lambda x: x['net_score'], reverse=True)
+        sell_candidates.sort(key=lambda x: x['net_score'])
+        
+        # Display results
+        print("\n" + "=" * 70)
+        print("🔴 STRONG SELL CANDIDATES")
+        print("=" * 70)
+        
+        for analysis in sell_candidates[:10]:
+            print(f"\n{analysis['name']} ({analysis['team']}) - Net: {analysis['net_score']:.1f}")
             
-            print("\n" + "=" * 70)
-            print("SUMMARY")
-            print("=" * 70)
-            print(f"Strong Sell Candidates: {len(sell_candidates)}")
-            print(f"Strong Buy Candidates: {len(buy_candidates)}")
+            for alert in analysis['alerts']:
+                if alert['signal'] == 'SELL':
+                    tier_emoji = '🔴' if alert['tier'] == 1 else '🟡'
+                    print(f"  {tier_emoji} TIER {alert['tier']} {alert['metric']}: {self.format_alert(alert)}")
+        
+        print("\n" + "=" * 70)
+        print("🟢 STRONG BUY CANDIDATES")
+        print("=" * 70)
+        
+        for analysis in buy_candidates[:10]:
+            print(f"\n{analysis['name']} ({analysis['team']}) - Net: {analysis['net_score']:+.1f}")
             
-        finally:
-            session.close()
+            for alert in analysis['alerts']:
+                if alert['signal'] == 'BUY':
+                    tier_emoji = '🟢' if alert['tier'] == 1 else '🟡'
+                    print(f"  {tier_emoji} TIER {alert['tier']} {alert['metric']}: {self.format_alert(alert)}")
+        
+        print("\n" + "=" * 70)
+        print("SUMMARY")
+        print("=" * 70)
+        print(f"Strong Sell Candidates: {len(sell_candidates)}")
+        print(f"Strong Buy Candidates: {len(buy_candidates)}")
+        print(f"Luck Outliers (top/bottom 10% of league): "
+              f"{(luck_signals == 'BUY').sum()} buy, {(luck_signals == 'SELL').sum()} sell")
 
 
 if __name__ == "__main__":
@@ -9,58 +9,224 @@ Track player performance trends over time:
 """
 import pandas as pd
 import numpy as np
-from sqlalchemy import text
+from sqlalchemy import text, bindparam
 from src.utils.db_connection import get_session
 
+
+def least_squares_slopes(series):
+    """
+    Least-squares slope of each series against 0, 1, 2, ... in closed
+    form: cov(x, y) / var(x)
+    
+    Args:
+        series: float array, one series per row along the last axis
+    
+    Returns:
+        Array of slopes (series.shape without the last axis)
+    """
+    years = np.arange(series.shape[-1])
+    years_centered = years - years.mean()
+    return (
+        ((series - series.mean(axis=-1, keepdims=True)) * years_centered).sum(axis=-1)
+        / (years_centered ** 2).sum()
+    )
+
+
 class TrendTracker:
     """
     Analyze historical trends and career trajectories
     """
     
+    # Same rows as _Q_TRAJECTORY for several players at once
+    _Q_TRAJECTORY_BULK = text("""
+        SELECT 
+            player_id, season, team, games, pa,
+            avg, obp, slg, wrc_plus, babip,
+            bb_pct, k_pct, iso, hr
+        FROM season_stats
+        WHERE player_id IN :player_ids
+          AND pa >= 50
+        ORDER BY player_id, season
+    """).bindparams(bindparam('player_ids', expanding=True))
+    
+    # A player's 50+ PA seasons in order
+    _Q_TRAJECTORY = text("""
+        SELECT 
+            season, team, games, pa,
+            avg, obp, slg, wrc_plus, babip,
+            bb_pct, k_pct, iso, hr
+        FROM season_stats
+        WHERE player_id = :player_id
+          AND pa >= 50
+        ORDER BY season
+    """)
+    
+    # Just the columns the detect_* methods read, for the array path
+    _Q_RAW_TRAJECTORY = text("""
+        SELECT season, pa, wrc_plus, babip, iso, k_pct
+        FROM season_stats
+        WHERE player_id = :player_id
+          AND pa >= 50
+        ORDER BY season
+    """)
+    
+    # Qualified seasons with birth dates, shared by _Q_AGING_ALL and _Q_AGING
+    _AGING_SQL = """
+        SELECT 
+            ss.player_id, ss.season, ss.pa, ss.wrc_plus, ss.babip, ss.iso,
+            p.birth_date
+        FROM season_stats ss
+        JOIN players p ON ss.player_id = p.player_id
+        WHERE ss.pa >= 100
+          AND p.birth_date IS NOT NULL
+    """
+    _Q_AGING_ALL = text(_AGING_SQL + """
+        ORDER BY ss.player_id, ss.season
+    """)
+    _Q_AGING = text(_AGING_SQL + """
+          AND ss.player_id IN :player_ids
+        ORDER BY ss.player_id, ss.season
+    """).bindparams(bindparam('player_ids', expanding=True))
+    
+    # Lossless downcasts for loaded seasons: season is NOT NULL and pa is
+    # filtered on, so both fit int16. Nullable counts and rate stats keep
+    # their loaded dtypes so thresholds see the same values
+    COMPACT_DTYPES = {'season': np.int16, 'pa': np.int16}
+    
     def __init__(self):
-        pass
+        # player_id -> trajectory DataFrame (None = no qualifying seasons),
+        # filled by prefetch_trajectories or on first lookup
+        self._traj_cache = {}
+        
+        # player_id -> get_career_arrays dict, for the detect_* methods
+        self._array_cache = {}
+    
+    def _compact(self, df):
+        """Downcast loaded season rows (see COMPACT_DTYPES); team becomes a category"""
+        df = df.astype(self.COMPACT_DTYPES)
+        if 'team' in df:
+            df['team'] = df['team'].astype('category')
+        return df
+    
+    def _add_trend_columns(self, df):
+        """
+        Add year-over-year changes and 3-year rolling averages
+        
+        Works on one player's seasons or, when df has a player_id column,
+        on many players' (grouped by player, seasons in order) at once.
+        """
+        keys = df['player_id'] if 'player_id' in df else np.zeros(len(df), dtype=int)
+        groups = df.groupby(keys, sort=False)
+        
+        # Calculate year-over-year changes
+        yoy_cols = ['wrc_plus', 'babip', 'k_pct', 'bb_pct', 'iso']
+        df[[f'yoy_{col}' for col in yoy_cols]] = groups[yoy_cols].diff().to_numpy()
+        
+        # Calculate rolling averages (3-year)
+        rolling = groups[['wrc_plus', 'babip']].rolling(window=3, min_periods=1).mean().droplevel(0)
+        df['wrc_plus_3yr'] = rolling['wrc_plus']
+        df['babip_3yr'] = rolling['babip']
+        
+        return df
+    
+    def prefetch_trajectories(self, player_ids):
+        """
+        Load career trajectories for many players in one query
+        
+        Later get_player_career_trajectory calls (and the detect_* methods
+        built on it) for these players are served from the instance cache.
+        """
+        player_ids = list(player_ids)
+        session = get_session()
+        
+        try:
+            df = pd.read_sql(self._Q_TRAJECTORY_BULK, session.bind, params={'player_ids': player_ids})
+        
+        finally:
+            session.close()
+        
+        for player_id in player_ids:
+            self._traj_cache[player_id] = None
+        
+        # Derived columns for every player in one grouped pass, then split
+        df = self._add_trend_columns(self._compact(df))
+        for player_id, group in df.groupby('player_id', sort=False):
+            self._traj_cache[player_id] = group.drop(columns='player_id').reset_index(drop=True)
     
     def get_player_career_trajectory(self, player_id):
         """
         Get full career trajectory for a player
         
+        Cached per instance, so the detect_* methods share one load.
+        
         Returns:
             DataFrame with year-over-year changes
         """
+        if player_id in self._traj_cache:
+            return self._traj_cache[player_id]
+        
         session = get_session()
         
         try:
-            query = text("""
-                SELECT 
-                    season, team, games, pa,
-                    avg, obp, slg, wrc_plus, babip,
-                    bb_pct, k_pct, iso, hr
-                FROM season_stats
-                WHERE player_id = :player_id
-                  AND pa >= 50
-                ORDER BY season
-            """)
-            
-            df = pd.read_sql(query, session.bind, params={'player_id': player_id})
-            
-            if df.empty:
-                return None
-            
-            # Calculate year-over-year changes
-            df['yoy_wrc_plus'] = df['wrc_plus'].diff()
-            df['yoy_babip'] = df['babip'].diff()
-            df['yoy_k_pct'] = df['k_pct'].diff()
-            df['yoy_bb_pct'] = df['bb_pct'].diff()
-            df['yoy_iso'] = df['iso'].diff()
-            
-            # Calculate rolling averages (3-year)
-            df['wrc_plus_3yr'] = df['wrc_plus'].rolling(window=3, min_periods=1).mean()
-            df['babip_3yr'] = df['babip'].rolling(window=3, min_periods=1).mean()
-            
-            return df
+            df = pd.read_sql(self._Q_TRAJECTORY, session.bind, params={'player_id': player_id})
         
         finally:
             session.close()
+        
+        trajectory = None if df.empty else self._add_trend_columns(self._compact(df))
+        self._traj_cache[player_id] = trajectory
+        return trajectory
+    
+    def _load_raw_trajectory(self, player_id):
+        """
+        Load the columns the detect_* methods use, as arrays (no DataFrame)
+        
+        Returns:
+            dict of column -> array in season order, or None
+        """
+        session = get_session()
+        
+        try:
+            rows = session.execute(self._Q_RAW_TRAJECTORY, {'player_id': player_id}).fetchall()
+        
+        finally:
+            session.close()
+        
+        if not rows:
+            return None
+        
+        arrays = {}
+        for name, values in zip(('season', 'pa', 'wrc_plus', 'babip', 'iso', 'k_pct'), zip(*rows)):
+            column = np.array(values, dtype=self.COMPACT_DTYPES.get(name))
+            # NULLs and NUMERIC values come back as objects; read_sql would coerce to float
+            arrays[name] = column.astype(float) if column.dtype == object else column
+        return arrays
+    
+    def get_career_arrays(self, player_id):
+        """
+        Get the season, pa, wrc_plus, babip, iso and k_pct columns of a
+        player's trajectory as arrays
+        
+        Served from a prefetched trajectory when there is one, otherwise
+        loaded without building the full trend DataFrame. Cached per instance.
+        
+        Returns:
+            dict of column -> array in season order, or None
+        """
+        if player_id in self._array_cache:
+            return self._array_cache[player_id]
+        
+        if player_id in self._traj_cache:
+            trajectory = self._traj_cache[player_id]
+            arrays = None if trajectory is None else {
+                name: trajectory[name].to_numpy()
+                for name in ('season', 'pa', 'wrc_plus', 'babip', 'iso', 'k_pct')
+            }
+        else:
+            arrays = self._load_raw_trajectory(player_id)
+        
+        self._array_cache[player_id] = arrays
+        return arrays
     
     def detect_breakout_season(self, player_id, season):
         """
@@ -74,30 +240,33 @@ class TrendTracker:
         Returns:
             dict with breakout analysis
         """
-        trajectory = self.get_player_career_trajectory(player_id)
+        career = self.get_career_arrays(player_id)
         
-        if trajectory is None or season not in trajectory['season'].values:
+        if career is None or season not in career['season']:
             return None
         
-        current = trajectory[trajectory['season'] == season].iloc[0]
-        previous = trajectory[trajectory['season'] < season]
+        seasons = career['season']
+        current = np.flatnonzero(seasons == season)[0]
+        previous = seasons < season
         
-        if previous.empty:
+        if not previous.any():
             return None
         
         # Get previous 3 years average (or career if less than 3 years)
-        baseline_wrc = previous['wrc_plus'].tail(3).mean()
-        baseline_babip = previous['babip'].tail(3).mean()
+        baseline_wrc = np.nanmean(career['wrc_plus'][previous][-3:])
+        baseline_babip = np.nanmean(career['babip'][previous][-3:])
         
         # Calculate improvements
-        wrc_improvement = current['wrc_plus'] - baseline_wrc
-        babip_change = current['babip'] - baseline_babip
+        current_wrc = career['wrc_plus'][current]
+        current_pa = career['pa'][current]
+        wrc_improvement = current_wrc - baseline_wrc
+        babip_change = career['babip'][current] - baseline_babip
         k_improvement = baseline_wrc  # Use previous for K% comparison
         
         # Determine if breakout
         is_breakout = (
             wrc_improvement >= 20 and
-            current['pa'] >= 400 and
+            current_pa >= 400 and
             babip_change < 0.040  # Not purely BABIP-driven
         )
         
@@ -105,9 +274,9 @@ class TrendTracker:
             'is_breakout': is_breakout,
             'wrc_improvement': wrc_improvement,
             'baseline_wrc': baseline_wrc,
-            'current_wrc': current['wrc_plus'],
+            'current_wrc': current_wrc,
             'babip_change': babip_change,
-            'pa': current['pa'],
+            'pa': current_pa,
             'confidence': 'HIGH' if is_breakout and babip_change < 0.020 else 'MEDIUM'
         }
     
@@ -118,27 +287,18 @@ class TrendTracker:
         Returns:
             dict with decline analysis
         """
-        trajectory = self.get_player_career_trajectory(player_id)
+        career = self.get_career_arrays(player_id)
         
-        if trajectory is None or len(trajectory) < 3:
+        if career is None or len(career['season']) < 3:
             return None
         
-        recent = trajectory.tail(lookback_years)
+        # wRC+ (consistent decline), ISO (power) and K% (contact) trends
+        # over the most recent seasons
+        trends = np.stack([career['wrc_plus'], career['iso'], career['k_pct']]).astype(float)
+        trends = trends[:, -lookback_years:]
+        wrc_trend = trends[0]
         
-        # Check for consistent decline in wRC+
-        wrc_trend = recent['wrc_plus'].values
-        
-        # Linear regression to detect trend
-        years = np.arange(len(wrc_trend))
-        slope = np.polyfit(years, wrc_trend, 1)[0]
-        
-        # Check if power is declining (ISO trend)
-        iso_trend = recent['iso'].values
-        iso_slope = np.polyfit(years, iso_trend, 1)[0]
-        
-        # Check if contact is declining (K% trend)
-        k_trend = recent['k_pct'].values
-        k_slope = np.polyfit(years, k_trend, 1)[0]
+        slope, iso_slope, k_slope = least_squares_slopes(trends)
         
         is_declining = slope < -5  # Losing >5 wRC+ points per year
         
@@ -159,71 +319,171 @@ class TrendTracker:
         Returns:
             dict with peak info
         """
-        trajectory = self.get_player_career_trajectory(player_id)
+        career = self.get_career_arrays(player_id)
         
-        if trajectory is None or trajectory.empty:
+        if career is None:
             return None
         
         # Filter to meaningful seasons (200+ PA)
-        meaningful = trajectory[trajectory['pa'] >= 200].copy()
+        meaningful = career['pa'] >= 200
         
-        if meaningful.empty:
+        if not meaningful.any():
             return None
         
-        # Find peak wRC+ season
-        peak_season = meaningful.loc[meaningful['wrc_plus'].idxmax()]
+        seasons = career['season'][meaningful]
+        pa = career['pa'][meaningful]
+        wrc_plus = career['wrc_plus'][meaningful].astype(float)
+        
+        # Find peak wRC+ season (nanargmax skips missing values like idxmax)
+        peak = np.nanargmax(wrc_plus)
         
         # Check if currently at peak
-        latest_season = meaningful.iloc[-1]
-        at_peak = (latest_season['wrc_plus'] >= peak_season['wrc_plus'] * 0.95)
+        at_peak = (wrc_plus[-1] >= wrc_plus[peak] * 0.95)
         
         # Years since peak
-        years_since_peak = latest_season['season'] - peak_season['season']
+        years_since_peak = seasons[-1] - seasons[peak]
         
         return {
-            'peak_season': int(peak_season['season']),
-            'peak_wrc_plus': int(peak_season['wrc_plus']),
-            'peak_pa': int(peak_season['pa']),
-            'current_season': int(latest_season['season']),
-            'current_wrc_plus': int(latest_season['wrc_plus']),
+            'peak_season': int(seasons[peak]),
+            'peak_wrc_plus': int(wrc_plus[peak]),
+            'peak_pa': int(pa[peak]),
+            'current_season': int(seasons[-1]),
+            'current_wrc_plus': int(wrc_plus[-1]),
             'at_peak': at_peak,
             'years_since_peak': int(years_since_peak),
-            'career_seasons': len(meaningful)
+            'career_seasons': int(meaningful.sum())
         }
     
-    def calculate_aging_curve(self, player_id):
+    def scan_roster(self, player_ids, season, lookback_years=3):
         """
-        Calculate player's aging curve (performance by age)
+        Breakout, decline and peak analysis for many players at once
+        
+        Same criteria as detect_breakout_season, detect_decline_trend and
+        identify_career_peak, computed with grouped/array operations over
+        all trajectories instead of one method call per player. Uncached
+        trajectories are loaded with prefetch_trajectories.
         
         Returns:
-            DataFrame with age-based performance
+            DataFrame indexed by player_id, one row per player with a
+            trajectory. Breakout columns are NaN for players without that
+            season and earlier ones, decline columns for players with fewer
+            than 3 seasons, peak columns for players without a 200+ PA
+            season with a known wRC+. Filter on is_breakout / is_declining / at_peak
         """
+        player_ids = list(player_ids)
+        missing = [player_id for player_id in player_ids if player_id not in self._traj_cache]
+        if missing:
+            self.prefetch_trajectories(missing)
+        
+        trajectories = {
+            player_id: self._traj_cache[player_id][['season', 'pa', 'wrc_plus', 'babip', 'iso', 'k_pct']]
+            for player_id in player_ids if self._traj_cache[player_id] is not None
+        }
+        if not trajectories:
+            return pd.DataFrame()
+        
+        df = pd.concat(trajectories, names=['player_id', None]).reset_index(level=0).reset_index(drop=True)
+        result = pd.DataFrame(index=pd.Index(list(trajectories), name='player_id'))
+        
+        # Breakout: the season's (first) row vs the mean of the 3 rows before it
+        previous = df[df['season'] < season]
+        baseline = previous.groupby('player_id', sort=False).tail(3).groupby('player_id')[['wrc_plus', 'babip']].mean()
+        current = df[df['season'] == season].drop_duplicates('player_id').set_index('player_id')
+        current = current[['wrc_plus', 'babip', 'pa']].join(baseline, rsuffix='_baseline', how='inner')
+        
+        breakout = pd.DataFrame({
+            'baseline_wrc': current['wrc_plus_baseline'],
+            'current_wrc': current['wrc_plus'],
+            'wrc_improvement': current['wrc_plus'] - current['wrc_plus_baseline'],
+            'babip_change': current['babip'] - current['babip_baseline'],
+            'pa': current['pa'],
+        })
+        breakout['is_breakout'] = (
+            (breakout['wrc_improvement'] >= 20) &
+            (breakout['pa'] >= 400) &
+            (breakout['babip_change'] < 0.040)  # Not purely BABIP-driven
+        )
+        breakout['breakout_confidence'] = np.where(
+            breakout['is_breakout'] & (breakout['babip_change'] < 0.020), 'HIGH', 'MEDIUM'
+        )
+        result = result.join(breakout)
+        result['is_breakout'] = result['is_breakout'].fillna(False).astype(bool)
+        
+        # Decline: slopes over each player's last lookback_years rows. Windows
+        # of equal length stack into one (players, series, years) array
+        recent = df.groupby('player_id', sort=False).tail(lookback_years)
+        window = recent.groupby('player_id', sort=False)['season'].transform('size')
+        for column in ('wrc_slope', 'iso_slope', 'k_slope', 'recent_avg_wrc', 'years_analyzed'):
+            result[column] = np.nan
+        for years in range(3, lookback_years + 1):
+            rows = recent[window == years]
+            if rows.empty:
+                continue
+            trends = rows[['wrc_plus', 'iso', 'k_pct']].to_numpy(dtype=float)
+            trends = trends.reshape(-1, years, 3).transpose(0, 2, 1)
+            slopes = least_squares_slopes(trends)
+            index = rows['player_id'].to_numpy()[::years]
+            
+            result.loc[index, 'wrc_slope'] = slopes[:, 0]
+            result.loc[index, 'iso_slope'] = slopes[:, 1]
+            result.loc[index, 'k_slope'] = slopes[:, 2]
+            result.loc[index, 'recent_avg_wrc'] = trends[:, 0].mean(axis=1)
+            result.loc[index, 'years_analyzed'] = years
+        result['is_declining'] = result['wrc_slope'] < -5  # Losing >5 wRC+ points per year
+        
+        # Peak: best wRC+ among 200+ PA seasons vs the latest of them
+        meaningful = df[df['pa'] >= 200]
+        # idxmax raises on an all-NULL group, so rank only known wRC+
+        rated = meaningful[meaningful['wrc_plus'].notna()]
+        peak_rows = rated.loc[rated.groupby('player_id', sort=False)['wrc_plus'].idxmax()]
+        peaks = peak_rows.set_index('player_id')[['season', 'wrc_plus', 'pa']]
+        latest = meaningful.groupby('player_id', sort=False).tail(1).set_index('player_id')
+        
+        result['peak_season'] = peaks['season']
+        result['peak_wrc_plus'] = peaks['wrc_plus']
+        result['peak_pa'] = peaks['pa']
+        result['current_season'] = latest['season']
+        result['current_wrc_plus'] = latest['wrc_plus']
+        result['at_peak'] = result['current_wrc_plus'] >= result['peak_wrc_plus'] * 0.95
+        result['years_since_peak'] = result['current_season'] - result['peak_season']
+        result['career_seasons'] = meaningful.groupby('player_id', sort=False).size()
+        
+        return result
+    
+    def calculate_aging_curve(self, player_ids=None):
+        """
+        Calculate aging curves (performance by age)
+        
+        Args:
+            player_ids: A player_id, a list of them, or None for every
+                player with a birth date
+        
+        Returns:
+            DataFrame with age-based performance (plus a player_id column
+            unless a single player_id was given), or None
+        """
+        single = player_ids is not None and np.ndim(player_ids) == 0
         session = get_session()
         
         try:
-            # Get player birth date to calculate age
-            query = text("""
-                SELECT 
-                    ss.season, ss.pa, ss.wrc_plus, ss.babip, ss.iso,
-                    p.birth_date,
-                    EXTRACT(YEAR FROM ss.season::text::date) - EXTRACT(YEAR FROM p.birth_date) as age
-                FROM season_stats ss
-                JOIN players p ON ss.player_id = p.player_id
-                WHERE ss.player_id = :player_id
-                  AND ss.pa >= 100
-                  AND p.birth_date IS NOT NULL
-                ORDER BY ss.season
-            """)
-            
-            df = pd.read_sql(query, session.bind, params={'player_id': player_id})
-            
-            if df.empty:
-                return None
-            
-            return df[['season', 'age', 'pa', 'wrc_plus', 'babip', 'iso']]
+            if player_ids is None:
+                df = pd.read_sql(self._Q_AGING_ALL, session.bind)
+            else:
+                ids = [int(player_ids)] if single else list(player_ids)
+                df = pd.read_sql(self._Q_AGING, session.bind, params={'player_ids': ids})
         
         finally:
             session.close()
+        
+        if df.empty:
+            return None
+        
+        # Age in the season's calendar year
+        df['age'] = df['season'] - pd.to_datetime(df['birth_date']).dt.year
+        df = self._compact(df.astype({'age': np.int16}))
+        
+        columns = ['season', 'age', 'pa', 'wrc_plus', 'babip', 'iso']
+        return df[columns] if single else df[['player_id'] + columns]
 
 
 if __name__ == "__main__":
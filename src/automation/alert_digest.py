@@ -4,9 +4,38 @@ Alert Digest Generator
 Creates clean, actionable reports from daily scraper results
 """
 import json
+import heapq
+from operator import itemgetter
 from datetime import datetime
 from pathlib import Path
 from collections import defaultdict
+from functools import lru_cache
+
+# Report rules, built once
+SEPARATOR = "=" * 70
+RULE = "-" * 70
+
+# Alert markers (tier 3 shares tier 2's marker)
+TIER_EMOJI = {1: "🔴", 2: "🟡", 3: "🟡"}
+SIGNAL_EMOJI = {"BUY": "📈", "SELL": "📉"}
+
+# Sort key for categorized players
+by_net_signal = itemgetter('net_signal')
+
+# Read buffer for daily update files (fewer read calls on large days)
+READ_BUFFER = 64 * 1024
+
+
+@lru_cache(maxsize=1)
+def get_ijson():
+    """Get the ijson module (streaming JSON parser), or None if it is not installed"""
+    try:
+        import ijson
+    except ImportError:
+        return None
+    
+    return ijson
+
 
 class AlertDigest:
     """
@@ -15,11 +44,30 @@ class AlertDigest:
     
     def __init__(self, results_file=None):
         if results_file:
-            with open(results_file, 'r') as f:
-                self.results = json.load(f)
+            self.results = self.load_results(results_file)
         else:
             self.results = None
     
+    def load_results(self, results_file):
+        """
+        Load the parts of a daily update file the digest uses
+        
+        With the optional ijson package installed, only the new_alerts
+        array is parsed (streamed item by item); otherwise the whole file
+        is loaded.
+        
+        Returns:
+            Dict with a 'new_alerts' list
+        """
+        ijson = get_ijson()
+        
+        if ijson is None:
+            with open(results_file, 'rb', buffering=READ_BUFFER) as f:
+                return json.load(f)
+        
+        with open(results_file, 'rb', buffering=READ_BUFFER) as f:
+            return {'new_alerts': list(ijson.items(f, 'new_alerts.item'))}
+    
     def deduplicate_alerts(self, alerts):
         """
         Remove duplicate player alerts
@@ -53,10 +101,17 @@ class AlertDigest:
         }
         
         for player, alerts in deduplicated_alerts.items():
-            tier1_buys = len([a for a in alerts if a['tier'] == 1 and a['signal'] == 'BUY'])
-            tier1_sells = len([a for a in alerts if a['tier'] == 1 and a['signal'] == 'SELL'])
-            tier2_buys = len([a for a in alerts if a['tier'] == 2 and a['signal'] == 'BUY'])
-            tier2_sells = len([a for a in alerts if a['tier'] == 2 and a['signal'] == 'SELL'])
+            # Tier/signal counts in a single pass
+            tier1_buys = tier1_sells = tier2_buys = tier2_sells = 0
+            for alert in alerts:
+                tier = alert['tier']
+                signal = alert['signal']
+                if tier == 1:
+                    tier1_buys += signal == 'BUY'
+                    tier1_sells += signal == 'SELL'
+                elif tier == 2:
+                    tier2_buys += signal == 'BUY'
+                    tier2_sells += signal == 'SELL'
             
             total_buys = tier1_buys + tier2_buys
             total_sells = tier1_sells + tier2_sells
@@ -101,79 +156,72 @@ class AlertDigest:
         
         # Build report
         report = []
-        report.append("=" * 70)
-        report.append(f"REGRESSION ALERT DIGEST - {datetime.now().strftime('%Y-%m-%d')}")
-        report.append("=" * 70)
-        
-        report.append(f"\n📊 Summary:")
-        report.append(f"   Total Players with Alerts: {len(deduplicated)}")
-        report.append(f"   Strong Buy Signals: {len(categories['strong_buy'])}")
-        report.append(f"   Buy Signals: {len(categories['buy'])}")
-        report.append(f"   Strong Sell Signals: {len(categories['strong_sell'])}")
-        report.append(f"   Sell Signals: {len(categories['sell'])}")
-        report.append(f"   Mixed Signals: {len(categories['mixed'])}")
+        add = report.append
+        add(SEPARATOR)
+        add(f"REGRESSION ALERT DIGEST - {datetime.now().strftime('%Y-%m-%d')}")
+        add(SEPARATOR)
+        
+        report += ["", "📊 Summary:"]
+        add(f"   Total Players with Alerts: {len(deduplicated)}")
+        add(f"   Strong Buy Signals: {len(categories['strong_buy'])}")
+        add(f"   Buy Signals: {len(categories['buy'])}")
+        add(f"   Strong Sell Signals: {len(categories['strong_sell'])}")
+        add(f"   Sell Signals: {len(categories['sell'])}")
+        add(f"   Mixed Signals: {len(categories['mixed'])}")
         
         # Strong Buy Candidates
         if categories['strong_buy']:
-            report.append("\n\n🟢 STRONG BUY CANDIDATES (Multiple positive signals)")
-            report.append("-" * 70)
+            report += ["", "", "🟢 STRONG BUY CANDIDATES (Multiple positive signals)"]
+            add(RULE)
             
-            for item in sorted(categories['strong_buy'], 
-                             key=lambda x: x['net_signal'], reverse=True):
-                report.append(f"\n📈 {item['player']} (Net: +{item['net_signal']})")
+            for item in sorted(categories['strong_buy'], key=by_net_signal, reverse=True):
+                report += ["", f"📈 {item['player']} (Net: +{item['net_signal']})"]
                 for alert in item['alerts']:
                     if alert['signal'] == 'BUY':
-                        tier_emoji = "🔴" if alert['tier'] == 1 else "🟡"
-                        report.append(f"   {tier_emoji} TIER {alert['tier']} {alert['metric']}: {alert['message']}")
+                        add(f"   {TIER_EMOJI[alert['tier']]} TIER {alert['tier']} {alert['metric']}: {alert['message']}")
         
         # Buy Candidates
         if categories['buy']:
-            report.append("\n\n🟢 BUY CANDIDATES")
-            report.append("-" * 70)
+            report += ["", "", "🟢 BUY CANDIDATES"]
+            add(RULE)
             
-            for item in categories['buy'][:10]:  # Top 10
-                report.append(f"\n{item['player']}:")
+            for item in heapq.nlargest(10, categories['buy'], key=by_net_signal):  # Top 10
+                report += ["", f"{item['player']}:"]
                 for alert in item['alerts']:
-                    tier_emoji = "🔴" if alert['tier'] == 1 else "🟡"
-                    report.append(f"   {tier_emoji} {alert['metric']}: {alert['message']}")
+                    add(f"   {TIER_EMOJI[alert['tier']]} {alert['metric']}: {alert['message']}")
         
         # Strong Sell Candidates
         if categories['strong_sell']:
-            report.append("\n\n🔴 STRONG SELL CANDIDATES (Multiple negative signals)")
-            report.append("-" * 70)
+            report += ["", "", "🔴 STRONG SELL CANDIDATES (Multiple negative signals)"]
+            add(RULE)
             
-            for item in sorted(categories['strong_sell'], 
-                             key=lambda x: x['net_signal']):
-                report.append(f"\n📉 {item['player']} (Net: {item['net_signal']})")
+            for item in sorted(categories['strong_sell'], key=by_net_signal):
+                report += ["", f"📉 {item['player']} (Net: {item['net_signal']})"]
                 for alert in item['alerts']:
                     if alert['signal'] == 'SELL':
-                        tier_emoji = "🔴" if alert['tier'] == 1 else "🟡"
-                        report.append(f"   {tier_emoji} TIER {alert['tier']} {alert['metric']}: {alert['message']}")
+                        add(f"   {TIER_EMOJI[alert['tier']]} TIER {alert['tier']} {alert['metric']}: {alert['message']}")
         
         # Sell Candidates
         if categories['sell']:
-            report.append("\n\n🔴 SELL CANDIDATES")
-            report.append("-" * 70)
+            report += ["", "", "🔴 SELL CANDIDATES"]
+            add(RULE)
             
-            for item in categories['sell'][:10]:  # Top 10
-                report.append(f"\n{item['player']}:")
+            for item in heapq.nsmallest(10, categories['sell'], key=by_net_signal):  # Top 10
+                report += ["", f"{item['player']}:"]
                 for alert in item['alerts']:
-                    tier_emoji = "🔴" if alert['tier'] == 1 else "🟡"
-                    report.append(f"   {tier_emoji} {alert['metric']}: {alert['message']}")
+                    add(f"   {TIER_EMOJI[alert['tier']]} {alert['metric']}: {alert['message']}")
         
         # Mixed signals
         if categories['mixed']:
-            report.append("\n\n⚪ MIXED SIGNALS (Conflicting indicators)")
-            report.append("-" * 70)
+            report += ["", "", "⚪ MIXED SIGNALS (Conflicting indicators)"]
+            add(RULE)
             
             for item in categories['mixed'][:5]:
-                report.append(f"\n{item['player']}:")
+                report += ["", f"{item['player']}:"]
                 for alert in item['alerts']:
-                    tier_emoji = "🔴" if alert['tier'] == 1 else "🟡"
-                    signal_emoji = "📈" if alert['signal'] == 'BUY' else "📉"
-                    report.append(f"   {tier_emoji} {signal_emoji} {alert['metric']}: {alert['message']}")
+                    add(f"   {TIER_EMOJI[alert['tier']]} {SIGNAL_EMOJI[alert['signal']]} {alert['metric']}: {alert['message']}")
         
-        report.append("\n" + "=" * 70)
+        report += ["", SEPARATOR]
         
         return "\n".join(report)
     
@@ -184,7 +232,7 @@ class AlertDigest:
         
         digest = self.generate_digest()
         
-        with open(output_file, 'w') as f:
+        with open(output_file, 'w', encoding='utf-8') as f:
             f.write(digest)
         
         print(f"📝 Alert digest saved to {output_file}")
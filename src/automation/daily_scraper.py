@@ -10,17 +10,42 @@ Runs daily to:
 import sys
 from pathlib import Path
 from datetime import datetime
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
+import time
 import json
 
 project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
-from src.scrapers.fangraphs import scrape_player_season_stats, parse_fangraphs_columns
-from src.database.insert_data import load_player_to_database
+from src.scrapers.fangraphs import (scrape_player_season_stats, scrape_fangraphs_leaderboard,
+                                    parse_fangraphs_columns)
+from src.database.insert_data import load_player_to_database, insert_season_stats
 from src.analytics.regression_detector import RegressionDetector
+from src.analytics.league_baselines import invalidate_metric_arrays
 from src.utils.db_connection import get_session
 from sqlalchemy import text
 
+# Materialized views in schema_rollups.sql, refreshed after new stats land
+ROLLUP_VIEWS = ('league_percentiles', 'player_summary', 'league_player_stats',
+                'player_career_baselines', 'statcast_career_baselines')
+
+# Write buffer for result files: one flush for a typical day's JSON
+WRITE_BUFFER = 64 * 1024
+
+
+@lru_cache(maxsize=1)
+def get_orjson():
+    """Get the orjson module (fast JSON encoder), or None if it is not installed"""
+    try:
+        import orjson
+    except ImportError:
+        return None
+    
+    return orjson
+
+
 class DailyScraper:
     """
     Automated daily scraping and analysis
@@ -28,6 +53,9 @@ class DailyScraper:
     
     def __init__(self, log_file='daily_scraper.log'):
         self.log_file = log_file
+        # Line-buffered so each message still lands on disk as it is logged
+        self._log_fh = open(log_file, 'a', buffering=1)
+        self._log_lock = threading.Lock()
         self.detector = RegressionDetector()
         self.updates = {
             'timestamp': datetime.now().isoformat(),
@@ -35,15 +63,28 @@ class DailyScraper:
             'new_alerts': [],
             'errors': []
         }
+        self._updates_lock = threading.Lock()
+        
+        # Shared rate limit: FanGraphs requests start at least this many seconds apart
+        self.request_delay = 0
+        self._rate_lock = threading.Lock()
+        self._next_request = 0.0
     
     def log(self, message):
         """Log message to both console and file"""
         timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         log_msg = f"[{timestamp}] {message}"
-        print(log_msg)
-        
-        with open(self.log_file, 'a') as f:
-            f.write(log_msg + '\n')
+        with self._log_lock:
+            print(log_msg)
+            
+            if self._log_fh.closed:
+                self._log_fh = open(self.log_file, 'a', buffering=1)
+            
+            self._log_fh.write(log_msg + '\n')
+    
+    def close(self):
+        """Close the log file"""
+        self._log_fh.close()
     
     def get_all_tracked_players(self):
         """Get all players currently in database"""
@@ -63,16 +104,48 @@ class DailyScraper:
         finally:
             session.close()
     
-    def update_player_stats(self, player_name, fg_id, current_year=2025):
+    def _wait_for_request_slot(self):
+        """Block until the shared rate limit allows the next FanGraphs request"""
+        with self._rate_lock:
+            wait = self._next_request - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            self._next_request = time.monotonic() + self.request_delay
+    
+    def get_leaderboard_stats(self, current_year=2025):
+        """
+        Fetch the season's batting leaderboard once, split by FanGraphs ID
+        
+        Returns:
+            Dict of fg_id -> DataFrame of that player's rows (empty on failure)
+        """
+        self._wait_for_request_slot()
+        leaderboard = scrape_fangraphs_leaderboard(current_year)
+        
+        if leaderboard is None or leaderboard.empty:
+            self.log("\n⚠️  Leaderboard unavailable - scraping every player individually")
+            return {}
+        
+        return {fg_id: rows for fg_id, rows in leaderboard.groupby('playerid')}
+    
+    def update_player_stats(self, player_name, fg_id, current_year=2025, data=None, player_id=None):
         """
         Update a single player's stats for current season
         
+        Args:
+            data: The player's rows from the season leaderboard, if present;
+                  otherwise their stats are scraped individually
+            player_id: Database player_id when already known (tracked
+                       players), which skips the player lookup/upsert
+        
         Returns:
             True if successful, False otherwise
         """
         try:
-            # Scrape current season
-            data = scrape_player_season_stats(player_name, current_year, current_year)
+            # Scrape current season unless the leaderboard already had it
+            if data is None:
+                self._wait_for_request_slot()
+                data = scrape_player_season_stats(player_name, current_year, current_year)
             
             if data is None or data.empty:
                 self.log(f"   ⚠️  No data for {player_name}")
@@ -80,17 +153,22 @@ class DailyScraper:
             
             # Parse and load
             cleaned = parse_fangraphs_columns(data)
-            load_player_to_database(player_name, fg_id, cleaned)
+            
+            if player_id is None:
+                load_player_to_database(player_name, fg_id, cleaned)
+            else:
+                insert_season_stats(player_id, cleaned)
             
             self.log(f"   ✅ Updated {player_name}")
             return True
             
         except Exception as e:
             self.log(f"   ❌ Error updating {player_name}: {e}")
-            self.updates['errors'].append({
-                'player': player_name,
-                'error': str(e)
-            })
+            with self._updates_lock:
+                self.updates['errors'].append({
+                    'player': player_name,
+                    'error': str(e)
+                })
             return False
     
     def check_for_new_alerts(self, player_id, player_name, season=2025):
@@ -113,9 +191,51 @@ class DailyScraper:
         
         return significant_alerts
     
-    def run_daily_update(self, delay=2):
+    def refresh_rollups(self):
+        """Refresh pre-aggregated rollups (schema_rollups.sql) after new stats land"""
+        # League distributions are cached per process; drop them either way
+        invalidate_metric_arrays()
+        session = get_session()
+        
+        try:
+            for view in ROLLUP_VIEWS:
+                session.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view}"))
+            session.commit()
+            self.log(f"\n🔄 Refreshed rollups: {', '.join(ROLLUP_VIEWS)}")
+        except Exception as e:
+            session.rollback()
+            self.log(f"\n⚠️  Could not refresh rollups: {e}")
+        finally:
+            session.close()
+    
+    def _update_and_check(self, i, total, player_id, player_name, fg_id, data=None):
+        """
+        Worker: update one player's stats, then check them for new alerts
+        
+        Returns:
+            (success, alerts)
+        """
+        self.log(f"\n[{i}/{total}] Updating {player_name}...")
+        
+        if not self.update_player_stats(player_name, fg_id, data=data, player_id=player_id):
+            return False, []
+        
+        alerts = self.check_for_new_alerts(player_id, player_name)
+        
+        if alerts:
+            self.log(f"   🚨 {len(alerts)} new alert(s) for {player_name}")
+        
+        return True, alerts
+    
+    def run_daily_update(self, delay=2, max_workers=4):
         """
         Run full daily update process
+        
+        Current-season stats come from one leaderboard request; only players
+        missing from it (or with multi-team splits) are scraped individually.
+        Players are updated on a small thread pool. FanGraphs requests still
+        start at least `delay` seconds apart; parsing, database writes and
+        alert checks overlap with the wait.
         """
         self.log("=" * 70)
         self.log("DAILY SCRAPER - Starting Update")
@@ -128,41 +248,53 @@ class DailyScraper:
         successful_updates = 0
         new_alerts_count = 0
         
-        # Update each player
+        # Update players concurrently, rate limited by _wait_for_request_slot
+        self.request_delay = delay
+        leaderboard = self.get_leaderboard_stats()
+        
+        missing = sum(str(fg_id) not in leaderboard for _, _, fg_id in players)
+        self.log(f"📋 {len(players) - missing} from the leaderboard, {missing} to scrape individually")
+        
+        results = {}
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = {
+                pool.submit(self._update_and_check, i, len(players), player_id, player_name, fg_id,
+                            leaderboard.get(str(fg_id))): i
+                for i, (player_id, player_name, fg_id) in enumerate(players, 1)
+            }
+            
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+        
+        # Record results in roster order so the output is stable run to run
         for i, (player_id, player_name, fg_id) in enumerate(players, 1):
-            self.log(f"\n[{i}/{len(players)}] Updating {player_name}...")
+            success, alerts = results[i]
             
-            # Update stats
-            success = self.update_player_stats(player_name, fg_id)
+            if not success:
+                continue
             
-            if success:
-                successful_updates += 1
-                self.updates['players_updated'].append(player_name)
-                
-                # Check for new alerts
-                alerts = self.check_for_new_alerts(player_id, player_name)
-                
-                if alerts:
-                    self.log(f"   🚨 {len(alerts)} new alert(s)")
-                    new_alerts_count += len(alerts)
-                    
-                    self.updates['new_alerts'].append({
-                        'player': player_name,
-                        'alerts': [
-                            {
-                                'tier': a['tier'],
-                                'metric': a['metric'],
-                                'signal': a['signal'],
-                                'message': a['message']
-                            }
-                            for a in alerts
-                        ]
-                    })
+            successful_updates += 1
+            self.updates['players_updated'].append(player_name)
             
-            # Rate limiting
-            if i < len(players):
-                import time
-                time.sleep(delay)
+            if alerts:
+                new_alerts_count += len(alerts)
+                
+                self.updates['new_alerts'].append({
+                    'player': player_name,
+                    'alerts': [
+                        {
+                            'tier': a['tier'],
+                            'metric': a['metric'],
+                            'signal': a['signal'],
+                            'message': a['message']
+                        }
+                        for a in alerts
+                    ]
+                })
+        
+        if successful_updates:
+            self.refresh_rollups()
         
         # Summary
         self.log("\n" + "=" * 70)
@@ -174,15 +306,30 @@ class DailyScraper:
         
         # Save results
         self.save_results()
+        self.close()
         
         return self.updates
     
-    def save_results(self):
-        """Save update results to JSON"""
+    def save_results(self, pretty=False):
+        """
+        Save update results to JSON
+        
+        Encoded in one go (with orjson when installed) and written through
+        a 64 KiB buffer.
+        
+        Args:
+            pretty: Indent the output for reading by hand
+        """
         output_file = f"daily_update_{datetime.now().strftime('%Y%m%d')}.json"
         
-        with open(output_file, 'w') as f:
-            json.dump(self.updates, f, indent=2)
+        orjson = get_orjson()
+        if orjson is not None:
+            payload = orjson.dumps(self.updates, option=orjson.OPT_INDENT_2 if pretty else 0)
+        else:
+            payload = json.dumps(self.updates, indent=2 if pretty else None).encode('utf-8')
+        
+        with open(output_file, 'wb', buffering=WRITE_BUFFER) as f:
+            f.write(payload)
         
         self.log(f"\n📝 Results saved to {output_file}")
 
@@ -1,15 +1,20 @@
 """
 Player ID resolver using Razzball's comprehensive ID mapping
 """
+import os
 import pandas as pd
+from functools import lru_cache
 from pathlib import Path
 
-def load_razzball_mapping(csv_path='src/data/razzball.csv'):
+@lru_cache(maxsize=8)
+def _load_cached(csv_path, mtime_ns):
     """
-    Load Razzball player ID mapping
+    Parse the Razzball CSV once per (path, modification time)
     
     Returns:
-        DataFrame with player names and IDs
+        (DataFrame, exact, entries), shared, do not mutate: exact maps a
+        lowercased name to its (name, fg_id) when that name is unique,
+        entries is (lowercased name, name, fg_id) per player in file order
     """
     df = pd.read_csv(csv_path, encoding='utf-8-sig')  # Handle BOM
     
@@ -25,24 +30,57 @@ def load_razzball_mapping(csv_path='src/data/razzball.csv'):
     
     print(f"✅ Loaded {len(df)} players with valid FanGraphs IDs")
     
-    return df
+    # Lookup structures for search_player
+    entries = [
+        (name.lower(), name, fg_id)
+        for name, fg_id in zip(df['Name'], df['FanGraphsID'])
+        if isinstance(name, str)
+    ]
+    exact = {}
+    for name_lower, name, fg_id in entries:
+        # Ambiguous names (e.g. two Will Smiths) get no exact entry
+        exact[name_lower] = (name, fg_id) if name_lower not in exact else None
+    
+    return df, exact, entries
 
-def get_active_batters(csv_path='src/data/razzball.csv', exclude_pitchers=True):
+def _mapping(csv_path):
+    """Cached _load_cached result for csv_path, reparsed when the file changes"""
+    return _load_cached(csv_path, os.stat(csv_path).st_mtime_ns)
+
+def load_razzball_mapping(csv_path='src/data/razzball.csv'):
     """
-    Get all active position players (exclude pitchers)
+    Load Razzball player ID mapping
+    
+    Parsed once and cached until the file changes.
     
     Returns:
-        List of tuples: (player_name, fg_id)
+        DataFrame with player names and IDs (a copy; safe to modify)
     """
-    df = load_razzball_mapping(csv_path)
+    df, _, _ = _mapping(csv_path)
+    return df.copy()
+
+@lru_cache(maxsize=8)
+def _active_batters_cached(csv_path, mtime_ns, exclude_pitchers):
+    """(player_name, fg_id) tuples for one CSV version, shared, do not mutate"""
+    df, _, _ = _load_cached(csv_path, mtime_ns)
     
     if exclude_pitchers:
         # Exclude players whose primary position is pitcher
         pitcher_positions = ['P', 'SP', 'RP']
         df = df[~df['STD_POS'].isin(pitcher_positions)]
     
-    # Convert to list of tuples
-    players = list(zip(df['Name'], df['FanGraphsID']))
+    return tuple(zip(df['Name'], df['FanGraphsID']))
+
+def get_active_batters(csv_path='src/data/razzball.csv', exclude_pitchers=True):
+    """
+    Get all active position players (exclude pitchers)
+    
+    Filtered once and cached until the file changes.
+    
+    Returns:
+        List of tuples: (player_name, fg_id)
+    """
+    players = list(_active_batters_cached(csv_path, os.stat(csv_path).st_mtime_ns, exclude_pitchers))
     
     print(f"✅ Found {len(players)} active batters")
     
@@ -55,26 +93,20 @@ def search_player(name, csv_path='src/data/razzball.csv'):
     Returns:
         (player_name, fg_id) or None
     """
-    df = load_razzball_mapping(csv_path)
-    
-    # Case-insensitive search
-    matches = df[df['Name'].str.contains(name, case=False, na=False)]
-    
-    if len(matches) == 0:
-        return None
-    elif len(matches) == 1:
-        row = matches.iloc[0]
-        return (row['Name'], str(row['FanGraphsID']))
-    else:
-        # Multiple matches - return exact match if exists
-        exact = matches[matches['Name'].str.lower() == name.lower()]
-        if len(exact) == 1:
-            row = exact.iloc[0]
-            return (row['Name'], str(row['FanGraphsID']))
-        else:
-            # Return first match
-            row = matches.iloc[0]
-            return (row['Name'], str(row['FanGraphsID']))
+    _, exact, entries = _mapping(csv_path)
+    name_lower = name.lower()
+    
+    # A unique exact (case-insensitive) name wins
+    match = exact.get(name_lower)
+    if match:
+        return match
+    
+    # Otherwise the first player whose name contains the search
+    for player_name_lower, player_name, fg_id in entries:
+        if name_lower in player_name_lower:
+            return (player_name, fg_id)
+    
+    return None
 
 if __name__ == "__main__":
     print("=" * 60)
@@ -65,26 +65,34 @@ VERIFIED_PLAYERS = [
     ("Ketel Marte", "11908"),
 ]
 
-def get_verified_players():
-    """Return list of verified players"""
-    # Remove duplicates
+def _dedupe_by_fg_id(players):
+    """First (name, fg_id) entry per FanGraphs ID, in list order"""
     seen = set()
     unique = []
-    for name, fg_id in VERIFIED_PLAYERS:
+    for name, fg_id in players:
         if fg_id not in seen:
             seen.add(fg_id)
             unique.append((name, fg_id))
-    return unique
+    return tuple(unique)
+
+# Deduplicated once at import rather than on every call
+_UNIQUE_VERIFIED = _dedupe_by_fg_id(VERIFIED_PLAYERS)
+
+def get_verified_players():
+    """Return list of verified players"""
+    return list(_UNIQUE_VERIFIED)
 
 def get_new_verified_players(existing_fg_ids):
     """
     Get verified players not yet in database
     
     Args:
-        existing_fg_ids: Set of FanGraphs IDs already in database
+        existing_fg_ids: Set of FanGraphs IDs already in database (other
+            iterables are converted)
     
     Returns:
         List of (name, fg_id) tuples for new players
     """
-    all_verified = get_verified_players()
-    return [(name, fg_id) for name, fg_id in all_verified if fg_id not in existing_fg_ids]
\ No newline at end of file
+    if not isinstance(existing_fg_ids, (set, frozenset)):
+        existing_fg_ids = set(existing_fg_ids)
+    return [(name, fg_id) for name, fg_id in _UNIQUE_VERIFIED if fg_id not in existing_fg_ids]
\ No newline at end of file
@@ -71,4 +71,27 @@ CREATE TABLE IF NOT EXISTS statcast_data (
 
 -- Indexes
 CREATE INDEX IF NOT EXISTS idx_season_stats_player ON season_stats(player_id);
-CREATE INDEX IF NOT EXISTS idx_season_stats_season ON season_stats(season);
\ No newline at end of file
+CREATE INDEX IF NOT EXISTS idx_season_stats_season ON season_stats(season);
+
+-- Composite indexes for the hot dashboard/analytics predicates
+-- (season = ? AND pa >= ?) and (player_id = ? [AND season ...])
+CREATE INDEX IF NOT EXISTS idx_season_stats_season_pa ON season_stats(season, pa);
+
+-- Covering index for per-player lookups (reports, predictions, regression):
+-- the stat columns ride along in the index so these become index-only scans.
+-- Supersedes the plain (player_id, season) index.
+DROP INDEX IF EXISTS idx_season_stats_player_season;
+CREATE INDEX IF NOT EXISTS idx_season_stats_player_season_covering
+    ON season_stats(player_id, season)
+    INCLUDE (team, games, pa, ab, hits, hr, avg, obp, slg, woba, wrc_plus,
+             babip, bb_pct, k_pct, iso, hr_fb_pct);
+
+-- Top-N by wRC+ within a season: walk the index in order, filter on pa
+CREATE INDEX IF NOT EXISTS idx_season_stats_season_wrc
+    ON season_stats(season, wrc_plus DESC)
+    INCLUDE (pa, player_id);
+
+-- Name -> player_id lookups (not unique: e.g. two active Will Smiths)
+CREATE INDEX IF NOT EXISTS idx_players_name ON players(name);
+
+ANALYZE season_stats;
\ No newline at end of file
@@ -0,0 +1,218 @@
+-- Pre-aggregated rollups for read-heavy analytics paths
+-- Refreshed after each daily scrape (see src/automation/daily_scraper.py)
+
+-- League percentile distributions per (season, metric), qualified hitters (100+ PA)
+CREATE MATERIALIZED VIEW IF NOT EXISTS league_percentiles AS
+SELECT
+    ss.season,
+    m.metric,
+    percentile_cont(0.10) WITHIN GROUP (ORDER BY m.value) AS p10,
+    percentile_cont(0.25) WITHIN GROUP (ORDER BY m.value) AS p25,
+    percentile_cont(0.50) WITHIN GROUP (ORDER BY m.value) AS p50,
+    percentile_cont(0.75) WITHIN GROUP (ORDER BY m.value) AS p75,
+    percentile_cont(0.90) WITHIN GROUP (ORDER BY m.value) AS p90,
+    AVG(m.value) AS mean,
+    STDDEV_SAMP(m.value) AS std,
+    COUNT(*) AS player_count
+FROM season_stats ss
+CROSS JOIN LATERAL (VALUES
+    ('avg',       CAST(ss.avg AS DOUBLE PRECISION)),
+    ('obp',       CAST(ss.obp AS DOUBLE PRECISION)),
+    ('slg',       CAST(ss.slg AS DOUBLE PRECISION)),
+    ('woba',      CAST(ss.woba AS DOUBLE PRECISION)),
+    ('wrc_plus',  CAST(ss.wrc_plus AS DOUBLE PRECISION)),
+    ('babip',     CAST(ss.babip AS DOUBLE PRECISION)),
+    ('bb_pct',    CAST(ss.bb_pct AS DOUBLE PRECISION)),
+    ('k_pct',     CAST(ss.k_pct AS DOUBLE PRECISION)),
+    ('iso',       CAST(ss.iso AS DOUBLE PRECISION)),
+    ('hr_fb_pct', CAST(ss.hr_fb_pct AS DOUBLE PRECISION))
+) AS m(metric, value)
+WHERE ss.pa >= 100
+  AND ss.avg IS NOT NULL
+  AND m.value IS NOT NULL
+GROUP BY ss.season, m.metric;
+
+-- Unique index required for REFRESH MATERIALIZED VIEW CONCURRENTLY
+CREATE UNIQUE INDEX IF NOT EXISTS idx_league_percentiles_season_metric
+    ON league_percentiles(season, metric);
+
+COMMENT ON MATERIALIZED VIEW league_percentiles IS 'League percentile rollup per season/metric (100+ PA)';
+
+-- Per-player career span, used by the dashboard home page and player lists
+CREATE MATERIALIZED VIEW IF NOT EXISTS player_summary AS
+SELECT
+    p.player_id,
+    p.name,
+    p.fg_id,
+    COUNT(DISTINCT ss.season) AS seasons,
+    MAX(ss.season) AS last_season
+FROM players p
+LEFT JOIN season_stats ss ON p.player_id = ss.player_id
+GROUP BY p.player_id, p.name, p.fg_id;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_player_summary_player_id
+    ON player_summary(player_id);
+
+COMMENT ON MATERIALIZED VIEW player_summary IS 'Seasons played and last season per player';
+
+-- Per-season hitter lines for the dashboard league page. Multi-team stints are
+-- combined (team 'TOT'), non-MLB leagues (e.g. KBO, NPB) are excluded, and
+-- rate stats are PA-weighted. Qualified hitters only (100+ PA).
+CREATE MATERIALIZED VIEW IF NOT EXISTS league_player_stats AS
+WITH mlb_stats AS (
+    SELECT ss.player_id, ss.season, ss.team, ss.pa, ss.wrc_plus,
+           ss.avg, ss.obp, ss.slg, ss.hr, ss.rbi,
+           ss.babip, ss.iso, ss.k_pct, ss.bb_pct
+    FROM season_stats ss
+    WHERE ss.team IN (
+        'ARI', 'ATL', 'BAL', 'BOS', 'CHC', 'CWS', 'CIN', 'CLE', 'COL', 'DET',
+        'HOU', 'KC', 'LAA', 'LAD', 'MIA', 'MIL', 'MIN', 'NYM', 'NYY', 'OAK',
+        'PHI', 'PIT', 'SD', 'SEA', 'SF', 'STL', 'TB', 'TEX', 'TOR', 'WSH',
+        'ATH'  -- Oakland/Sacramento Athletics (post-2024 rebrand)
+    )
+)
+SELECT m.season,
+       p.player_id,
+       p.name,
+       CASE WHEN COUNT(DISTINCT m.team) > 1 THEN 'TOT'
+            ELSE MAX(m.team) END AS team,
+       SUM(m.pa) AS pa,
+       CAST(SUM(m.pa * m.wrc_plus) / SUM(m.pa) AS INTEGER) AS wrc_plus,
+       ROUND(CAST(SUM(m.pa * m.avg)    / SUM(m.pa) AS NUMERIC), 3) AS avg,
+       ROUND(CAST(SUM(m.pa * m.obp)    / SUM(m.pa) AS NUMERIC), 3) AS obp,
+       ROUND(CAST(SUM(m.pa * m.slg)    / SUM(m.pa) AS NUMERIC), 3) AS slg,
+       SUM(m.hr)  AS hr,
+       SUM(m.rbi) AS rbi,
+       ROUND(CAST(SUM(m.pa * m.babip)  / SUM(m.pa) AS NUMERIC), 3) AS babip,
+       ROUND(CAST(SUM(m.pa * m.iso)    / SUM(m.pa) AS NUMERIC), 3) AS iso,
+       ROUND(CAST(SUM(m.pa * m.k_pct)  / SUM(m.pa) AS NUMERIC), 1) AS k_pct,
+       ROUND(CAST(SUM(m.pa * m.bb_pct) / SUM(m.pa) AS NUMERIC), 1) AS bb_pct
+FROM mlb_stats m
+JOIN players p ON m.player_id = p.player_id
+GROUP BY m.season, p.player_id, p.name
+HAVING SUM(m.pa) >= 100;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_league_player_stats_season_player
+    ON league_player_stats(season, player_id);
+CREATE INDEX IF NOT EXISTS idx_league_player_stats_season_wrc
+    ON league_player_stats(season, wrc_plus DESC);
+
+COMMENT ON MATERIALIZED VIEW league_player_stats IS 'Qualified MLB hitter lines per season (multi-team stints combined)';
+
+-- Career baselines as of each season: aggregates over the player's earlier
+-- seasons (50+ PA each), keyed by the season being evaluated. Rows exist for
+-- every season played and the one after it, so next-season projections hit too.
+CREATE MATERIALIZED VIEW IF NOT EXISTS player_career_baselines AS
+WITH evaluated AS (
+    SELECT player_id, season FROM season_stats
+    UNION
+    SELECT player_id, season + 1 FROM season_stats
+)
+SELECT
+    e.player_id,
+    e.season,
+    CAST(AVG(b.babip) AS DOUBLE PRECISION) AS career_babip,
+    CAST(AVG(b.bb_pct) AS DOUBLE PRECISION) AS career_bb_pct,
+    CAST(AVG(b.k_pct) AS DOUBLE PRECISION) AS career_k_pct,
+    CAST(AVG(b.iso) AS DOUBLE PRECISION) AS career_iso,
+    CAST(AVG(b.hr_fb_pct) AS DOUBLE PRECISION) AS career_hr_fb_pct,
+    CAST(SUM(b.pa) AS INTEGER) AS total_pa,
+    CAST(COUNT(b.player_id) AS INTEGER) AS seasons
+FROM evaluated e
+LEFT JOIN season_stats b
+    ON b.player_id = e.player_id
+   AND b.season < e.season
+   AND b.pa >= 50
+GROUP BY e.player_id, e.season;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_player_career_baselines_player_season
+    ON player_career_baselines(player_id, season);
+
+COMMENT ON MATERIALIZED VIEW player_career_baselines IS 'Career baseline (prior seasons, 50+ PA) per player as of each season';
+
+-- Career Statcast baselines as of each season: averages over the player's
+-- earlier seasons with 50+ batted balls, keyed like player_career_baselines.
+-- Built from statcast_data (not season_stats) so a player-season whose
+-- Statcast rows landed after the last refresh has no row here, and readers
+-- fall back to the live query instead of seeing an empty baseline.
+CREATE MATERIALIZED VIEW IF NOT EXISTS statcast_career_baselines AS
+WITH evaluated AS (
+    SELECT player_id, season FROM statcast_data
+    UNION
+    SELECT player_id, season + 1 FROM statcast_data
+)
+SELECT
+    e.player_id,
+    e.season,
+    CAST(AVG(sc.exit_velo) AS DOUBLE PRECISION) AS career_exit_velo,
+    CAST(AVG(sc.hard_hit_pct) AS DOUBLE PRECISION) AS career_hard_hit_pct,
+    CAST(AVG(sc.barrel_pct) AS DOUBLE PRECISION) AS career_barrel_pct,
+    CAST(AVG(sc.sweet_spot_pct) AS DOUBLE PRECISION) AS career_sweet_spot_pct,
+    CAST(COUNT(sc.player_id) AS INTEGER) AS seasons
+FROM evaluated e
+LEFT JOIN statcast_data sc
+    ON sc.player_id = e.player_id
+   AND sc.season < e.season
+   AND sc.batted_balls >= 50
+GROUP BY e.player_id, e.season;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_statcast_career_baselines_player_season
+    ON statcast_career_baselines(player_id, season);
+
+COMMENT ON MATERIALIZED VIEW statcast_career_baselines IS 'Career Statcast baseline (prior seasons, 50+ batted balls) per player as of each season';
+
+-- Everything the Statcast regression report reads for a player-season stint:
+-- the season line, both career baselines and the season's Statcast row. A
+-- plain view over the rollups above, so it is always as fresh as they are.
+-- has_baseline / has_statcast tell a missing row apart from NULL values.
+CREATE OR REPLACE VIEW player_regression_input AS
+SELECT
+    ss.player_id,
+    p.name,
+    ss.season,
+    ss.team,
+    ss.pa,
+    ss.games,
+    CAST(ss.avg AS DOUBLE PRECISION) AS avg,
+    CAST(ss.obp AS DOUBLE PRECISION) AS obp,
+    CAST(ss.slg AS DOUBLE PRECISION) AS slg,
+    CAST(ss.woba AS DOUBLE PRECISION) AS woba,
+    ss.wrc_plus,
+    CAST(ss.babip AS DOUBLE PRECISION) AS babip,
+    CAST(ss.bb_pct AS DOUBLE PRECISION) AS bb_pct,
+    CAST(ss.k_pct AS DOUBLE PRECISION) AS k_pct,
+    CAST(ss.iso AS DOUBLE PRECISION) AS iso,
+    CAST(ss.hr_fb_pct AS DOUBLE PRECISION) AS hr_fb_pct,
+    cb.player_id IS NOT NULL AS has_baseline,
+    cb.career_babip,
+    cb.career_bb_pct,
+    cb.career_k_pct,
+    cb.career_iso,
+    cb.career_hr_fb_pct,
+    cb.total_pa,
+    cb.seasons,
+    sc.player_id IS NOT NULL AS has_statcast,
+    sc.exit_velo,
+    sc.hard_hit_pct,
+    sc.barrel_pct,
+    sc.sweet_spot_pct,
+    sc.xba,
+    sc.xslg,
+    sc.xwoba,
+    sc.batted_balls,
+    scb.player_id IS NOT NULL AS has_statcast_baseline,
+    scb.career_exit_velo,
+    scb.career_hard_hit_pct,
+    scb.career_barrel_pct,
+    scb.career_sweet_spot_pct,
+    scb.seasons AS statcast_seasons
+FROM season_stats ss
+JOIN players p ON p.player_id = ss.player_id
+LEFT JOIN player_career_baselines cb
+    ON cb.player_id = ss.player_id AND cb.season = ss.season
+LEFT JOIN statcast_data sc
+    ON sc.player_id = ss.player_id AND sc.season = ss.season
+LEFT JOIN statcast_career_baselines scb
+    ON scb.player_id = ss.player_id AND scb.season = ss.season;
+
+COMMENT ON VIEW player_regression_input IS 'Season line, career baselines and Statcast per player-season stint (Statcast regression report input)';
@@ -13,9 +13,18 @@ ADD COLUMN IF NOT EXISTS fb_pct_statcast DECIMAL(5,1),
 ADD COLUMN IF NOT EXISTS pu_pct_statcast DECIMAL(5,1);
 
 -- Create indexes for common queries
-CREATE INDEX IF NOT EXISTS idx_statcast_player_season ON statcast_data(player_id, season);
 CREATE INDEX IF NOT EXISTS idx_statcast_season ON statcast_data(season);
 
+-- Covering index for per-player lookups and career aggregates
+-- (player_id = ? AND season [<|=] ?, batted_balls >= 50): the metrics ride
+-- along so these become index-only scans. Supersedes the plain
+-- (player_id, season) index.
+DROP INDEX IF EXISTS idx_statcast_player_season;
+CREATE INDEX IF NOT EXISTS idx_statcast_player_season_covering
+    ON statcast_data(player_id, season)
+    INCLUDE (exit_velo, hard_hit_pct, barrel_pct, sweet_spot_pct,
+             xba, xslg, xwoba, batted_balls);
+
 -- Defensive stats table (for Baseball-Reference integration)
 CREATE TABLE IF NOT EXISTS defensive_stats (
     id SERIAL PRIMARY KEY,
@@ -125,3 +134,5 @@ COMMENT ON COLUMN statcast_data.sweet_spot_pct IS 'Sweet spot rate - 8-32 degree
 COMMENT ON COLUMN statcast_data.xba IS 'Expected batting average';
 COMMENT ON COLUMN statcast_data.xslg IS 'Expected slugging percentage';
 COMMENT ON COLUMN statcast_data.xwoba IS 'Expected weighted on-base average';
+
+ANALYZE statcast_data;
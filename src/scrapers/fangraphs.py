@@ -240,6 +240,88 @@ def scrape_player_season_stats(player_name, start_year=2015, end_year=2025, mlb_
         return None
 
 
+def scrape_fangraphs_leaderboard(season=2025, min_pa=0):
+    """
+    Scrape the full FanGraphs batting leaderboard for one season in a single request
+    
+    Only players who spent the season with one club are returned: the
+    leaderboard has just a combined row for multi-team seasons, so those
+    players still need scrape_player_season_stats for their team splits.
+    
+    Args:
+        season: Season year
+        min_pa: Minimum plate appearances (0 = anyone who batted)
+    
+    Returns:
+        DataFrame in the scrape_player_season_stats format plus a 'playerid'
+        column (FanGraphs ID as a string), or None on failure
+    """
+    print(f"🔍 Fetching FanGraphs {season} batting leaderboard...")
+    
+    base_url = "https://www.fangraphs.com/api/leaders/major-league/data"
+    
+    params = {
+        'pos': 'all',
+        'stats': 'bat',
+        'lg': 'all',
+        'qual': str(min_pa),
+        'type': '8',  # Dashboard: standard, advanced and batted ball columns
+        'season': season,
+        'month': '0',
+        'season1': season,
+        'ind': '0',
+        'team': '0',
+        'rost': '0',
+        'age': '0',
+        'filter': '',
+        'players': '0',
+        'startdate': '',
+        'enddate': '',
+        'pageitems': '2000000000',  # Everyone on one page
+        'pagenum': '1',
+    }
+    
+    headers = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+        'Accept': 'application/json',
+    }
+    
+    try:
+        response = requests.get(base_url, params=params, headers=headers, timeout=60)
+        response.raise_for_status()
+        
+        data = response.json()
+        stats_data = data['data'] if isinstance(data, dict) and 'data' in data else data
+        
+        if not stats_data:
+            print(f"❌ No leaderboard data found")
+            return None
+        
+        df = clean_html_tags(pd.DataFrame(stats_data))
+        
+        if 'Season' not in df.columns:
+            df['Season'] = season
+        
+        df['playerid'] = df['playerid'].astype(str)
+        df['G'] = pd.to_numeric(df['G'], errors='coerce')
+        df['PA'] = pd.to_numeric(df['PA'], errors='coerce')
+        df['Season'] = pd.to_numeric(df['Season'], errors='coerce')
+        
+        # Multi-team seasons come back as one combined row ("- - -" / "2 Tms")
+        multi_team = df['Team'].str.contains('- - -|Tms', case=False, na=True)
+        df = df[~multi_team & (df['G'] >= 1)]
+        
+        print(f"   Retrieved {len(df)} single-team player seasons")
+        return df
+        
+    except requests.exceptions.RequestException as e:
+        print(f"❌ Network error: {e}")
+        return None
+    except Exception as e:
+        print(f"❌ Error scraping FanGraphs leaderboard: {e}")
+        return None
+
+
 def clean_html_tags(df):
     """
     Remove HTML tags from DataFrame columns
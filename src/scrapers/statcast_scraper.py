@@ -349,6 +349,19 @@ class StatcastScraper:
         print(f"   ❌ No Statcast data: {failed}")
         print(f"   Total seasons loaded: {total_seasons}")
         print(f"   Average seasons per player: {total_seasons/successful:.1f}")
+        
+        if total_seasons:
+            self.refresh_statcast_baselines()
+    
+    def refresh_statcast_baselines(self):
+        """Refresh the statcast_career_baselines rollup (schema_rollups.sql) after new data lands"""
+        try:
+            self.session.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY statcast_career_baselines"))
+            self.session.commit()
+            print("\n🔄 Refreshed statcast_career_baselines")
+        except Exception as e:
+            self.session.rollback()
+            print(f"\n⚠️  Could not refresh statcast_career_baselines: {e}")
     
     def close(self):
         """Close database session"""
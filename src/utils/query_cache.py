@@ -0,0 +1,88 @@
+"""
+Shared query result cache (Redis cache-aside)
+
+Sits under Streamlit's per-process cache so results survive restarts and are
+shared across dashboard replicas. Enabled by setting REDIS_URL; without it (or
+without the redis package) queries go straight to the database.
+"""
+import os
+import json
+import pickle
+import hashlib
+from functools import lru_cache
+
+import pandas as pd
+from src.utils.db_connection import get_engine
+
+REDIS_URL = os.getenv('REDIS_URL')
+
+# Default time-to-live for cached results (seconds)
+DEFAULT_TTL = 3600
+
+
+@lru_cache(maxsize=1)
+def get_redis():
+    """Get a Redis client, or None if caching is not configured"""
+    if not REDIS_URL:
+        return None
+
+    try:
+        import redis
+    except ImportError:
+        print("⚠️  REDIS_URL is set but the redis package is not installed - caching disabled")
+        return None
+
+    return redis.Redis.from_url(REDIS_URL)
+
+
+def _read_sql(query, params):
+    """Default loader: run the query through pandas"""
+    return pd.read_sql(query, get_engine(), params=params)
+
+
+def _cache_key(query, params):
+    """Build a stable cache key from SQL text and bound parameters"""
+    payload = str(query) + json.dumps(params, sort_keys=True, default=str)
+    return f"q:{hashlib.sha1(payload.encode('utf-8')).hexdigest()}"
+
+
+def cached_query(query, params=None, loader=None, ttl=DEFAULT_TTL):
+    """
+    Fetch a query result DataFrame, checking the shared cache first
+
+    Args:
+        query: SQL text or sqlalchemy TextClause
+        params: Bound parameters
+        loader: Callable (query, params) -> DataFrame used on a cache miss
+        ttl: Seconds to keep the result in the cache
+
+    Returns:
+        DataFrame
+    """
+    params = params or {}
+    loader = loader or _read_sql
+
+    client = get_redis()
+    if client is None:
+        return loader(query, params)
+
+    key = _cache_key(query, params)
+
+    try:
+        raw = client.get(key)
+    except Exception as e:
+        # Cache outages should never take the dashboard down
+        print(f"⚠️  Redis unavailable, querying database: {e}")
+        return loader(query, params)
+
+    if raw is not None:
+        return pickle.loads(raw)
+
+    df = loader(query, params)
+
+    try:
+        client.setex(key, ttl, pickle.dumps(df))
+    except Exception as e:
+        print(f"⚠️  Could not cache query result: {e}")
+
+    return df